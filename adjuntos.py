@@ -0,0 +1,200 @@
+"""
+Almacén de adjuntos direccionado por contenido.
+Los adjuntos se guardan una sola vez por contenido: se copian por bloques a un
+temporal calculando el SHA-256, y se mueven de forma atómica a uploads/ab/cd/<sha256>.<ext>.
+Cada tarea que lo usa suma una referencia; el blob se borra al liberar la última.
+
+Una subida y el borrado del mismo blob pueden cruzarse: la subida suma su referencia
+(y toma así el bloqueo de escritura) antes de mover el archivo a su sitio, siempre
+con os.replace, y el borrado tras el commit comprueba con el bloqueo de escritura
+tomado que ninguna fila usa ya la ruta.
+"""
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+from sqlalchemy import bindparam, event, select, update, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from collections import Counter
+from datetime import datetime
+import hashlib
+import os
+import sqlite3
+import tempfile
+
+from config import ALLOWED_EXTENSIONS, EXTENSIONES_CON_MINIATURA
+from extensions import db
+from models import Attachment
+from shards import carpeta_uploads
+from trabajos import encolar_trabajo
+
+def allowed_file(filename):
+    """Verifica si el archivo tiene una extensión permitida"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def guardar_adjunto(file):
+    """Guarda un archivo subido en el almacén por contenido y devuelve su Attachment (con la referencia ya sumada)"""
+    extension = file.filename.rsplit('.', 1)[1].lower()  # Ya validada por allowed_file
+    carpeta_tmp = os.path.join(carpeta_uploads(), '.tmp')
+    os.makedirs(carpeta_tmp, exist_ok=True)
+
+    sha = hashlib.sha256()
+    tamano = 0
+    with tempfile.NamedTemporaryFile(dir=carpeta_tmp, delete=False) as tmp:
+        try:
+            while True:
+                bloque = file.stream.read(current_app.config['UPLOAD_CHUNK_SIZE'])
+                if not bloque:
+                    break
+                sha.update(bloque)
+                tmp.write(bloque)
+                tamano += len(bloque)
+        except Exception:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    digest = sha.hexdigest()
+
+    existente = db.session.execute(select(Attachment.ruta).where(Attachment.sha256 == digest)).scalar()
+    ruta = existente or f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+    stmt = sqlite_insert(Attachment.__table__).values(
+        sha256=digest, ruta=ruta, tamano=tamano, referencias=1, fecha_creacion=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['sha256'],
+        set_={'referencias': Attachment.__table__.c.referencias + 1}
+    )
+    try:
+        db.session.execute(stmt)
+    except Exception:
+        os.remove(tmp.name)
+        raise
+
+    # Con la referencia ya sumada (y el bloqueo de escritura tomado hasta el commit): aunque el
+    # contenido ya esté en disco se reemplaza, por si un borrado pendiente del mismo blob lo quita antes
+    destino = os.path.join(carpeta_uploads(), ruta)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    os.replace(tmp.name, destino)
+    adjunto = db.session.execute(
+        select(Attachment).where(Attachment.sha256 == digest).execution_options(populate_existing=True)
+    ).scalar_one()
+
+    # Blob nuevo: la miniatura se genera fuera de la petición
+    if adjunto.referencias == 1 and adjunto.miniatura is None and extension in EXTENSIONES_CON_MINIATURA:
+        encolar_trabajo('miniatura', adjunto.id)
+    return adjunto
+
+def liberar_adjunto(tarea):
+    """
+    Quita el adjunto de una tarea. Si era la última referencia al blob, se borra
+    la fila y el archivo se elimina del disco después del commit.
+    """
+    if tarea.attachment_id:
+        db.session.execute(
+            update(Attachment)
+            .where(Attachment.id == tarea.attachment_id)
+            .values(referencias=Attachment.referencias - 1)
+            .execution_options(synchronize_session=False)
+        )
+        blob = db.session.execute(
+            select(Attachment.referencias, Attachment.ruta, Attachment.miniatura)
+            .where(Attachment.id == tarea.attachment_id)
+        ).first()
+        if blob and blob.referencias <= 0:
+            db.session.execute(
+                delete(Attachment).where(Attachment.id == tarea.attachment_id)
+                .execution_options(synchronize_session=False)
+            )
+            anotar_liberados([blob.ruta, blob.miniatura])
+    elif tarea.archivo:
+        # Adjunto antiguo, guardado fuera del almacén por contenido
+        archivo_path = os.path.join(carpeta_uploads(), tarea.archivo)
+        if os.path.exists(archivo_path):
+            os.remove(archivo_path)
+
+    tarea.attachment_id = None
+    tarea.archivo = None
+    tarea.nombre_archivo = None
+
+def liberar_adjuntos_en_lote(filas):
+    """
+    Equivalente a liberar_adjunto() para tareas que se borran con un DELETE en bloque.
+    `filas` son las tareas leídas con sus columnas attachment_id y archivo.
+    Descuenta las referencias con un único UPDATE (executemany) y borra los blobs que quedan a cero.
+    """
+    # Adjuntos antiguos, guardados fuera del almacén por contenido
+    anotar_liberados(fila.archivo for fila in filas if not fila.attachment_id)
+
+    referencias = Counter(fila.attachment_id for fila in filas if fila.attachment_id)
+    if not referencias:
+        return
+    adjuntos = Attachment.__table__
+    db.session.execute(
+        update(adjuntos)
+        .where(adjuntos.c.id == bindparam('b_id'))
+        .values(referencias=adjuntos.c.referencias - bindparam('b_restar')),
+        [{'b_id': attachment_id, 'b_restar': n} for attachment_id, n in referencias.items()]
+    )
+    vacios = db.session.execute(
+        select(adjuntos.c.id, adjuntos.c.ruta, adjuntos.c.miniatura)
+        .where(adjuntos.c.id.in_(list(referencias)), adjuntos.c.referencias <= 0)
+    ).all()
+    if vacios:
+        db.session.execute(delete(adjuntos).where(adjuntos.c.id.in_([blob.id for blob in vacios])))
+        anotar_liberados(ruta for blob in vacios for ruta in (blob.ruta, blob.miniatura))
+
+def asignar_adjunto(tarea, file):
+    """Sustituye el adjunto de una tarea por el archivo subido"""
+    if tarea.archivo:
+        liberar_adjunto(tarea)
+    adjunto = guardar_adjunto(file)
+    tarea.attachment_id = adjunto.id
+    tarea.archivo = adjunto.ruta
+    tarea.nombre_archivo = secure_filename(file.filename)
+
+def anotar_liberados(rutas):
+    """Archivos que se borran del disco después del commit (ver borrar_blobs_liberados)"""
+    rutas = {ruta for ruta in rutas if ruta}
+    if rutas:
+        db.session.info.setdefault('blobs_liberados', set()).update(rutas)
+        # Base de datos en la que se comprueba después si alguna fila vuelve a usar las rutas, y su carpeta
+        db.session.info['blobs_base_datos'] = db.session.connection().engine.url.database
+        db.session.info['blobs_carpeta'] = carpeta_uploads()
+
+def rutas_en_uso(ruta_db, rutas):
+    """
+    Abre una transacción de escritura (BEGIN IMMEDIATE) y devuelve la conexión y las
+    `rutas` que usa algún adjunto. El pool de escritura de la sesión sigue ocupado
+    durante after_commit, así que se usa una conexión sqlite3 aparte.
+    """
+    conexion = sqlite3.connect(ruta_db, timeout=current_app.config['SQLITE_BUSY_TIMEOUT'] / 1000)
+    conexion.execute('BEGIN IMMEDIATE')
+    marcas = ', '.join('?' * len(rutas))
+    en_uso = {ruta for (ruta,) in conexion.execute(
+        f"SELECT ruta FROM attachment WHERE ruta IN ({marcas}) "
+        f"UNION SELECT miniatura FROM attachment WHERE miniatura IN ({marcas})", [*rutas, *rutas])}
+    return conexion, en_uso
+
+@event.listens_for(db.session, 'after_commit')
+def borrar_blobs_liberados(sesion):
+    liberados = list(sesion.info.pop('blobs_liberados', ()))
+    ruta_db = sesion.info.pop('blobs_base_datos', None)
+    carpeta = sesion.info.pop('blobs_carpeta', None)
+    if not liberados:
+        return
+    # Una subida del mismo contenido puede haber creado ya otra fila con la misma ruta: mientras
+    # se borra se mantiene el bloqueo de escritura, así ninguna subida la crea entre medias
+    conexion, en_uso = rutas_en_uso(ruta_db, liberados)
+    try:
+        for ruta in liberados:
+            archivo_path = os.path.join(carpeta, ruta)
+            if ruta not in en_uso and os.path.exists(archivo_path):
+                os.remove(archivo_path)
+    finally:
+        conexion.rollback()
+        conexion.close()
+
+@event.listens_for(db.session, 'after_rollback')
+def descartar_blobs_liberados(sesion):
+    sesion.info.pop('blobs_liberados', None)
+    sesion.info.pop('blobs_base_datos', None)
+    sesion.info.pop('blobs_carpeta', None)
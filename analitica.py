@@ -0,0 +1,177 @@
+"""
+Analítica de productividad de los equipos sobre resúmenes diarios precalculados
+
+Los líderes ven cuántas tareas completa cada miembro por día y por semana y cuánto
+tardan en completarse (de fecha_creacion a fecha_completada) según su prioridad.
+Cuentan todas las tareas asignadas a los miembros del equipo, las haya creado quien las
+haya creado, igual que en tareas_por_miembro; las sin asignar no entran.
+Calcularlo sobre task y task_archive recorrería todo el historial en cada petición;
+aquí se lee task_rollup_dia, con una fila por (creador, día, asignado, prioridad,
+cubo de duración) que se mantiene en la misma transacción que las tareas (ver
+RESÚMENES DIARIOS en models.py) y que la migración 6 rellena por lotes en las bases
+de datos existentes. Un año de un equipo son unos pocos miles de filas.
+
+Los percentiles de duración salen del histograma de cubos: se busca el cubo que
+contiene el percentil y se interpola dentro de él en escala logarítmica. Se calculan
+para todas las prioridades a la vez con NumPy si está instalado y, si no, con Python.
+No depende de Flask: recibe la sesión de SQLAlchemy.
+"""
+
+from sqlalchemy import func, select
+from datetime import date, datetime, timedelta
+
+from models import CUBOS_DURACION, LIMITES_DURACION, PRIORIDADES, TaskRollupDia, User
+
+PERCENTILES = (50, 90)
+
+# ==================== PERCENTILES ====================
+
+def cargar_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def interpolar(cubo, fraccion):
+    """Segundos en la posición `fraccion` (0-1) del cubo: lineal en el primero, logarítmica en los demás"""
+    inferior, superior = LIMITES_DURACION[cubo], LIMITES_DURACION[cubo + 1]
+    if cubo == 0:
+        return superior * fraccion
+    return inferior * (superior / inferior) ** fraccion
+
+def percentiles_python(histogramas, percentiles):
+    resultado = []
+    for conteos in histogramas:
+        total = sum(conteos)
+        valores = []
+        for p in percentiles:
+            if not total:
+                valores.append(None)
+                continue
+            objetivo = total * p / 100
+            acumulado = 0
+            for cubo, n in enumerate(conteos):
+                if n and acumulado + n >= objetivo:
+                    break
+                acumulado += n
+            valores.append(interpolar(cubo, (objetivo - acumulado) / n))
+        resultado.append(valores)
+    return resultado
+
+def percentiles_numpy(np, histogramas, percentiles):
+    conteos = np.asarray(histogramas, dtype=float)              # (filas, cubos)
+    acumulado = np.cumsum(conteos, axis=1)
+    objetivo = acumulado[:, -1:] * (np.asarray(percentiles, dtype=float) / 100)  # (filas, percentiles)
+    # Primer cubo cuyo acumulado alcanza el objetivo
+    cubo = (acumulado[:, None, :] < objetivo[:, :, None]).sum(axis=2)
+    cubo = np.minimum(cubo, CUBOS_DURACION - 1)
+    filas = np.arange(len(conteos))[:, None]
+    en_cubo = conteos[filas, cubo]
+    anteriores = acumulado[filas, cubo] - en_cubo
+    fraccion = np.divide(objetivo - anteriores, en_cubo, out=np.zeros_like(objetivo), where=en_cubo > 0)
+
+    limites = np.asarray(LIMITES_DURACION)
+    inferior, superior = limites[cubo], limites[cubo + 1]
+    razon = np.divide(superior, inferior, out=np.ones_like(superior), where=inferior > 0)
+    valores = np.where(cubo == 0, superior * fraccion, inferior * razon ** fraccion)
+    vacias = acumulado[:, -1] == 0
+    return [[None if vacias[i] else float(valor) for valor in fila] for i, fila in enumerate(valores)]
+
+def percentiles_duracion(histogramas, percentiles=PERCENTILES):
+    """
+    Percentiles en segundos de cada histograma (lista de CUBOS_DURACION conteos):
+    una lista de valores por histograma, None en los vacíos
+    """
+    if not histogramas:
+        return []
+    np = cargar_numpy()
+    if np is None:
+        return percentiles_python(histogramas, percentiles)
+    return percentiles_numpy(np, histogramas, percentiles)
+
+# ==================== INFORME ====================
+
+def rango_fechas(desde=None, hasta=None, dias=90, maximo=366):
+    """
+    (desde, hasta) como fechas a partir de textos ISO 8601 o None: por defecto los
+    últimos `dias` días hasta hoy. Lanza ValueError si no son válidas o abarcan más de `maximo` días.
+    """
+    try:
+        hasta = date.fromisoformat(hasta) if hasta else datetime.utcnow().date()
+        desde = date.fromisoformat(desde) if desde else hasta - timedelta(days=dias - 1)
+    except (TypeError, ValueError):
+        raise ValueError('Fechas no válidas; usa AAAA-MM-DD') from None
+    if desde > hasta:
+        raise ValueError('La fecha inicial es posterior a la final')
+    if (hasta - desde).days >= maximo:
+        raise ValueError(f'El rango no puede superar los {maximo} días')
+    return desde, hasta
+
+def lunes(dia):
+    return dia - timedelta(days=dia.weekday())
+
+def informe(sesion, desde, hasta, miembro=None):
+    """
+    Productividad de las tareas asignadas a los miembros del equipo completadas entre
+    `desde` y `hasta` (fechas, ambas incluidas), opcionalmente solo las de un miembro:
+
+        {'desde', 'hasta', 'dias', 'completadas',
+         'miembros': [{'id', 'username', 'nombre', 'completadas', 'por_dia': {dia: n}, 'por_semana': {lunes: n}}],
+         'semanas': {lunes: n},
+         'duracion': [{'prioridad', 'completadas', 'p50', 'p90'}]}   (segundos)
+
+    Las fechas van en ISO 8601.
+    """
+    miembros_equipo = select(User.id).where(User.role == 'miembro')
+    condiciones = [TaskRollupDia.dia >= desde, TaskRollupDia.dia <= hasta,
+                   TaskRollupDia.assigned_to.in_(miembros_equipo)]
+    if miembro is not None:
+        condiciones.append(TaskRollupDia.assigned_to == miembro)
+
+    por_miembro = {}
+    semanas = {}
+    for dia, assigned_to, total in sesion.execute(
+            select(TaskRollupDia.dia, TaskRollupDia.assigned_to, func.sum(TaskRollupDia.total))
+            .where(*condiciones)
+            .group_by(TaskRollupDia.dia, TaskRollupDia.assigned_to)
+            .having(func.sum(TaskRollupDia.total) > 0)
+            .order_by(TaskRollupDia.dia)):
+        datos = por_miembro.setdefault(assigned_to, {'completadas': 0, 'por_dia': {}, 'por_semana': {}})
+        semana = lunes(dia).isoformat()
+        datos['completadas'] += total
+        datos['por_dia'][dia.isoformat()] = total
+        datos['por_semana'][semana] = datos['por_semana'].get(semana, 0) + total
+        semanas[semana] = semanas.get(semana, 0) + total
+
+    usuarios = {}
+    if por_miembro:
+        usuarios = {fila.id: fila for fila in sesion.execute(
+            select(User.id, User.username, User.nombre).where(User.id.in_(por_miembro)))}
+    miembros = []
+    for assigned_to, datos in sorted(por_miembro.items(), key=lambda par: -par[1]['completadas']):
+        usuario = usuarios[assigned_to]
+        miembros.append({'id': assigned_to, 'username': usuario.username, 'nombre': usuario.nombre, **datos})
+
+    histogramas = {prioridad: [0] * CUBOS_DURACION for prioridad in PRIORIDADES}
+    for prioridad, cubo, total in sesion.execute(
+            select(TaskRollupDia.prioridad, TaskRollupDia.cubo, func.sum(TaskRollupDia.total))
+            .where(*condiciones)
+            .group_by(TaskRollupDia.prioridad, TaskRollupDia.cubo)):
+        histogramas[prioridad][cubo] = max(total, 0)
+    valores = percentiles_duracion(list(histogramas.values()))
+    duracion = [
+        {'prioridad': prioridad, 'completadas': sum(conteos),
+         **{f'p{p}': valor for p, valor in zip(PERCENTILES, fila)}}
+        for (prioridad, conteos), fila in zip(histogramas.items(), valores)
+    ]
+
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'dias': (hasta - desde).days + 1,
+        'completadas': sum(datos['completadas'] for datos in por_miembro.values()),
+        'miembros': miembros,
+        'semanas': dict(sorted(semanas.items())),
+        'duracion': duracion,
+    }
@@ -0,0 +1,73 @@
+"""
+Archivado de tareas completadas
+
+Las tareas completadas hace más de N días se mueven de task a task_archive por
+lotes: cada lote copia las filas y las borra de task en una misma transacción,
+así que el proceso se puede interrumpir y volver a lanzar sin perder ni duplicar
+nada. Entre lotes se suelta el bloqueo de escritura para no frenar a la aplicación.
+
+Las tareas archivadas siguen contando en task_stats, siguen referenciando su
+adjunto y se pueden abrir desde detalle_tarea; los listados solo las muestran
+con ?archivadas=1. No depende de Flask: recibe la sesión de SQLAlchemy.
+
+    flask --app app archivar-tareas [--dias 90] [--lote 1000]
+"""
+
+from sqlalchemy import delete, insert, literal, select
+from datetime import datetime, timedelta
+import time
+
+from models import Task, TaskArchive, incrementar_versiones
+
+COLUMNAS = [columna.name for columna in Task.__table__.columns]
+
+def ids_a_archivar(sesion, limite, lote):
+    """Siguiente lote de tareas completadas antes de `limite`"""
+    # Los id de las tareas nuevas salen de la tabla secuencia (models.reservar_ids): los archivados no se reutilizan
+    return sesion.scalars(
+        select(Task.id)
+        .where(Task.estado == 'completada', Task.fecha_completada < limite)
+        .order_by(Task.id)
+        .limit(lote)
+    ).all()
+
+def archivar_lote(sesion, ids):
+    """Mueve las tareas `ids` a task_archive y confirma; devuelve los usuarios afectados"""
+    tabla = Task.__table__
+    usuarios = set()
+    for created_by, assigned_to in sesion.execute(
+            select(tabla.c.created_by, tabla.c.assigned_to).where(tabla.c.id.in_(ids))):
+        usuarios.update((created_by, assigned_to))
+
+    sesion.execute(
+        insert(TaskArchive.__table__).from_select(
+            COLUMNAS + ['fecha_archivado'],
+            select(*(tabla.c[nombre] for nombre in COLUMNAS),
+                   literal(datetime.utcnow(), TaskArchive.fecha_archivado.type))
+            .where(tabla.c.id.in_(ids))
+        )
+    )
+    # DELETE en bloque: no pasa por los after_flush, así que task_stats no cambia
+    sesion.execute(delete(tabla).where(tabla.c.id.in_(ids)))
+    # Los listados de estos usuarios cambian: las ETag de la API deben cambiar también
+    incrementar_versiones(sesion.connection(), usuarios)
+    sesion.commit()
+    return usuarios
+
+def archivar_completadas(sesion, dias, lote=1000, pausa=0.05, progreso=None):
+    """
+    Archiva las tareas completadas hace más de `dias` días, de `lote` en `lote`.
+    Llama a progreso(total_archivadas) tras cada lote. Devuelve el total archivado.
+    """
+    limite = datetime.utcnow() - timedelta(days=dias)
+    total = 0
+    while True:
+        ids = ids_a_archivar(sesion, limite, lote)
+        if not ids:
+            return total
+        archivar_lote(sesion, ids)
+        total += len(ids)
+        if progreso:
+            progreso(total)
+        if pausa:
+            time.sleep(pausa)
@@ -0,0 +1,71 @@
+"""
+Benchmark del tiempo de arranque
+
+    python benchmarks/arranque.py [-n 15] [--json]
+
+Cada caso se ejecuta en un intérprete nuevo (sin caché de módulos en memoria)
+y se muestra la mediana y el mínimo en milisegundos. 'python -c pass' es el
+suelo: lo que cuesta arrancar el intérprete sin importar nada.
+Para ver qué módulo pesa más: python -X importtime -c "import app"
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASOS = [
+    ('interprete', 'pass'),
+    ('import models (scripts)', 'import models'),
+    ('scripts de mantenimiento', 'import check_db, init_db, verificar_adjuntos'),
+    ('import app', 'import app'),
+    ('create_app()', 'import os; from app import create_app; carpeta = os.environ["ARRANQUE_CARPETA"]; '
+                     'create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{carpeta}/todo.db", "SQLALCHEMY_BINDS": {}, '
+                     '"UPLOAD_FOLDER": f"{carpeta}/uploads", "TRABAJOS_EN_PROCESO": False})'),
+]
+
+def medir(codigo, repeticiones, entorno):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=entorno, check=True)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide el tiempo de arranque de la aplicación y los scripts')
+    parser.add_argument('-n', type=int, default=15, help='Repeticiones por caso')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    # create_app() crea las tablas: se trabaja en una carpeta temporal para no tocar instance/
+    with tempfile.TemporaryDirectory() as carpeta:
+        entorno = dict(os.environ, ARRANQUE_CARPETA=carpeta)
+        resultados = []
+        for nombre, codigo in CASOS:
+            tiempos = medir(codigo, args.n, entorno)
+            resultados.append({
+                'caso': nombre,
+                'mediana_ms': round(statistics.median(tiempos), 1),
+                'minimo_ms': round(min(tiempos), 1),
+            })
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+        return
+
+    print("\n" + "="*60)
+    print("⏱️  TIEMPO DE ARRANQUE")
+    print("="*60 + "\n")
+    for r in resultados:
+        print(f"{r['caso']:<30} mediana {r['mediana_ms']:>8.1f} ms   mínimo {r['minimo_ms']:>8.1f} ms")
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""
+Benchmark de carga de las rutas más usadas
+
+    python benchmarks/carga.py [--modo cliente|servidor|ambos] [-n 200] [-c 8] [--workers 4]
+                               [--tareas 20000] [--carpeta DATOS] [--salida resultado.json]
+
+Genera los datos con datos.py (o reutiliza --carpeta) y mide cada ruta:
+- 'cliente': con el test client de Flask, en este mismo proceso y sin concurrencia.
+  Mide el coste de la aplicación sin red ni servidor.
+- 'servidor': contra un servidor real con varios procesos (gunicorn si está instalado,
+  si no el servidor de Werkzeug con un proceso por petición) y -c hilos cliente.
+
+'POST /login' mide la verificación de contraseñas y '+ logins' repite una ruta con
+-c hilos más haciendo login sin parar (solo contra el servidor real).
+
+Por ruta se informa de p50/p95/p99 en ms, peticiones por segundo, errores y sentencias
+SQL por petición (cabecera X-Consultas-SQL); por modo, el pico de memoria (RSS).
+El resultado es JSON para poder guardarlo y compararlo entre versiones.
+"""
+
+import argparse
+import http.cookiejar
+import importlib.util
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from datos import CONTRASENA, generar
+
+# (nombre, rol del usuario, método, ruta[, con logins de fondo])
+ESCENARIOS = [
+    ('GET /dashboard (líder)', 'lider', 'GET', '/dashboard'),
+    ('GET /dashboard (miembro)', 'miembro', 'GET', '/dashboard'),
+    ('GET /lider/tareas-por-miembro', 'lider', 'GET', '/lider/tareas-por-miembro'),
+    ('GET /uploads/<filename>', 'miembro', 'GET', '/uploads/{adjunto}'),
+    ('POST /tarea/crear', 'miembro', 'POST', '/tarea/crear'),
+    ('POST /login', 'miembro', 'POST', '/login'),
+    ('GET /dashboard (miembro) + logins', 'miembro', 'GET', '/dashboard', True),
+]
+
+def formulario_login(datos, aleatorio):
+    return {'username': aleatorio.choice(datos['miembros']), 'password': CONTRASENA}
+
+def peticion(escenario, datos, aleatorio):
+    """Ruta y formulario concretos de una petición del escenario"""
+    nombre, rol, metodo, ruta = escenario[:4]
+    if '{adjunto}' in ruta:
+        ruta = ruta.format(adjunto=aleatorio.choice(datos['adjuntos']))
+    formulario = None
+    if ruta == '/login':
+        formulario = formulario_login(datos, aleatorio)
+    elif metodo == 'POST':
+        formulario = {'titulo': f'Tarea de carga {aleatorio.randint(1, 10**9)}',
+                      'descripcion': 'Creada por el benchmark', 'prioridad': 'media'}
+    return metodo, ruta, formulario
+
+def resumir(nombre, tiempos, consultas, errores, duracion):
+    tiempos_ms = [t * 1000 for t in tiempos]
+    cortes = statistics.quantiles(tiempos_ms, n=100, method='inclusive') if len(tiempos_ms) > 1 else tiempos_ms * 99
+    return {
+        'ruta': nombre,
+        'peticiones': len(tiempos),
+        'errores': errores,
+        'p50_ms': round(cortes[49], 2),
+        'p95_ms': round(cortes[94], 2),
+        'p99_ms': round(cortes[98], 2),
+        'media_ms': round(statistics.fmean(tiempos_ms), 2),
+        'peticiones_por_segundo': round(len(tiempos) / duracion, 1),
+        'sql_media': round(statistics.fmean(consultas), 1) if consultas else None,
+        'sql_max': max(consultas) if consultas else None,
+    }
+
+def rss_pico_mb(quien):
+    # En Linux ru_maxrss está en KiB
+    return round(resource.getrusage(quien).ru_maxrss / 1024, 1)
+
+# ==================== TEST CLIENT ====================
+
+def medir_cliente(carpeta, datos, n, calentamiento, semilla):
+    from servidor import crear_app_benchmark
+
+    app = crear_app_benchmark(carpeta)
+    aleatorio = random.Random(semilla)
+    clientes = {}
+
+    def cliente(username):
+        if username not in clientes:
+            clientes[username] = app.test_client()
+            clientes[username].post('/login', data={'username': username, 'password': CONTRASENA})
+        return clientes[username]
+
+    resultados = []
+    for escenario in ESCENARIOS:
+        if len(escenario) > 4:
+            continue  # Sin concurrencia no hay logins de fondo
+        usuarios = datos['lideres'] if escenario[1] == 'lider' else datos['miembros']
+        tiempos, consultas, errores = [], [], 0
+        for i in range(calentamiento + n):
+            c = cliente(aleatorio.choice(usuarios))
+            metodo, ruta, formulario = peticion(escenario, datos, aleatorio)
+            inicio = time.perf_counter()
+            respuesta = c.open(ruta, method=metodo, data=formulario)
+            respuesta.get_data()  # Incluye el envío del cuerpo (archivos en streaming)
+            transcurrido = time.perf_counter() - inicio
+            respuesta.close()
+            if i < calentamiento:
+                continue
+            tiempos.append(transcurrido)
+            errores += respuesta.status_code >= 400
+            if 'X-Consultas-SQL' in respuesta.headers:
+                consultas.append(int(respuesta.headers['X-Consultas-SQL']))
+        resultados.append(resumir(escenario[0], tiempos, consultas, errores, sum(tiempos)))
+    return {'modo': 'cliente', 'rutas': resultados, 'rss_pico_mb': rss_pico_mb(resource.RUSAGE_SELF)}
+
+# ==================== SERVIDOR REAL ====================
+
+class SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def arrancar_servidor(carpeta, workers, puerto):
+    entorno = dict(os.environ, BENCH_CARPETA=os.path.abspath(carpeta), TRABAJOS_EN_PROCESO='0')
+    if importlib.util.find_spec('gunicorn'):
+        comando = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pythonpath', 'benchmarks',
+                   '--workers', str(workers), '--bind', f'127.0.0.1:{puerto}', 'servidor:app']
+        tipo = f'gunicorn ({workers} workers)'
+    else:
+        comando = [sys.executable, os.path.join('benchmarks', 'servidor.py'), carpeta,
+                   '--puerto', str(puerto), '--procesos', str(workers)]
+        tipo = f'werkzeug (hasta {workers} procesos)'
+    proceso = subprocess.Popen(comando, cwd=RAIZ, env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{puerto}/login', timeout=1).close()
+            return proceso, tipo
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError('El servidor no arrancó en 30 segundos')
+
+def sesion_http(base, username):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+                                         SinRedirecciones())
+    enviar(opener, base, 'POST', '/login', {'username': username, 'password': CONTRASENA})
+    return opener
+
+def enviar(opener, base, metodo, ruta, formulario):
+    cuerpo = urllib.parse.urlencode(formulario).encode() if formulario else None
+    try:
+        respuesta = opener.open(urllib.request.Request(base + ruta, data=cuerpo, method=metodo), timeout=30)
+    except urllib.error.HTTPError as e:
+        respuesta = e  # Las redirecciones (302) y los errores llegan como HTTPError
+    with respuesta:
+        respuesta.read()
+        return respuesta.status, respuesta.headers.get('X-Consultas-SQL')
+
+def medir_servidor(carpeta, datos, n, concurrencia, workers, calentamiento, semilla):
+    puerto = puerto_libre()
+    base = f'http://127.0.0.1:{puerto}'
+    proceso, tipo = arrancar_servidor(carpeta, workers, puerto)
+    try:
+        resultados = []
+        for escenario in ESCENARIOS:
+            usuarios = datos['lideres'] if escenario[1] == 'lider' else datos['miembros']
+            # Un usuario (y su cookie de sesión) por hilo cliente
+            sesiones = [sesion_http(base, usuarios[i % len(usuarios)]) for i in range(concurrencia)]
+
+            def hilo(indice, cantidad):
+                aleatorio = random.Random(semilla + indice)
+                medidas = []
+                for _ in range(cantidad):
+                    metodo, ruta, formulario = peticion(escenario, datos, aleatorio)
+                    inicio = time.perf_counter()
+                    estado, consultas = enviar(sesiones[indice], base, metodo, ruta, formulario)
+                    medidas.append((time.perf_counter() - inicio, estado, consultas))
+                return medidas
+
+            # Ráfaga de logins de fondo mientras se mide la ruta
+            parar = threading.Event()
+
+            def logins(indice):
+                aleatorio = random.Random(-1 - indice)
+                opener = urllib.request.build_opener(SinRedirecciones())
+                while not parar.is_set():
+                    enviar(opener, base, 'POST', '/login', formulario_login(datos, aleatorio))
+
+            fondo = [threading.Thread(target=logins, args=(i,)) for i in range(concurrencia)] \
+                if len(escenario) > 4 else []
+            for t in fondo:
+                t.start()
+            try:
+                with ThreadPoolExecutor(concurrencia) as ejecutor:
+                    list(ejecutor.map(hilo, range(concurrencia), [calentamiento // concurrencia + 1] * concurrencia))
+                    inicio = time.perf_counter()
+                    partes = [n // concurrencia + (i < n % concurrencia) for i in range(concurrencia)]
+                    medidas = [m for lista in ejecutor.map(hilo, range(concurrencia), partes) for m in lista]
+                    duracion = time.perf_counter() - inicio
+            finally:
+                parar.set()
+                for t in fondo:
+                    t.join()
+
+            resultados.append(resumir(escenario[0], [m[0] for m in medidas],
+                                      [int(m[2]) for m in medidas if m[2] is not None],
+                                      sum(m[1] >= 400 for m in medidas), duracion))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    # RUSAGE_CHILDREN: el proceso hijo más grande ya terminado (gunicorn espera a sus workers)
+    return {'modo': 'servidor', 'servidor': tipo, 'concurrencia': concurrencia, 'rutas': resultados,
+            'rss_pico_mb': rss_pico_mb(resource.RUSAGE_CHILDREN)}
+
+# ==================== INFORME ====================
+
+def version_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def mostrar(resultado):
+    print("\n" + "="*100)
+    print(f"🚀 CARGA - {resultado['modo']}" + (f" - {resultado['servidor']}" if 'servidor' in resultado else ''))
+    print("="*100 + "\n")
+    print(f"{'ruta':<36}{'p50':>9}{'p95':>9}{'p99':>9}{'pet/s':>10}{'SQL':>7}{'errores':>9}")
+    for r in resultado['rutas']:
+        sql = r['sql_media'] if r['sql_media'] is not None else '-'
+        print(f"{r['ruta']:<36}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['peticiones_por_segundo']:>10.1f}{sql:>7}{r['errores']:>9}")
+    print(f"\n💾 Pico de memoria (RSS): {resultado['rss_pico_mb']} MB\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga de las rutas principales')
+    parser.add_argument('--modo', choices=['cliente', 'servidor', 'ambos'], default='ambos')
+    parser.add_argument('-n', type=int, default=200, help='Peticiones medidas por ruta')
+    parser.add_argument('-c', type=int, default=8, help='Hilos cliente contra el servidor real')
+    parser.add_argument('--workers', type=int, default=4, help='Procesos del servidor real')
+    parser.add_argument('--calentamiento', type=int, default=20, help='Peticiones sin medir por ruta')
+    parser.add_argument('--carpeta', help='Reutilizar datos ya generados con datos.py')
+    parser.add_argument('--lideres', type=int, default=5)
+    parser.add_argument('--miembros', type=int, default=50)
+    parser.add_argument('--tareas', type=int, default=20000)
+    parser.add_argument('--adjuntos', type=float, default=0.2)
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--salida', help='Guardar el resultado JSON en este archivo')
+    parser.add_argument('--json', action='store_true', help='Mostrar solo el JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        carpeta = args.carpeta or temporal
+        datos = generar(carpeta, args.lideres, args.miembros, args.tareas, args.adjuntos, args.semilla)
+        informe = {
+            'fecha': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': version_codigo(),
+            'datos': {'lideres': args.lideres, 'miembros': args.miembros, 'tareas': args.tareas,
+                      'adjuntos': args.adjuntos, 'semilla': args.semilla},
+            'peticiones_por_ruta': args.n,
+            'resultados': [],
+        }
+        # El servidor primero: el test client carga la aplicación en este proceso y
+        # su memoria no debe mezclarse con la de los procesos hijos
+        if args.modo in ('servidor', 'ambos'):
+            informe['resultados'].append(
+                medir_servidor(carpeta, datos, args.n, args.c, args.workers, args.calentamiento, args.semilla))
+        if args.modo in ('cliente', 'ambos'):
+            informe['resultados'].append(medir_cliente(carpeta, datos, args.n, args.calentamiento, args.semilla))
+
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+    if args.json:
+        print(json.dumps(informe, indent=2, ensure_ascii=False))
+    else:
+        for resultado in informe['resultados']:
+            mostrar(resultado)
+        if args.salida:
+            print(f"📄 Resultado guardado en {args.salida}\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Generador de datos para los benchmarks
+
+    python benchmarks/datos.py CARPETA [--lideres 5] [--miembros 50] [--tareas 20000]
+                               [--adjuntos 0.2] [--semilla 1]
+
+Crea CARPETA/todo.db y CARPETA/uploads/ con líderes, miembros y tareas repartidas
+como en un equipo real: la mayoría completadas, pocas urgentes, algunas sin asignar
+y una parte con adjunto (varios contenidos repetidos, como pasa con las plantillas).
+Con la misma semilla se generan exactamente los mismos datos.
+Todos los usuarios tienen la contraseña CONTRASENA.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from contrasenas import hash_contrasena
+from models import (Attachment, Base, Task, TaskRollupDia, TaskStats, User, clave_rollup, claves_contador,
+                    crear_motor, crear_sesion)
+
+CONTRASENA = 'bench123'
+
+# Pesos de cada valor (proporciones aproximadas de un equipo en marcha)
+ESTADOS = {'completada': 55, 'pendiente': 30, 'en_progreso': 15}
+PRIORIDADES = {'media': 50, 'baja': 20, 'alta': 22, 'urgente': 8}
+EXTENSIONES = ['pdf', 'png', 'jpg', 'txt', 'docx', 'zip']
+
+LOTE = 5000
+
+def elegir(aleatorio, pesos, n):
+    return aleatorio.choices(list(pesos), weights=list(pesos.values()), k=n)
+
+def crear_adjuntos(aleatorio, carpeta_uploads, cantidad):
+    """Escribe `cantidad` blobs en el almacén por contenido y devuelve sus datos"""
+    adjuntos = []
+    for i in range(cantidad):
+        extension = aleatorio.choice(EXTENSIONES)
+        contenido = aleatorio.randbytes(aleatorio.randint(2 * 1024, 256 * 1024))
+        digest = hashlib.sha256(contenido).hexdigest()
+        ruta = f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+        destino = os.path.join(carpeta_uploads, ruta)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, 'wb') as f:
+            f.write(contenido)
+        adjuntos.append({'id': i + 1, 'sha256': digest, 'ruta': ruta, 'tamano': len(contenido),
+                         'referencias': 0, 'nombre': f"documento_{i + 1}.{extension}"})
+    return adjuntos
+
+def generar(carpeta, lideres=5, miembros=50, tareas=20000, adjuntos=0.2, semilla=1):
+    """Crea la base de datos y los archivos de prueba en `carpeta`; devuelve un resumen"""
+    aleatorio = random.Random(semilla)
+    ruta_db = os.path.join(carpeta, 'todo.db')
+    carpeta_uploads = os.path.join(carpeta, 'uploads')
+    for ruta in (ruta_db, ruta_db + '-wal', ruta_db + '-shm'):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+    os.makedirs(carpeta_uploads, exist_ok=True)
+
+    motor = crear_motor(ruta_db)
+    Base.metadata.create_all(motor)
+
+    # Un solo hash para todos: generarlo por usuario tardaría más que el resto del script
+    password = hash_contrasena(CONTRASENA)
+    usuarios = [{'id': i + 1, 'username': f'lider{i + 1}', 'password': password, 'role': 'lider',
+                 'nombre': f'Líder {i + 1}'} for i in range(lideres)]
+    usuarios += [{'id': lideres + i + 1, 'username': f'miembro{i + 1}', 'password': password,
+                  'role': 'miembro', 'nombre': f'Miembro {i + 1}'} for i in range(miembros)]
+    ids_lideres = [u['id'] for u in usuarios if u['role'] == 'lider']
+    ids_miembros = [u['id'] for u in usuarios if u['role'] == 'miembro']
+
+    # Pocos blobs distintos para muchas tareas: el almacén deduplica los repetidos
+    con_adjunto = int(tareas * adjuntos)
+    blobs = crear_adjuntos(aleatorio, carpeta_uploads, max(1, con_adjunto // 4)) if con_adjunto else []
+
+    ahora = datetime.utcnow()
+    estados = elegir(aleatorio, ESTADOS, tareas)
+    prioridades = elegir(aleatorio, PRIORIDADES, tareas)
+    filas = []
+    for i in range(tareas):
+        # Los líderes reparten casi todo; algunos miembros se crean tareas propias
+        if aleatorio.random() < 0.85:
+            creador = aleatorio.choice(ids_lideres)
+            asignado = aleatorio.choice(ids_miembros) if aleatorio.random() < 0.95 else None
+        else:
+            creador = asignado = aleatorio.choice(ids_miembros)
+        fecha_creacion = ahora - timedelta(minutes=aleatorio.randint(0, 180 * 24 * 60))
+        fila = {
+            'titulo': f'Tarea {i + 1}',
+            'descripcion': f'Descripción de la tarea {i + 1} ' + 'con detalle ' * aleatorio.randint(0, 12),
+            'estado': estados[i],
+            'prioridad': prioridades[i],
+            'created_by': creador,
+            'assigned_to': asignado,
+            'fecha_creacion': fecha_creacion,
+            'fecha_completada': (fecha_creacion + timedelta(hours=aleatorio.randint(1, 24 * 14))
+                                 if estados[i] == 'completada' else None),
+            'attachment_id': None, 'archivo': None, 'nombre_archivo': None,
+        }
+        if blobs and i < con_adjunto:
+            blob = aleatorio.choice(blobs)
+            blob['referencias'] += 1
+            fila.update(attachment_id=blob['id'], archivo=blob['ruta'], nombre_archivo=blob['nombre'])
+        filas.append(fila)
+    aleatorio.shuffle(filas)
+
+    with crear_sesion(ruta_db) as sesion:
+        sesion.execute(insert(User), usuarios)
+        usados = [{k: v for k, v in b.items() if k != 'nombre'} for b in blobs if b['referencias']]
+        if usados:
+            sesion.execute(insert(Attachment), usados)
+        for inicio in range(0, len(filas), LOTE):
+            sesion.execute(insert(Task), filas[inicio:inicio + LOTE])
+        # Las inserciones en bloque no pasan por los after_flush: task_stats y task_rollup_dia se calculan aquí
+        totales = Counter(clave for fila in filas
+                          for clave in claves_contador(fila['created_by'], fila['assigned_to'], fila['estado']))
+        sesion.execute(insert(TaskStats), [
+            {'user_id': user_id, 'rol': rol, 'estado': estado, 'total': total}
+            for (user_id, rol, estado), total in totales.items()
+        ])
+        rollups = Counter(clave_rollup(fila['created_by'], fila['assigned_to'], fila['estado'], fila['prioridad'],
+                                       fila['fecha_creacion'], fila['fecha_completada']) for fila in filas)
+        rollups.pop(None, None)
+        sesion.execute(insert(TaskRollupDia), [
+            {'created_by': created_by, 'dia': dia, 'assigned_to': assigned_to, 'prioridad': prioridad,
+             'cubo': cubo, 'total': total}
+            for (created_by, dia, assigned_to, prioridad, cubo), total in rollups.items()
+        ])
+        sesion.commit()
+    motor.dispose()
+
+    return {
+        'ruta_db': ruta_db,
+        'uploads': carpeta_uploads,
+        'lideres': [u['username'] for u in usuarios if u['role'] == 'lider'],
+        'miembros': [u['username'] for u in usuarios if u['role'] == 'miembro'],
+        'tareas': tareas,
+        'adjuntos': [b['ruta'] for b in blobs if b['referencias']],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera datos de prueba para los benchmarks')
+    parser.add_argument('carpeta', help='Carpeta donde crear todo.db y uploads/')
+    parser.add_argument('--lideres', type=int, default=5)
+    parser.add_argument('--miembros', type=int, default=50)
+    parser.add_argument('--tareas', type=int, default=20000)
+    parser.add_argument('--adjuntos', type=float, default=0.2, help='Proporción de tareas con adjunto')
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args()
+
+    print("\n📦 Generando datos de prueba...")
+    resumen = generar(args.carpeta, args.lideres, args.miembros, args.tareas, args.adjuntos, args.semilla)
+    print(f"✅ {len(resumen['lideres'])} líderes, {len(resumen['miembros'])} miembros, "
+          f"{resumen['tareas']} tareas, {len(resumen['adjuntos'])} adjuntos distintos")
+    print(f"   Base de datos: {resumen['ruta_db']}")
+    print(f"   Contraseña de todos los usuarios: {CONTRASENA}\n")
+
+if __name__ == '__main__':
+    main()
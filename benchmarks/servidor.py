@@ -0,0 +1,65 @@
+"""
+Aplicación y servidor para los benchmarks de carga (ver carga.py)
+
+    gunicorn -c gunicorn.conf.py --pythonpath benchmarks servidor:app   (BENCH_CARPETA=...)
+    python benchmarks/servidor.py CARPETA --puerto 8001 --procesos 4     (sin gunicorn)
+
+La aplicación usa la base de datos y los adjuntos generados por datos.py en
+BENCH_CARPETA y añade a cada respuesta la cabecera X-Consultas-SQL.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def crear_app_benchmark(carpeta, **extra):
+    """create_app() sobre los datos generados en `carpeta`"""
+    ruta_db = os.path.join(os.path.abspath(carpeta), 'todo.db')
+    config = {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta_db}',
+        'SQLALCHEMY_BINDS': {
+            'lectura': {
+                'url': f'sqlite:///file:{ruta_db}?mode=ro&uri=true',
+                'pool_size': 5,
+                'max_overflow': 10,
+                'pool_timeout': 30,
+            }
+        },
+        'UPLOAD_FOLDER': os.path.join(os.path.abspath(carpeta), 'uploads'),
+        'TRABAJOS_EN_PROCESO': False,
+        'SQL_CABECERA_CONSULTAS': True,
+        # Todas las peticiones llegan desde 127.0.0.1: sin límite de intentos de login
+        'LOGIN_RAFAGA_IP': 10**9,
+        'LOGIN_RAFAGA_USUARIO': 10**9,
+    }
+    config.update(extra)
+    return create_app(config)
+
+# Para gunicorn: la carpeta llega por el entorno
+app = crear_app_benchmark(os.environ['BENCH_CARPETA']) if os.environ.get('BENCH_CARPETA') else None
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor multiproceso de Werkzeug para los benchmarks')
+    parser.add_argument('carpeta')
+    parser.add_argument('--puerto', type=int, default=8001)
+    parser.add_argument('--procesos', type=int, default=4)
+    args = parser.parse_args()
+
+    from werkzeug.serving import run_simple
+    from extensions import db
+
+    # Cada petición ya es un proceso aparte: las contraseñas se verifican en él, sin pool
+    app = crear_app_benchmark(args.carpeta, CONTRASENAS_PROCESOS=0)
+    # Cada proceso hijo debe abrir sus propias conexiones: no heredar las del pool
+    with app.app_context():
+        for motor in db.engines.values():
+            motor.dispose()
+    # Un proceso por petición (fork) hasta --procesos a la vez
+    run_simple('127.0.0.1', args.puerto, app, processes=args.procesos, threaded=False, use_reloader=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""
+Blueprints de la aplicación.
+Se importan dentro de registrar_blueprints() (llamada desde create_app()), así
+importar models o los scripts de mantenimiento no carga las vistas.
+"""
+
+def registrar_blueprints(app):
+    from blueprints.auth import bp as auth_bp
+    from blueprints.tareas import bp as tareas_bp
+    from blueprints.lider import bp as lider_bp
+    from blueprints.lotes import bp as lotes_bp
+    from blueprints.exportacion import bp as exportacion_bp
+    from blueprints.busqueda import bp as busqueda_bp
+    from blueprints.api import bp as api_bp
+    from blueprints.eventos import bp as eventos_bp
+    from blueprints.metricas import bp as metricas_bp
+    from blueprints.archivos import bp as archivos_bp
+    from blueprints.comandos import bp as comandos_bp
+
+    for bp in (auth_bp, tareas_bp, lider_bp, lotes_bp, exportacion_bp, busqueda_bp, api_bp, eventos_bp,
+               metricas_bp, archivos_bp, comandos_bp):
+        app.register_blueprint(bp)
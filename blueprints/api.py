@@ -0,0 +1,209 @@
+"""
+API JSON de solo lectura (versión 1)
+
+    GET /api/v1/tareas?rol=creador|asignado&usuario=<id>&orden=creacion|prioridad|completada|asignado
+                      &cursor=...&limite=50&fields=id,titulo,estado
+    GET /api/v1/tareas/<id>?fields=...
+    GET /api/v1/miembros
+    GET /api/v1/analytics?desde=2025-01-01&hasta=2025-12-31&miembro=<id>
+
+Las filas se leen con SELECT de las columnas pedidas, sin crear objetos del ORM.
+Las respuestas de tareas llevan una ETag basada en la versión del usuario
+consultado (user_version): mientras no cambie ninguna de sus tareas, una petición
+con If-None-Match recibe 304 sin ejecutar la consulta del listado.
+"""
+
+from flask import Blueprint, Response, current_app, request, jsonify
+from sqlalchemy import select
+from functools import wraps
+
+from analitica import informe, rango_fechas
+from consultas import (ORDEN_POR_DEFECTO, ORDENES, codificar_cursor, columnas_orden, condicion_cursor,
+                       criterios_orden)
+from extensions import db
+from models import User, Task, UserVersion
+from usuarios import usuario_actual
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Campos que se pueden pedir con ?fields= y su columna
+CAMPOS_TAREA = {
+    'id': Task.id,
+    'titulo': Task.titulo,
+    'descripcion': Task.descripcion,
+    'estado': Task.estado,
+    'prioridad': Task.prioridad,
+    'nombre_archivo': Task.nombre_archivo,
+    'created_by': Task.created_by,
+    'assigned_to': Task.assigned_to,
+    'fecha_creacion': Task.fecha_creacion,
+    'fecha_completada': Task.fecha_completada,
+}
+CAMPOS_FECHA = {'fecha_creacion', 'fecha_completada'}
+
+class ErrorApi(Exception):
+    def __init__(self, mensaje, status=400):
+        super().__init__(mensaje)
+        self.status = status
+
+@bp.errorhandler(ErrorApi)
+def responder_error_api(e):
+    return jsonify({'error': str(e)}), e.status
+
+def api_login_required(f):
+    """Como login_required, pero responde 401 en JSON en lugar de redirigir al login"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if usuario_actual() is None:
+            raise ErrorApi('Debes iniciar sesión primero', 401)
+        return f(*args, **kwargs)
+    return decorated_function
+
+# ==================== SERIALIZACIÓN ====================
+
+def campos_pedidos():
+    """Campos de ?fields= (todos si no se indica); 'id' siempre se incluye"""
+    fields = request.args.get('fields')
+    if not fields:
+        return list(CAMPOS_TAREA)
+    campos = [campo.strip() for campo in fields.split(',') if campo.strip()]
+    desconocidos = [campo for campo in campos if campo not in CAMPOS_TAREA]
+    if desconocidos:
+        raise ErrorApi(f"Campos no válidos: {', '.join(desconocidos)}")
+    return ['id'] + [campo for campo in campos if campo != 'id']
+
+def serializar(fila, campos):
+    datos = {}
+    for campo in campos:
+        valor = getattr(fila, campo)
+        if campo in CAMPOS_FECHA and valor is not None:
+            valor = valor.isoformat()
+        datos[campo] = valor
+    return datos
+
+# ==================== PETICIONES CONDICIONALES ====================
+
+def version_de(user_id):
+    """(version, fecha_modificacion) de las tareas de un usuario; (0, None) si nunca cambiaron"""
+    fila = db.session.execute(
+        select(UserVersion.version, UserVersion.fecha_modificacion).where(UserVersion.user_id == user_id)
+    ).first()
+    return (fila.version, fila.fecha_modificacion) if fila else (0, None)
+
+def respuesta_condicional(etag, fecha_modificacion, generar):
+    """
+    Devuelve 304 si el cliente ya tiene la versión `etag`; si no, llama a `generar()`
+    para construir la respuesta. Los clientes deben revalidar siempre (no-cache).
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = generar()
+    response.set_etag(etag)
+    if fecha_modificacion:
+        response.last_modified = fecha_modificacion
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+# ==================== RUTAS ====================
+
+@bp.route('/tareas')
+@api_login_required
+def listar_tareas():
+    """Tareas creadas por (rol=creador) o asignadas a (rol=asignado) un usuario, paginadas por cursor"""
+    user = usuario_actual()
+    usuario_id = request.args.get('usuario', user.id, type=int)
+    if usuario_id != user.id and user.role != 'lider':
+        raise ErrorApi('No tienes permisos para ver las tareas de otro usuario', 403)
+    rol = request.args.get('rol') or ('creador' if user.role == 'lider' and usuario_id == user.id else 'asignado')
+    if rol not in ('creador', 'asignado'):
+        raise ErrorApi("rol debe ser 'creador' o 'asignado'")
+    limite = min(request.args.get('limite', current_app.config['TAREAS_POR_PAGINA'], type=int),
+                 current_app.config['API_LIMITE_MAXIMO'])
+    limite = max(limite, 1)
+    orden = request.args.get('orden') or ORDEN_POR_DEFECTO
+    if orden not in ORDENES:
+        raise ErrorApi(f"orden debe ser uno de: {', '.join(ORDENES)}")
+    cursor = request.args.get('cursor')
+    # Se comprueba antes de la respuesta condicional: un cursor roto no debe dar 304
+    if cursor and condicion_cursor(cursor, orden) is None:
+        raise ErrorApi('cursor no válido')
+    campos = campos_pedidos()
+
+    version, fecha_modificacion = version_de(usuario_id)
+    etag = f"{usuario_id}-{version}"
+
+    def generar():
+        columna = Task.created_by if rol == 'creador' else Task.assigned_to
+        # Las columnas del orden siempre se leen: forman el cursor
+        columnas = {campo: CAMPOS_TAREA[campo] for campo in set(campos) | set(columnas_orden(orden))}
+        consulta = select(*(c.label(nombre) for nombre, c in columnas.items())).where(columna == usuario_id)
+        condicion = condicion_cursor(cursor, orden)
+        if condicion is not None:
+            consulta = consulta.where(condicion)
+        filas = db.session.execute(
+            consulta.order_by(*criterios_orden(orden)).limit(limite + 1)
+        ).all()
+
+        cursor_siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            cursor_siguiente = codificar_cursor(filas[-1], orden)
+        return jsonify({
+            'tareas': [serializar(fila, campos) for fila in filas],
+            'cursor_siguiente': cursor_siguiente,
+        })
+
+    return respuesta_condicional(etag, fecha_modificacion, generar)
+
+@bp.route('/tareas/<int:id>')
+@api_login_required
+def ver_tarea(id):
+    user = usuario_actual()
+    campos = campos_pedidos()
+    fila = db.session.execute(
+        select(*(CAMPOS_TAREA[campo].label(campo) for campo in set(campos) | {'created_by', 'assigned_to'}))
+        .where(Task.id == id)
+    ).first()
+    if fila is None:
+        raise ErrorApi('Tarea no encontrada', 404)
+    if user.role != 'lider' and user.id not in (fila.created_by, fila.assigned_to):
+        raise ErrorApi('No tienes permisos para ver esta tarea', 403)
+
+    # Cualquier cambio en la tarea sube la versión de su creador
+    version, fecha_modificacion = version_de(fila.created_by)
+    return respuesta_condicional(f"t{id}-{version}", fecha_modificacion,
+                                 lambda: jsonify(serializar(fila, campos)))
+
+@bp.route('/miembros')
+@api_login_required
+def listar_miembros():
+    """Miembros del equipo (solo líderes); la ETag se calcula sobre el contenido"""
+    if usuario_actual().role != 'lider':
+        raise ErrorApi('No tienes permisos para ver los miembros', 403)
+    filas = db.session.execute(
+        select(User.id, User.username, User.nombre).where(User.role == 'miembro').order_by(User.id)
+    ).mappings().all()
+    response = jsonify({'miembros': [dict(fila) for fila in filas]})
+    response.add_etag()
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@bp.route('/analytics')
+@api_login_required
+def analytics():
+    """Productividad de los miembros del equipo: completadas por miembro, día y semana y duración por prioridad"""
+    user = usuario_actual()
+    if user.role != 'lider':
+        raise ErrorApi('No tienes permisos para ver la analítica', 403)
+    try:
+        desde, hasta = rango_fechas(request.args.get('desde'), request.args.get('hasta'),
+                                    current_app.config['ANALITICA_DIAS'], current_app.config['ANALITICA_DIAS_MAXIMO'])
+    except ValueError as e:
+        raise ErrorApi(str(e))
+    response = jsonify(informe(db.session, desde, hasta, request.args.get('miembro', type=int)))
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,86 @@
+"""
+Descarga y eliminación de archivos adjuntos
+"""
+
+from flask import Blueprint, Response, current_app, redirect, url_for, flash, send_from_directory
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+import mimetypes
+import os
+import re
+
+from adjuntos import liberar_adjunto
+from extensions import db
+from models import Task
+from shards import carpeta_uploads
+from usuarios import login_required, usuario_actual
+
+bp = Blueprint('archivos', __name__)
+
+# ==================== MANEJO DE ARCHIVOS ====================
+
+# Rutas del almacén por contenido: ab/cd/<sha256>.<ext> y sus miniaturas ab/cd/<sha256>.thumb.<ext>
+RUTA_POR_CONTENIDO = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60}(?:\.thumb)?)\.\w+$')
+
+@bp.route('/uploads/<path:filename>')
+@login_required
+def uploaded_file(filename):
+    """
+    Sirve archivos subidos con ETag, respuestas 304 (If-None-Match / If-Modified-Since)
+    y peticiones parciales (Range). Los adjuntos direccionados por contenido usan el
+    SHA-256 como ETag fuerte y se marcan como inmutables.
+    """
+    por_contenido = RUTA_POR_CONTENIDO.match(filename)
+    etag = por_contenido.group(3) if por_contenido else True
+    max_age = current_app.config['UPLOADS_MAX_AGE'] if por_contenido else None
+
+    try:
+        if current_app.config['UPLOADS_ENVIO'] == 'x-accel':
+            response = enviar_con_x_accel(filename, etag)
+        else:
+            response = send_from_directory(carpeta_uploads(), filename,
+                                           conditional=True, etag=etag, max_age=max_age)
+    except (FileNotFoundError, NotFound):
+        flash('Archivo no encontrado', 'danger')
+        return redirect(url_for('tareas.dashboard'))
+
+    # Solo usuarios autenticados: se puede cachear en el navegador, no en proxies compartidos
+    response.cache_control.private = True
+    response.cache_control.public = False
+    if por_contenido:
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+    return response
+
+def enviar_con_x_accel(filename, etag):
+    """Delega la transferencia a nginx (X-Accel-Redirect); nginx resuelve Range y 304"""
+    archivo_path = safe_join(os.path.abspath(carpeta_uploads()), filename)
+    if archivo_path is None or not os.path.isfile(archivo_path):
+        raise NotFound()
+
+    # Ruta bajo UPLOAD_FOLDER, con la carpeta del shard si la hay
+    relativa = os.path.relpath(archivo_path, os.path.abspath(current_app.config['UPLOAD_FOLDER'])).replace(os.sep, '/')
+    response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    response.headers['X-Accel-Redirect'] = current_app.config['UPLOADS_X_ACCEL_PREFIJO'] + relativa
+    if isinstance(etag, str):
+        response.set_etag(etag)
+    return response
+
+@bp.route('/tarea/<int:id>/eliminar-archivo', methods=['POST'])
+@login_required
+def eliminar_archivo(id):
+    """Elimina el archivo adjunto de una tarea"""
+    tarea = Task.query.get_or_404(id)
+    user = usuario_actual()
+    
+    # Verificar permisos
+    if tarea.created_by != user.id and user.role != 'lider':
+        flash('No tienes permisos para eliminar este archivo', 'danger')
+        return redirect(url_for('tareas.dashboard'))
+    
+    # Liberar la referencia; el archivo solo se borra si ninguna otra tarea lo usa
+    liberar_adjunto(tarea)
+    db.session.commit()
+    
+    flash('Archivo eliminado', 'success')
+    return redirect(url_for('tareas.detalle_tarea', id=id))
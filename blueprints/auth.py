@@ -0,0 +1,123 @@
+"""
+Rutas de autenticación e inicialización
+"""
+
+from flask import Blueprint, make_response, render_template, request, redirect, url_for, flash, session
+import math
+
+from contrasenas import PoolSaturado, limite_ip, limite_usuario, pool_contrasenas
+from extensions import db
+from models import User
+import shards
+
+bp = Blueprint('auth', __name__)
+
+# ==================== RUTAS DE AUTENTICACIÓN ====================
+
+@bp.route('/')
+def index():
+    if 'user_id' in session:
+        return redirect(url_for('tareas.dashboard'))
+    return redirect(url_for('auth.login'))
+
+def login_rechazado(mensaje, status, espera):
+    """Vuelve al formulario de login con un 429/503 y la cabecera Retry-After"""
+    flash(mensaje, 'warning')
+    response = make_response(render_template('login.html'), status)
+    response.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+    return response
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        
+        # Límite de intentos por IP (todos) y por usuario (solo los fallidos), en cada proceso.
+        # Detrás de un proxy la IP sale de X-Forwarded-For (PROXY_SALTOS)
+        espera = limite_ip.consumir(request.remote_addr) or limite_usuario.espera(username)
+        if espera:
+            return login_rechazado('Demasiados intentos de inicio de sesión. Espera unos segundos.', 429, espera)
+        
+        shards.shard_del_login(username)
+        user = User.query.filter_by(username=username).first()
+        
+        valida = False
+        if user:
+            # La verificación (scrypt) se calcula en el pool de procesos, no en este hilo
+            try:
+                valida, nuevo_hash = pool_contrasenas.verificar(user.password, password or '')
+            except PoolSaturado:
+                return login_rechazado('Hay muchos inicios de sesión a la vez. Inténtalo de nuevo en unos segundos.',
+                                       503, 2)
+        
+        if valida:
+            if nuevo_hash:
+                # Hash con parámetros antiguos: se guarda el recalculado con los actuales
+                user.password = nuevo_hash
+                db.session.commit()
+            session['user_id'] = user.id
+            session['shard'] = shards.shard_actual()
+            session['username'] = user.username
+            session['role'] = user.role
+            session['nombre'] = user.nombre
+            flash(f'¡Bienvenido {user.nombre}!', 'success')
+            return redirect(url_for('tareas.dashboard'))
+        else:
+            limite_usuario.consumir(username)
+            flash('Usuario o contraseña incorrectos', 'danger')
+    
+    return render_template('login.html')
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Sesión cerrada exitosamente', 'info')
+    return redirect(url_for('auth.login'))
+
+# ==================== INICIALIZACIÓN ====================
+
+@bp.route('/setup')
+def setup():
+    """Ruta para crear usuarios de prueba - ELIMINAR EN PRODUCCIÓN"""
+    db.create_all()
+    # Con shards los usuarios de prueba forman el primer equipo
+    shards.usar_shard(shards.nombres()[0])
+    
+    # Verificar si ya existen usuarios
+    if User.query.first():
+        return "La base de datos ya está inicializada"
+    
+    # Crear un líder
+    lider = User(
+        username='lider1',
+        password=pool_contrasenas.generar('lider123'),
+        role='lider',
+        nombre='Juan Pérez'
+    )
+    
+    # Crear miembros del equipo
+    miembro1 = User(
+        username='miembro1',
+        password=pool_contrasenas.generar('miembro123'),
+        role='miembro',
+        nombre='María García'
+    )
+    
+    miembro2 = User(
+        username='miembro2',
+        password=pool_contrasenas.generar('miembro123'),
+        role='miembro',
+        nombre='Carlos López'
+    )
+    
+    db.session.add_all([lider, miembro1, miembro2])
+    db.session.commit()
+    
+    return """
+    Base de datos inicializada con usuarios de prueba:<br><br>
+    <b>Líder:</b> usuario: lider1, contraseña: lider123<br>
+    <b>Miembro 1:</b> usuario: miembro1, contraseña: miembro123<br>
+    <b>Miembro 2:</b> usuario: miembro2, contraseña: miembro123<br><br>
+    <a href="/login">Ir al login</a>
+    """
@@ -0,0 +1,46 @@
+"""
+Búsqueda de tareas (índice FTS5, ver consultas.buscar_tareas)
+"""
+
+from flask import Blueprint, render_template, request, jsonify
+
+from consultas import ORDENES, buscar_tareas, listar_miembros
+from models import ESTADOS, PRIORIDADES
+from usuarios import login_required, usuario_actual
+
+bp = Blueprint('busqueda', __name__)
+
+@bp.route('/tareas/buscar')
+@login_required
+def buscar():
+    """Búsqueda de tareas; con ?formato=json devuelve los resultados en JSON"""
+    user = usuario_actual()
+    texto = request.args.get('q', '').strip()
+    # Los filtros desconocidos se ignoran: estado y prioridad se comparan por código
+    estado = request.args.get('estado') if request.args.get('estado') in ESTADOS else None
+    prioridad = request.args.get('prioridad') if request.args.get('prioridad') in PRIORIDADES else None
+    asignado = request.args.get('asignado', type=int)
+    pagina = max(request.args.get('pagina', 1, type=int), 1)
+    orden = request.args.get('orden') if request.args.get('orden') in ORDENES else None
+
+    tareas, hay_mas = buscar_tareas(texto, user, estado, prioridad, asignado, pagina, orden=orden)
+
+    if request.args.get('formato') == 'json':
+        return jsonify({
+            'pagina': pagina,
+            'hay_mas': hay_mas,
+            'tareas': [{
+                'id': t.id,
+                'titulo': t.titulo,
+                'descripcion': t.descripcion,
+                'estado': t.estado,
+                'prioridad': t.prioridad,
+                'nombre_archivo': t.nombre_archivo,
+                'asignado': t.asignado.nombre if t.asignado else None,
+                'fecha_creacion': t.fecha_creacion.isoformat(),
+            } for t in tareas]
+        })
+
+    miembros = listar_miembros() if user.role == 'lider' else []
+    return render_template('buscar_tareas.html', tareas=tareas, hay_mas=hay_mas,
+                         pagina=pagina, texto=texto, miembros=miembros)
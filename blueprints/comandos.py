@@ -0,0 +1,110 @@
+"""
+Comandos de mantenimiento: flask --app app <comando>
+"""
+
+from flask import Blueprint, current_app
+from sqlalchemy import and_
+import click
+
+from archivado import archivar_completadas
+from contrasenas import hash_contrasena
+from consultas import reconstruir_contadores, reconstruir_indice_busqueda
+from exportacion import FORMATOS, exportar, formato_de, importar_tareas, leer_filas
+from extensions import db
+from models import Task, TaskStats, User
+from trabajos import lanzar_trabajadores
+
+# cli_group=None: los comandos se registran en la raíz (flask reconciliar-estadisticas, ...)
+bp = Blueprint('comandos', __name__, cli_group=None)
+
+@bp.cli.command('reconciliar-estadisticas')
+def reconciliar_estadisticas_command():
+    """Reconstruye la tabla task_stats (ejecutar tras migrar una base de datos existente)"""
+    reconstruir_contadores()
+    print(f"✅ Contadores reconstruidos: {TaskStats.query.count()} filas en task_stats")
+
+@bp.cli.command('reconstruir-busqueda')
+def reconstruir_busqueda_command():
+    """Crea o reconstruye el índice de búsqueda (necesario en bases de datos existentes)"""
+    reconstruir_indice_busqueda()
+    print("✅ Índice de búsqueda reconstruido")
+
+@bp.cli.command('procesar-trabajos')
+@click.option('--una-vez', is_flag=True, help='Vacía la cola y termina en lugar de quedarse esperando')
+def procesar_trabajos_command(una_vez):
+    """Ejecuta los trabajadores de la cola en primer plano (miniaturas de adjuntos)"""
+    for hilo in lanzar_trabajadores(current_app._get_current_object(), daemon=False, una_vez=una_vez):
+        hilo.join()
+    print("✅ Cola de trabajos vacía")
+
+@bp.cli.command('archivar-tareas')
+@click.option('--dias', type=int, help='Archivar las completadas hace más de estos días (por defecto ARCHIVO_DIAS)')
+@click.option('--lote', type=int, help='Tareas por transacción (por defecto ARCHIVO_LOTE)')
+def archivar_tareas_command(dias, lote):
+    """Mueve a task_archive las tareas completadas hace tiempo (se puede interrumpir y repetir)"""
+    dias = dias if dias is not None else current_app.config['ARCHIVO_DIAS']
+    total = archivar_completadas(db.session, dias, lote or current_app.config['ARCHIVO_LOTE'],
+                                 current_app.config['ARCHIVO_PAUSA'],
+                                 progreso=lambda total: print(f"📦 {total} tareas archivadas..."))
+    print(f"✅ Archivado terminado: {total} tareas completadas hace más de {dias} días")
+
+def usuario_por_nombre(username):
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.BadParameter(f'El usuario {username} no existe')
+    return user
+
+@bp.cli.command('crear-usuario')
+@click.argument('username')
+@click.option('--nombre', required=True)
+@click.option('--rol', type=click.Choice(['lider', 'miembro']), default='miembro')
+@click.password_option('--contrasena')
+def crear_usuario_command(username, nombre, rol, contrasena):
+    """Crea un usuario; con shards, en el equipo de la variable SHARD"""
+    if current_app.config['SHARDS'] and not current_app.config['SHARD_COMANDOS']:
+        raise click.UsageError(f"Indica el equipo con SHARD=<{'|'.join(current_app.config['SHARDS'])}>")
+    if User.query.filter_by(username=username).first():
+        raise click.BadParameter(f'El usuario {username} ya existe')
+    db.session.add(User(username=username, nombre=nombre, role=rol, password=hash_contrasena(contrasena)))
+    db.session.commit()
+    print(f"✅ Usuario {username} creado" + (f" en el equipo {current_app.config['SHARD_COMANDOS']}"
+                                            if current_app.config['SHARDS'] else ''))
+
+@bp.cli.command('exportar-tareas')
+@click.option('--formato', type=click.Choice(FORMATOS), default='csv')
+@click.option('--salida', default='-', help='Archivo de salida (por defecto la salida estándar)')
+@click.option('--creador', help='Solo las tareas creadas por este usuario')
+@click.option('--asignado', help='Solo las tareas asignadas a este usuario')
+@click.option('--lote', type=int, help='Filas leídas del cursor cada vez (por defecto EXPORTACION_LOTE)')
+def exportar_tareas_command(formato, salida, creador, asignado, lote):
+    """Exporta las tareas a CSV o NDJSON sin cargarlas en memoria"""
+    condiciones = []
+    if creador:
+        condiciones.append(Task.created_by == usuario_por_nombre(creador).id)
+    if asignado:
+        condiciones.append(Task.assigned_to == usuario_por_nombre(asignado).id)
+    condicion = and_(*condiciones) if condiciones else None
+    with click.open_file(salida, 'w', encoding='utf-8') as archivo:
+        for trozo in exportar(db.session, formato, condicion, lote or current_app.config['EXPORTACION_LOTE']):
+            archivo.write(trozo)
+    if salida != '-':
+        print(f"✅ Tareas exportadas a {salida}")
+
+@bp.cli.command('importar-tareas')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', type=click.Choice(FORMATOS), help='Por defecto según la extensión del archivo')
+@click.option('--creador', help="Crea todas las tareas a nombre de este usuario (si no, se usa la columna 'creador')")
+@click.option('--lote', type=int, help='Filas por INSERT y transacción (por defecto IMPORTACION_LOTE)')
+def importar_tareas_command(archivo, formato, creador, lote):
+    """Importa tareas de un CSV o NDJSON; las filas no válidas se saltan y se listan al final"""
+    creador_id = usuario_por_nombre(creador).id if creador else None
+    with open(archivo, encoding='utf-8-sig', newline='') as texto:
+        importadas, rechazadas, errores = importar_tareas(
+            db.session, leer_filas(texto, formato or formato_de(archivo)), creador_id,
+            lote or current_app.config['IMPORTACION_LOTE'],
+            progreso=lambda total: print(f"📥 {total} tareas importadas..."))
+    for error in errores:
+        print(f"⚠️  Fila {error['fila']}: {error['error']}")
+    if rechazadas > len(errores):
+        print(f"⚠️  ... y {rechazadas - len(errores)} filas no válidas más")
+    print(f"✅ Importación terminada: {importadas} tareas importadas, {rechazadas} filas rechazadas")
@@ -0,0 +1,71 @@
+"""
+Flujo de eventos del usuario (Server-Sent Events)
+
+    GET /eventos        text/event-stream con eventos 'tarea' (ver eventos.py)
+
+Cada conexión ocupa un hilo del servidor mientras está abierta; se cierra a los
+EVENTOS_DURACION segundos y el navegador vuelve a conectar enviando Last-Event-ID,
+con lo que recibe los eventos que se hubiera perdido. Con EVENTOS_MAX_CONEXIONES
+conexiones abiertas en el proceso las siguientes reciben 503, así los dashboards no
+dejan sin hilos al resto de rutas (en producción /eventos va a su propio servidor,
+ver gunicorn_eventos.conf.py).
+"""
+
+from flask import Blueprint, Response, current_app, jsonify, request
+import queue
+import time
+
+import eventos
+from usuarios import login_required, usuario_actual
+
+bp = Blueprint('eventos', __name__)
+
+def formato_sse(evento_id, tipo, datos):
+    return f"id: {evento_id}\nevent: {tipo}\ndata: {datos}\n\n"
+
+@bp.route('/eventos')
+@login_required
+def stream():
+    user_id = usuario_actual().id
+    latido = current_app.config['EVENTOS_LATIDO']
+    duracion = current_app.config['EVENTOS_DURACION']
+    bus = eventos.bus
+    maximo = current_app.config['EVENTOS_MAX_CONEXIONES']
+    if maximo is not None and bus.conexiones() >= maximo:
+        # EventSource no reintenta tras un error HTTP: la página sigue funcionando sin tiempo real
+        response = jsonify({'error': 'Demasiadas conexiones de tiempo real abiertas'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(latido)
+        return response
+
+    # Primero la suscripción y después los pendientes: así no se pierde nada entre medias
+    cola = bus.suscribir(user_id)
+    ultimo_id = request.headers.get('Last-Event-ID', type=int)
+    pendientes = bus.pendientes(user_id, ultimo_id) if ultimo_id is not None else []
+
+    def generar():
+        try:
+            yield "retry: 3000\n\n"
+            for evento in pendientes:
+                yield formato_sse(*evento)
+            # Los eventos confirmados entre la suscripción y la lectura de los pendientes
+            # llegan también a la cola: no se envían dos veces
+            enviados = {evento_id for evento_id, tipo, datos in pendientes}
+            fin = time.monotonic() + duracion
+            while time.monotonic() < fin:
+                try:
+                    evento = cola.get(timeout=latido)
+                except queue.Empty:
+                    yield ": latido\n\n"
+                    continue
+                evento_id, tipo, datos = evento
+                if tipo != 'recargar' and evento_id in enviados:
+                    continue
+                yield formato_sse(*evento)
+        finally:
+            bus.cancelar(user_id, cola)
+
+    response = Response(generar(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx no debe acumular el flujo
+    return response
@@ -0,0 +1,72 @@
+"""
+Exportación e importación de tareas (ver exportacion.py)
+
+    GET  /tareas/exportar?formato=csv|ndjson[&asignado=<id>]
+    POST /tareas/importar    (multipart, campo 'archivo': .csv o .ndjson)
+
+Un líder exporta las tareas que creó (opcionalmente solo las de un miembro) y un
+miembro las que tiene asignadas. La respuesta se genera mientras se leen las filas.
+La importación crea las tareas a nombre del líder; si alguna fila no es válida no
+se crea ninguna y se responde 400 con los errores.
+"""
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context
+from datetime import datetime
+import io
+
+from exportacion import FORMATOS, TIPOS_MIME, exportar, formato_de, importar_tareas, leer_filas
+from extensions import db
+from models import Task
+from usuarios import login_required, lider_required, usuario_actual
+
+bp = Blueprint('exportacion', __name__, url_prefix='/tareas')
+
+@bp.route('/exportar')
+@login_required
+def exportar_tareas():
+    user = usuario_actual()
+    formato = request.args.get('formato', 'csv')
+    if formato not in FORMATOS:
+        abort(400)
+    if user.role == 'lider':
+        condicion = Task.created_by == user.id
+        asignado = request.args.get('asignado', type=int)
+        if asignado:
+            condicion = condicion & (Task.assigned_to == asignado)
+    else:
+        condicion = Task.assigned_to == user.id
+
+    # stream_with_context mantiene la sesión (y el bind de lectura) mientras se genera la respuesta
+    trozos = exportar(db.session, formato, condicion, current_app.config['EXPORTACION_LOTE'])
+    response = Response(stream_with_context(trozos), mimetype=TIPOS_MIME[formato])
+    nombre = f"tareas-{datetime.utcnow():%Y%m%d}.{formato}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@bp.route('/importar', methods=['POST'])
+@lider_required
+def importar():
+    archivo = request.files.get('archivo')
+    if archivo is None or not archivo.filename:
+        return jsonify({'error': "Envía el archivo en el campo 'archivo'"}), 400
+    formato = request.form.get('formato') or formato_de(archivo.filename)
+    if formato not in FORMATOS:
+        return jsonify({'error': f"formato debe ser uno de: {', '.join(FORMATOS)}"}), 400
+
+    # El archivo se lee línea a línea desde el stream de la subida
+    texto = io.TextIOWrapper(archivo.stream, encoding='utf-8-sig', newline='')
+    try:
+        importadas, rechazadas, errores = importar_tareas(
+            db.session, leer_filas(texto, formato), creador_id=usuario_actual().id,
+            lote=current_app.config['IMPORTACION_LOTE'], confirmar=False)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'El archivo debe estar en UTF-8'}), 400
+
+    if rechazadas:
+        db.session.rollback()
+        return jsonify({'error': f'{rechazadas} filas no válidas; no se ha importado ninguna',
+                        'errores': errores}), 400
+    db.session.commit()
+    return jsonify({'importadas': importadas}), 201
@@ -0,0 +1,88 @@
+"""
+Rutas exclusivas de los líderes de equipo
+"""
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash
+
+from analitica import PERCENTILES, informe, rango_fechas
+from consultas import (conteos_por_miembro, estadisticas_de, listar_miembros, orden_pedido, ordenar,
+                       recientes_por_miembro, resumen_equipo, tareas_archivadas_asignadas_a, tareas_asignadas_a)
+from eventos import responder_accion
+from extensions import db
+from models import User, Task
+from shards import en_paralelo
+from usuarios import lider_required, usuario_actual
+
+bp = Blueprint('lider', __name__)
+
+# ==================== RUTAS PARA LÍDERES ====================
+
+@bp.route('/lider/tareas-por-miembro')
+@lider_required
+def tareas_por_miembro():
+    miembros = listar_miembros()
+    conteos = conteos_por_miembro()
+    recientes = recientes_por_miembro(3)
+    tareas_por_miembro = {}
+    
+    for miembro in miembros:
+        estados = conteos.get(miembro.id, {})
+        tareas_por_miembro[miembro] = {
+            'recientes': recientes.get(miembro.id, []),
+            'total': sum(estados.values()),
+            'pendientes': estados.get('pendiente', 0),
+            'en_progreso': estados.get('en_progreso', 0),
+            'completadas': estados.get('completada', 0)
+        }
+    
+    return render_template('tareas_por_miembro.html', tareas_por_miembro=tareas_por_miembro)
+
+@bp.route('/lider/equipos')
+@lider_required
+def equipos():
+    """Resumen de todos los equipos; con shards cada uno se lee de su base de datos, a la vez"""
+    return render_template('equipos.html', equipos=en_paralelo(resumen_equipo))
+
+@bp.route('/lider/analytics')
+@lider_required
+def analytics():
+    """Tareas completadas por miembro y semana y tiempo hasta completarlas por prioridad"""
+    dias, maximo = current_app.config['ANALITICA_DIAS'], current_app.config['ANALITICA_DIAS_MAXIMO']
+    try:
+        desde, hasta = rango_fechas(request.args.get('desde'), request.args.get('hasta'), dias, maximo)
+    except ValueError as e:
+        flash(str(e), 'warning')
+        desde, hasta = rango_fechas(dias=dias, maximo=maximo)
+    miembro = request.args.get('miembro', type=int)
+    return render_template('analytics.html', informe=informe(db.session, desde, hasta, miembro),
+                           miembros=listar_miembros(), miembro=miembro, percentiles=PERCENTILES)
+
+@bp.route('/lider/miembro/<int:id>/tareas')
+@lider_required
+def ver_tareas_miembro(id):
+    miembro = User.query.get_or_404(id)
+    if miembro.role != 'miembro':
+        flash('Usuario no válido', 'danger')
+        return redirect(url_for('tareas.dashboard'))
+    
+    orden = orden_pedido()
+    tareas = ordenar(tareas_asignadas_a(id), orden).all()
+    if request.args.get('archivadas'):
+        # Las archivadas van detrás, en el mismo orden
+        tareas += tareas_archivadas_asignadas_a(id, orden).all()
+    return render_template('tareas_miembro.html', miembro=miembro, tareas=tareas, orden=orden,
+                         estadisticas=estadisticas_de(id, 'asignado'))
+
+@bp.route('/tarea/<int:id>/reasignar', methods=['POST'])
+@lider_required
+def reasignar_tarea(id):
+    tarea = Task.query.get_or_404(id)
+    nuevo_asignado = request.form.get('assigned_to')
+    
+    if not nuevo_asignado:
+        return responder_accion('Selecciona un miembro para reasignar la tarea', 'warning',
+                                url_for('tareas.dashboard'), 400)
+    
+    tarea.assigned_to = int(nuevo_asignado)
+    db.session.commit()
+    return responder_accion('Tarea reasignada exitosamente', 'success', url_for('tareas.dashboard'))
@@ -0,0 +1,294 @@
+"""
+Operaciones en lote sobre tareas (API JSON)
+
+    POST /tareas/lote/crear       {"tareas": [{"titulo": "...", "prioridad": "alta", "assigned_to": 2}, ...]}
+    POST /tareas/lote/estado      {"ids": [1, 2, 3], "estado": "completada"}
+    POST /tareas/lote/reasignar   {"filtro": {"asignado": 4}, "assigned_to": 5}
+    POST /tareas/lote/eliminar    {"ids": [1, 2, 3]}
+
+Las tareas se eligen por lista de ids o por filtro (asignado, creador, estado, prioridad).
+Los permisos se comprueban con una sola consulta y los cambios se aplican con un
+UPDATE/DELETE por conjunto en una única transacción. Las sentencias en bloque no pasan
+por los after_flush, así que registrar_cambios() ajusta task_stats y task_rollup_dia,
+sube las versiones (user_version) y publica los eventos de los dashboards.
+"""
+
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import and_, select, update, delete
+from datetime import datetime
+
+from adjuntos import liberar_adjuntos_en_lote
+from eventos import cambio_tarea, datos_tarea, publicar
+from extensions import db
+from models import (ATRIBUTOS_ROLLUP, ESTADOS, MIGRACION_CONTADORES, PRIORIDADES, User, Task,
+                    aplicar_deltas_contadores, aplicar_deltas_rollup, cambios_rollup, clave_rollup,
+                    claves_contador, en_rango, incrementar_versiones, rango_sin_rellenar)
+from usuarios import login_required, lider_required, usuario_actual
+
+bp = Blueprint('lotes', __name__, url_prefix='/tareas/lote')
+
+# Claves del filtro y columna de Task a la que se aplican
+FILTROS = {
+    'asignado': Task.assigned_to,
+    'creador': Task.created_by,
+    'estado': Task.estado,
+    'prioridad': Task.prioridad,
+}
+
+class ErrorLote(Exception):
+    """Petición en lote no válida; se responde con 400 y el mensaje en JSON"""
+
+    def __init__(self, mensaje, errores=None):
+        super().__init__(mensaje)
+        self.errores = errores
+
+@bp.errorhandler(ErrorLote)
+def responder_error_lote(e):
+    cuerpo = {'error': str(e)}
+    if e.errores:
+        cuerpo['errores'] = e.errores
+    return jsonify(cuerpo), 400
+
+def leer_datos():
+    """Cuerpo JSON de la petición (debe ser un objeto)"""
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        raise ErrorLote('El cuerpo de la petición debe ser un objeto JSON')
+    return datos
+
+def condicion_seleccion(datos):
+    """
+    Condición SQL para las tareas elegidas con 'ids' o con 'filtro'.
+    Devuelve (condicion, ids); condicion es None si la petición no elige ninguna tarea.
+    Lanza ValueError si los ids no son enteros y ErrorLote si el filtro no es válido.
+    """
+    ids = datos.get('ids')
+    if ids:
+        ids = [int(i) for i in ids]
+        return Task.id.in_(ids), ids
+
+    filtro = datos.get('filtro') or {}
+    if not isinstance(filtro, dict):
+        raise ErrorLote("'filtro' debe ser un objeto")
+    for clave in ('asignado', 'creador'):
+        if clave in filtro and (isinstance(filtro[clave], bool) or not isinstance(filtro[clave], int)):
+            raise ErrorLote(f"Filtro '{clave}' no válido; debe ser el id de un usuario")
+    # estado y prioridad se guardan como códigos: un valor desconocido no se puede comparar
+    for clave, valores in (('estado', ESTADOS), ('prioridad', PRIORIDADES)):
+        if clave in filtro and filtro[clave] not in valores:
+            raise ErrorLote(f"Filtro '{clave}' no válido; usa uno de: {', '.join(valores)}")
+    condiciones = [columna == filtro[clave] for clave, columna in FILTROS.items() if clave in filtro]
+    if condiciones:
+        return and_(*condiciones), None
+    return None, None
+
+def seleccionar_tareas(datos, permitido):
+    """
+    Lee en una sola consulta las tareas elegidas (solo las columnas que hacen falta)
+    y las separa con la función `permitido(fila)`.
+    Devuelve (permitidas, sin_permiso, no_encontradas).
+    """
+    try:
+        condicion, ids = condicion_seleccion(datos)
+    except (TypeError, ValueError):
+        raise ErrorLote('Los ids deben ser números enteros')
+    if condicion is None:
+        raise ErrorLote("Indica las tareas con 'ids' o con 'filtro'")
+
+    limite = current_app.config['LOTE_MAXIMO']
+    filas = db.session.execute(
+        select(Task.id, Task.created_by, Task.assigned_to, Task.estado, Task.prioridad, Task.fecha_creacion,
+               Task.fecha_completada, Task.attachment_id, Task.archivo)
+        .where(condicion)
+        .limit(limite + 1)
+    ).all()
+    if len(filas) > limite:
+        raise ErrorLote(f'La operación afecta a más de {limite} tareas; acota el filtro')
+
+    permitidas = [fila for fila in filas if permitido(fila)]
+    sin_permiso = [fila.id for fila in filas if not permitido(fila)]
+    encontradas = {fila.id for fila in filas}
+    no_encontradas = [i for i in ids if i not in encontradas] if ids else []
+    return permitidas, sin_permiso, no_encontradas
+
+def resumen(permitidas, sin_permiso, no_encontradas):
+    return jsonify({
+        'procesadas': len(permitidas),
+        'ids': [fila.id for fila in permitidas],
+        'sin_permiso': sin_permiso,
+        'no_encontradas': no_encontradas,
+    })
+
+def registrar_cambios(filas, estado=None, assigned_to=None, eliminadas=False, fecha_completada=None):
+    """
+    Hace a mano lo que los after_flush hacen con los cambios del ORM: ajusta task_stats
+    y task_rollup_dia, sube la versión de los usuarios afectados y publica los eventos
+    para los dashboards.
+    """
+    conexion = db.session.connection()
+    rango = rango_sin_rellenar(conexion, MIGRACION_CONTADORES)
+    deltas = {}
+    usuarios = set()
+    cambios = []
+    eventos = []
+    for fila in filas:
+        anterior = {atributo: getattr(fila, atributo) for atributo in ATRIBUTOS_ROLLUP}
+        nuevo = None if eliminadas else {
+            **anterior,
+            'estado': anterior['estado'] if estado is None else estado,
+            'assigned_to': anterior['assigned_to'] if assigned_to is None else assigned_to,
+            'fecha_completada': anterior['fecha_completada'] if fecha_completada is None else fecha_completada,
+        }
+        cambios += cambios_rollup(fila.id, clave_rollup(**anterior), nuevo and clave_rollup(**nuevo))
+
+        antes = datos_tarea(fila.created_by, fila.assigned_to, fila.estado)
+        despues = None if eliminadas else datos_tarea(
+            fila.created_by,
+            fila.assigned_to if assigned_to is None else assigned_to,
+            fila.estado if estado is None else estado)
+        for datos in (antes, despues):
+            if datos:
+                usuarios.update((datos['created_by'], datos['assigned_to']))
+        # Las tareas que el relleno de task_stats aún no ha recorrido las contará él al llegar
+        if not en_rango(rango, fila.id):
+            for clave in claves_contador(**antes):
+                deltas[clave] = deltas.get(clave, 0) - 1
+            if despues:
+                for clave in claves_contador(**despues):
+                    deltas[clave] = deltas.get(clave, 0) + 1
+        eventos += cambio_tarea(fila.id, 'eliminada' if eliminadas else 'actualizada', antes, despues)
+
+    aplicar_deltas_contadores(conexion, deltas)
+    aplicar_deltas_rollup(conexion, cambios)
+    incrementar_versiones(conexion, usuarios)
+    publicar(db.session, eventos)
+
+# ==================== RUTAS ====================
+
+@bp.route('/crear', methods=['POST'])
+@login_required
+def crear_tareas():
+    """Crea varias tareas en una transacción; si alguna fila no es válida no se crea ninguna"""
+    user = usuario_actual()
+    datos = leer_datos()
+    filas = datos.get('tareas')
+    if not isinstance(filas, list) or not filas:
+        raise ErrorLote("Envía una lista de tareas en 'tareas'")
+    if len(filas) > current_app.config['LOTE_MAXIMO']:
+        raise ErrorLote(f"Como máximo {current_app.config['LOTE_MAXIMO']} tareas por petición")
+
+    errores = []
+    nuevas = []
+    for i, fila in enumerate(filas):
+        if not isinstance(fila, dict):
+            errores.append({'fila': i, 'error': 'La tarea debe ser un objeto'})
+            continue
+        if not all(isinstance(fila.get(campo), (str, type(None))) for campo in ('titulo', 'descripcion')):
+            errores.append({'fila': i, 'error': 'El título y la descripción deben ser texto'})
+            continue
+        titulo = (fila.get('titulo') or '').strip()
+        if not titulo:
+            errores.append({'fila': i, 'error': 'El título es obligatorio'})
+            continue
+        prioridad = fila.get('prioridad') or 'media'
+        if prioridad not in PRIORIDADES:
+            errores.append({'fila': i, 'error': f'Prioridad no válida: {prioridad}'})
+            continue
+        # Igual que en crear_tarea: un miembro siempre se asigna la tarea a sí mismo
+        assigned_to = fila.get('assigned_to') if user.role == 'lider' else user.id
+        try:
+            assigned_to = int(assigned_to) if assigned_to else None
+        except (TypeError, ValueError):
+            errores.append({'fila': i, 'error': f'Usuario asignado no válido: {assigned_to}'})
+            continue
+        nuevas.append(Task(titulo=titulo, descripcion=fila.get('descripcion'), prioridad=prioridad,
+                           created_by=user.id, assigned_to=assigned_to))
+
+    # Todos los usuarios asignados deben existir (una consulta para el lote entero)
+    asignados = {tarea.assigned_to for tarea in nuevas if tarea.assigned_to}
+    if asignados:
+        existentes = set(db.session.scalars(select(User.id).where(User.id.in_(asignados))))
+        for usuario_id in asignados - existentes:
+            errores.append({'error': f'El usuario {usuario_id} no existe'})
+
+    if errores:
+        raise ErrorLote('Hay tareas no válidas; no se ha creado ninguna', errores)
+
+    # Un solo flush: los INSERT se agrupan y after_flush actualiza task_stats una vez
+    db.session.add_all(nuevas)
+    db.session.flush()
+    ids = [tarea.id for tarea in nuevas]
+    db.session.commit()
+    return jsonify({'creadas': len(ids), 'ids': ids}), 201
+
+@bp.route('/estado', methods=['POST'])
+@login_required
+def cambiar_estado():
+    """Cambia el estado de las tareas elegidas de las que el usuario es creador o asignado"""
+    user = usuario_actual()
+    datos = leer_datos()
+    estado = datos.get('estado')
+    if estado not in ESTADOS:
+        raise ErrorLote(f"Estado no válido; usa uno de: {', '.join(ESTADOS)}")
+
+    permitidas, sin_permiso, no_encontradas = seleccionar_tareas(
+        datos, lambda fila: user.id in (fila.assigned_to, fila.created_by))
+
+    if permitidas:
+        valores = {'estado': estado, 'version': Task.version + 1}
+        if estado == 'completada':
+            valores['fecha_completada'] = datetime.utcnow()
+        db.session.execute(
+            update(Task)
+            .where(Task.id.in_([fila.id for fila in permitidas]))
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        registrar_cambios(permitidas, estado=estado, fecha_completada=valores.get('fecha_completada'))
+        db.session.commit()
+    return resumen(permitidas, sin_permiso, no_encontradas)
+
+@bp.route('/reasignar', methods=['POST'])
+@lider_required
+def reasignar():
+    """Reasigna las tareas elegidas a otro usuario (solo líderes)"""
+    datos = leer_datos()
+    try:
+        assigned_to = int(datos.get('assigned_to'))
+    except (TypeError, ValueError):
+        raise ErrorLote("Indica el nuevo usuario en 'assigned_to'")
+    if db.session.get(User, assigned_to) is None:
+        raise ErrorLote(f'El usuario {assigned_to} no existe')
+
+    permitidas, sin_permiso, no_encontradas = seleccionar_tareas(datos, lambda fila: True)
+
+    if permitidas:
+        db.session.execute(
+            update(Task)
+            .where(Task.id.in_([fila.id for fila in permitidas]))
+            .values(assigned_to=assigned_to, version=Task.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        registrar_cambios(permitidas, assigned_to=assigned_to)
+        db.session.commit()
+    return resumen(permitidas, sin_permiso, no_encontradas)
+
+@bp.route('/eliminar', methods=['POST'])
+@login_required
+def eliminar():
+    """Elimina las tareas elegidas creadas por el usuario y libera sus adjuntos"""
+    user = usuario_actual()
+    datos = leer_datos()
+
+    permitidas, sin_permiso, no_encontradas = seleccionar_tareas(datos, lambda fila: fila.created_by == user.id)
+
+    if permitidas:
+        liberar_adjuntos_en_lote(permitidas)
+        db.session.execute(
+            delete(Task)
+            .where(Task.id.in_([fila.id for fila in permitidas]))
+            .execution_options(synchronize_session=False)
+        )
+        registrar_cambios(permitidas, eliminadas=True)
+        db.session.commit()
+    return resumen(permitidas, sin_permiso, no_encontradas)
@@ -0,0 +1,21 @@
+"""
+Métricas en formato de texto de Prometheus
+
+    GET /metrics        (solo con METRICAS=1; ver metricas.py)
+"""
+
+from flask import Blueprint, Response, abort, current_app, request
+import hmac
+
+from metricas import registro
+
+bp = Blueprint('metricas', __name__)
+
+@bp.route('/metrics')
+def exponer():
+    if not current_app.config['METRICAS']:
+        abort(404)
+    token = current_app.config['METRICAS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return Response(registro.texto(), mimetype='text/plain; version=0.0.4')
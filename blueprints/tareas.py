@@ -0,0 +1,199 @@
+"""
+Dashboard y gestión de tareas
+"""
+
+from flask import Blueprint, abort, render_template, request, redirect, url_for, flash, session
+from datetime import datetime
+
+from adjuntos import allowed_file, asignar_adjunto, liberar_adjunto
+from consultas import (estadisticas_de, listar_miembros, obtener_tarea_o_404, orden_pedido, ordenar,
+                       paginar_tareas, tareas_archivadas_asignadas_a, tareas_asignadas_a, tareas_creadas_por)
+from eventos import responder_accion
+from extensions import db
+from fragmentos import PLANTILLAS, tarjeta
+from models import ESTADOS, PRIORIDADES, Task
+from usuarios import login_required, usuario_actual
+
+bp = Blueprint('tareas', __name__)
+
+# ==================== DASHBOARD ====================
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    user = usuario_actual()
+    orden = orden_pedido()
+    
+    if user.role == 'lider':
+        # Líder ve las tareas creadas por él, paginadas por cursor en el orden elegido
+        mis_tareas, cursor_creadas = paginar_tareas(tareas_creadas_por(user.id), request.args.get('cursor'),
+                                                    orden=orden)
+        # También ve sus tareas asignadas (con su propio cursor)
+        tareas_asignadas, cursor_asignadas = paginar_tareas(
+            tareas_asignadas_a(user.id), request.args.get('cursor_asignadas'), orden=orden)
+        miembros = listar_miembros()
+        return render_template('dashboard_lider.html', 
+                             mis_tareas=mis_tareas, 
+                             tareas_asignadas=tareas_asignadas,
+                             estadisticas=estadisticas_de(user.id, 'creador'),
+                             cursor_creadas=cursor_creadas,
+                             cursor_asignadas=cursor_asignadas,
+                             orden=orden,
+                             miembros=miembros)
+    else:
+        # Miembro solo ve sus tareas asignadas (y las archivadas si las pide)
+        mis_tareas = ordenar(tareas_asignadas_a(user.id), orden).all()
+        if request.args.get('archivadas'):
+            mis_tareas += tareas_archivadas_asignadas_a(user.id, orden).all()
+        return render_template('dashboard_miembro.html', mis_tareas=mis_tareas, orden=orden,
+                             estadisticas=estadisticas_de(user.id, 'asignado'))
+
+# ==================== GESTIÓN DE TAREAS ====================
+
+@bp.route('/tarea/crear', methods=['GET', 'POST'])
+@login_required
+def crear_tarea():
+    user = usuario_actual()
+    
+    if request.method == 'POST':
+        titulo = request.form.get('titulo')
+        descripcion = request.form.get('descripcion')
+        prioridad = request.form.get('prioridad', 'media')
+        if prioridad not in PRIORIDADES:
+            prioridad = 'media'
+        assigned_to = request.form.get('assigned_to')
+        
+        # Manejar archivo adjunto
+        file = request.files.get('archivo')
+        if file and file.filename != '' and not allowed_file(file.filename):
+            flash('Tipo de archivo no permitido. Usa: png, jpg, jpeg, gif, pdf, doc, docx, txt, zip, rar', 'warning')
+        
+        # Para miembros, auto-asignar la tarea a ellos mismos si no especifican otro
+        if user.role == 'miembro':
+            # Miembro siempre se asigna la tarea a sí mismo
+            assigned_to_id = session['user_id']
+        else:
+            # Líder puede asignar a otros o a sí mismo
+            assigned_to_id = int(assigned_to) if assigned_to else None
+        
+        nueva_tarea = Task(
+            titulo=titulo,
+            descripcion=descripcion,
+            prioridad=prioridad,
+            created_by=session['user_id'],
+            assigned_to=assigned_to_id
+        )
+        
+        if file and file.filename != '' and allowed_file(file.filename):
+            # Guardar en el almacén por contenido (sin duplicar archivos iguales)
+            asignar_adjunto(nueva_tarea, file)
+        
+        db.session.add(nueva_tarea)
+        db.session.commit()
+        flash('Tarea creada exitosamente', 'success')
+        return redirect(url_for('tareas.dashboard'))
+    
+    # Para el formulario
+    if user.role == 'lider':
+        miembros = listar_miembros()
+    else:
+        miembros = []
+    
+    return render_template('crear_tarea.html', miembros=miembros)
+
+@bp.route('/tarea/<int:id>/actualizar', methods=['POST'])
+@login_required
+def actualizar_estado_tarea(id):
+    tarea = Task.query.get_or_404(id)
+    user = usuario_actual()
+    
+    # Verificar permisos
+    if tarea.assigned_to != user.id and tarea.created_by != user.id:
+        return responder_accion('No tienes permisos para modificar esta tarea', 'danger',
+                                url_for('tareas.dashboard'), 403)
+    
+    nuevo_estado = request.form.get('estado')
+    if nuevo_estado not in ESTADOS:
+        return responder_accion('Estado no válido', 'warning', url_for('tareas.dashboard'), 400)
+    tarea.estado = nuevo_estado
+    
+    if nuevo_estado == 'completada':
+        tarea.fecha_completada = datetime.utcnow()
+    
+    db.session.commit()
+    return responder_accion('Estado de tarea actualizado', 'success', url_for('tareas.dashboard'))
+
+@bp.route('/tarea/<int:id>/eliminar', methods=['POST'])
+@login_required
+def eliminar_tarea(id):
+    tarea = Task.query.get_or_404(id)
+    user = usuario_actual()
+    
+    # Solo el creador puede eliminar
+    if tarea.created_by != user.id:
+        flash('No tienes permisos para eliminar esta tarea', 'danger')
+        return redirect(url_for('tareas.dashboard'))
+    
+    liberar_adjunto(tarea)
+    db.session.delete(tarea)
+    db.session.commit()
+    flash('Tarea eliminada', 'success')
+    return redirect(url_for('tareas.dashboard'))
+
+@bp.route('/tarea/<int:id>/detalle')
+@login_required
+def detalle_tarea(id):
+    """Vista detallada de una tarea"""
+    tarea = obtener_tarea_o_404(id, archivadas=True)
+    user = usuario_actual()
+    
+    # Verificar permisos de acceso
+    if user.role != 'lider' and tarea.assigned_to != user.id and tarea.created_by != user.id:
+        flash('No tienes permisos para ver esta tarea', 'danger')
+        return redirect(url_for('tareas.dashboard'))
+    
+    # Si es líder, obtener lista de miembros para reasignar
+    miembros = listar_miembros() if user.role == 'lider' else []
+    
+    return render_template('detalle_tarea.html', tarea=tarea, miembros=miembros)
+
+@bp.route('/tarea/<int:id>/fragmento')
+@login_required
+def fragmento_tarea(id):
+    """HTML de la tarjeta de una tarea, para actualizar los dashboards sin recargarlos"""
+    vista = request.args.get('vista')
+    if vista not in PLANTILLAS:
+        abort(400)
+    tarea = obtener_tarea_o_404(id, archivadas=True)
+    user = usuario_actual()
+    if user.role != 'lider' and tarea.assigned_to != user.id and tarea.created_by != user.id:
+        abort(403)
+    return tarjeta(tarea, vista)
+
+@bp.route('/tarea/<int:id>/editar', methods=['POST'])
+@login_required
+def editar_tarea(id):
+    """Edita una tarea existente"""
+    tarea = Task.query.get_or_404(id)
+    user = usuario_actual()
+    
+    # Verificar permisos
+    if tarea.created_by != user.id and user.role != 'lider':
+        return responder_accion('No tienes permisos para editar esta tarea', 'danger',
+                                url_for('tareas.detalle_tarea', id=id), 403)
+    
+    # Actualizar campos
+    tarea.titulo = request.form.get('titulo')
+    tarea.descripcion = request.form.get('descripcion')
+    prioridad = request.form.get('prioridad', 'media')
+    tarea.prioridad = prioridad if prioridad in PRIORIDADES else 'media'
+    
+    # Manejar nuevo archivo adjunto
+    if 'archivo' in request.files:
+        file = request.files['archivo']
+        if file and file.filename != '' and allowed_file(file.filename):
+            # Sustituir el adjunto (libera la referencia al anterior)
+            asignar_adjunto(tarea, file)
+    
+    db.session.commit()
+    return responder_accion('Tarea actualizada exitosamente', 'success', url_for('tareas.detalle_tarea', id=id))
@@ -0,0 +1,149 @@
+"""
+Cachés en memoria del proceso
+"""
+
+from collections import OrderedDict
+import sqlite3
+import threading
+import time
+
+class CacheLRU:
+    """Caché LRU con caducidad por entrada, segura entre hilos"""
+
+    def __init__(self, tamano, ttl):
+        self.tamano = tamano
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, expira = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + self.ttl)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.tamano:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+class CacheFragmentos:
+    """
+    Caché de fragmentos HTML en dos niveles: LRU en memoria del proceso limitada por
+    bytes y, opcionalmente, una caché compartida entre procesos (ver CacheCompartidaSQLite).
+    Las claves incluyen la versión del contenido, así que las entradas no caducan:
+    las que dejan de usarse salen por el final de la LRU.
+    """
+
+    def __init__(self, max_bytes, compartida=None):
+        self.max_bytes = max_bytes
+        self.compartida = compartida
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is not None:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return valor
+        if self.compartida is not None:
+            valor = self.compartida.get(clave)
+            if valor is not None:
+                self._guardar_local(clave, valor)
+                self.aciertos += 1
+                return valor
+        self.fallos += 1
+        return None
+
+    def set(self, clave, valor):
+        self._guardar_local(clave, valor)
+        if self.compartida is not None:
+            self.compartida.set(clave, valor)
+
+    def _guardar_local(self, clave, valor):
+        tamano = len(valor)
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._datos[clave] = valor
+            self.bytes += tamano
+            while self.bytes > self.max_bytes:
+                _, expulsado = self._datos.popitem(last=False)
+                self.bytes -= len(expulsado)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes = 0
+        if self.compartida is not None:
+            self.compartida.limpiar()
+
+class CacheCompartidaSQLite:
+    """
+    Nivel compartido de CacheFragmentos en un archivo SQLite aparte, para que los
+    procesos de gunicorn aprovechen lo que ya ha renderizado otro. Guarda como mucho
+    `max_filas` entradas; al pasarse borra las más antiguas.
+    """
+
+    def __init__(self, ruta, max_filas=50000):
+        self.ruta = ruta
+        self.max_filas = max_filas
+        self._local = threading.local()
+        self._escrituras = 0
+        with self._conexion() as conexion:
+            conexion.execute("CREATE TABLE IF NOT EXISTS fragmento (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=OFF")  # Es una caché: perderla no importa
+            self._local.conexion = conexion
+        return conexion
+
+    def get(self, clave):
+        try:
+            fila = self._conexion().execute("SELECT valor FROM fragmento WHERE clave = ?", (clave,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return fila[0] if fila else None
+
+    def set(self, clave, valor):
+        try:
+            conexion = self._conexion()
+            conexion.execute("INSERT OR REPLACE INTO fragmento (clave, valor) VALUES (?, ?)", (clave, valor))
+            self._escrituras += 1
+            if self._escrituras % 1000 == 0:
+                conexion.execute("DELETE FROM fragmento WHERE rowid <= (SELECT MAX(rowid) FROM fragmento) - ?",
+                                 (self.max_filas,))
+        except sqlite3.Error:
+            # Con la caché bloqueada o inaccesible se sigue sin ella
+            pass
+
+    def limpiar(self):
+        self._conexion().execute("DELETE FROM fragmento")
@@ -2,20 +2,21 @@
 Script para verificar los usuarios existentes en la base de datos
 """
 
-from app import app, db, User
+from config import RUTA_BASE_DATOS
+from models import User, crear_sesion
 import os
 
 def verificar_usuarios():
     """Muestra todos los usuarios en la base de datos"""
     
     # Verificar si existe la base de datos
-    if not os.path.exists('todo.db'):
-        print("❌ La base de datos 'todo.db' no existe")
+    if not os.path.exists(RUTA_BASE_DATOS):
+        print(f"❌ La base de datos '{RUTA_BASE_DATOS}' no existe")
         print("Ejecuta 'python init_db.py' para crearla")
         return
     
-    with app.app_context():
-        usuarios = User.query.all()
+    with crear_sesion() as sesion:
+        usuarios = sesion.query(User).all()
         
         if not usuarios:
             print("⚠️  No hay usuarios en la base de datos")
@@ -51,4 +52,4 @@ if __name__ == '__main__':
         verificar_usuarios()
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        print("Asegúrate de que app.py esté en el mismo directorio")
\ No newline at end of file
+        print("Asegúrate de que models.py esté en el mismo directorio")
\ No newline at end of file
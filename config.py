@@ -0,0 +1,112 @@
+"""
+Configuración por defecto de la aplicación.
+No depende de Flask: la usan create_app() (app.py), los modelos y los scripts de mantenimiento.
+"""
+
+import os
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+# Flask-SQLAlchemy resuelve 'sqlite:///todo.db' dentro de la carpeta instance/
+RUTA_BASE_DATOS = os.path.join(BASE_DIR, 'instance', 'todo.db')
+
+# Extensiones permitidas
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx', 'txt', 'zip', 'rar'}
+# Extensiones para las que se genera miniatura (PDF solo si PyMuPDF está instalado)
+EXTENSIONES_CON_MINIATURA = {'png', 'jpg', 'jpeg', 'gif', 'pdf'}
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'tu-clave-secreta-aqui-cambiar-en-produccion')
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///todo.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite admite un solo escritor: un pool de escritura pequeño hace que las escrituras de cada
+    # proceso esperen su turno en el pool en lugar de chocar con "database is locked"
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 30}
+    # Conexiones de solo lectura (mode=ro) para las peticiones GET; con WAL no bloquean al escritor
+    SQLALCHEMY_BINDS = {
+        'lectura': {
+            'url': 'sqlite:///file:todo.db?mode=ro&uri=true',
+            'pool_size': 5,
+            'max_overflow': 10,
+            'pool_timeout': 30,
+        }
+    }
+    SQLITE_LECTURA_SEPARADA = True  # Usar el bind 'lectura' en peticiones GET/HEAD
+    SQLITE_BUSY_TIMEOUT = 5000  # ms que una conexión espera al bloqueo de escritura
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes de la base de datos mapeados en memoria
+    SQLITE_CACHE_KB = 64 * 1024  # Caché de páginas por conexión, en KiB
+    # Una base de datos por equipo (ver shards.py): SHARDS=equipo1,equipo2 -> instance/shards/<equipo>.db
+    # Vacío: todos los equipos en todo.db
+    SHARDS = {nombre: os.path.join(BASE_DIR, 'instance', 'shards', f'{nombre}.db')
+              for nombre in os.environ.get('SHARDS', '').split(',') if nombre}
+    SHARDS_DIRECTORIO = os.path.join(BASE_DIR, 'instance', 'directorio.db')  # usuario -> shard
+    SHARDS_HILOS = 8  # Hilos para leer todos los shards a la vez (vistas entre equipos)
+    SHARD_COMANDOS = os.environ.get('SHARD')  # Shard de los comandos flask y los hilos sin petición
+    UPLOAD_FOLDER = 'uploads'
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB máximo
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # Tamaño de bloque al copiar y hashear adjuntos
+    # Envío de adjuntos: 'python' (Flask), 'x-sendfile' (Apache/lighttpd) o 'x-accel' (nginx)
+    UPLOADS_ENVIO = os.environ.get('UPLOADS_ENVIO', 'python')
+    UPLOADS_X_ACCEL_PREFIJO = '/_uploads/'  # location 'internal' de nginx que apunta a UPLOAD_FOLDER
+    UPLOADS_MAX_AGE = 365 * 24 * 3600  # Caché de adjuntos direccionados por contenido (no cambian nunca)
+    USE_X_SENDFILE = UPLOADS_ENVIO == 'x-sendfile'
+    MINIATURA_TAMANO = (320, 320)  # Tamaño máximo de las miniaturas de adjuntos
+    # Trabajos en segundo plano (miniaturas): hilos dentro del proceso web o 'flask procesar-trabajos'
+    TRABAJOS_EN_PROCESO = os.environ.get('TRABAJOS_EN_PROCESO', '1') == '1'
+    TRABAJOS_HILOS = 2
+    TRABAJOS_INTERVALO = 5  # Segundos de espera cuando la cola está vacía
+    TRABAJOS_TIMEOUT = 300  # Un trabajo 'procesando' más tiempo que esto se vuelve a reclamar
+    TRABAJOS_MAX_INTENTOS = 3
+    BUSQUEDA_POR_PAGINA = 20  # Resultados por página en /tareas/buscar
+    TAREAS_POR_PAGINA = 50  # Tamaño de página en los listados del dashboard
+    API_LIMITE_MAXIMO = 200  # Máximo de tareas por página en /api/v1/tareas
+    LOTE_MAXIMO = 5000  # Máximo de tareas por operación en lote (/tareas/lote/...)
+    # Archivado de tareas completadas en task_archive (flask archivar-tareas, ver archivado.py)
+    ARCHIVO_DIAS = 90  # Se archivan las completadas hace más de estos días
+    ARCHIVO_LOTE = 1000  # Tareas por transacción
+    ARCHIVO_PAUSA = 0.05  # Segundos entre lotes para dejar escribir a la aplicación
+    # Exportación e importación de tareas (/tareas/exportar, /tareas/importar, ver exportacion.py)
+    EXPORTACION_LOTE = 1000  # Filas leídas del cursor y escritas en cada trozo de la respuesta
+    IMPORTACION_LOTE = 1000  # Filas por INSERT (executemany)
+    # Analítica de productividad (/lider/analytics, /api/v1/analytics, ver analitica.py)
+    ANALITICA_DIAS = 90  # Rango por defecto, hasta hoy
+    ANALITICA_DIAS_MAXIMO = 366  # Rango máximo de una consulta
+    # Eventos en tiempo real (SSE): 'memoria' para un solo proceso, 'sqlite' para repartirlos entre procesos
+    EVENTOS_BACKEND = os.environ.get('EVENTOS_BACKEND', 'memoria')
+    EVENTOS_INTERVALO = 1  # Segundos entre lecturas de task_event (backend 'sqlite')
+    EVENTOS_RETENCION = 300  # Segundos que se guardan los eventos para reenviarlos al reconectar
+    EVENTOS_LATIDO = 15  # Segundos entre comentarios de latido en una conexión sin eventos
+    EVENTOS_DURACION = 600  # Duración máxima de una conexión; el navegador reconecta solo
+    EVENTOS_COLA = 100  # Eventos pendientes por conexión antes de pedir al navegador que recargue
+    # Conexiones /eventos abiertas a la vez en cada proceso; las siguientes reciben 503 y esos
+    # dashboards funcionan sin tiempo real. Cada conexión ocupa un hilo: ver gunicorn.conf.py
+    EVENTOS_MAX_CONEXIONES = int(os.environ['EVENTOS_MAX_CONEXIONES']) if os.environ.get('EVENTOS_MAX_CONEXIONES') else None
+    # Caché de las tarjetas de tareas renderizadas (ver fragmentos.py)
+    FRAGMENTOS_CACHE = True
+    FRAGMENTOS_CACHE_BYTES = 32 * 1024 * 1024  # Memoria máxima de la caché de cada proceso
+    # Archivo SQLite compartido entre procesos como segundo nivel (opcional)
+    FRAGMENTOS_CACHE_COMPARTIDA = os.environ.get('FRAGMENTOS_CACHE_COMPARTIDA')
+    USUARIOS_CACHE_TAMANO = 1024  # Máximo de usuarios en la caché del proceso
+    USUARIOS_CACHE_TTL = 60  # Segundos que un usuario cacheado se considera válido
+    # Hash de contraseñas en procesos aparte (ver contrasenas.py); 0 procesos = en el hilo de la petición
+    CONTRASENAS_METODO = 'scrypt'  # Parámetros actuales: los hashes antiguos se rehacen al iniciar sesión
+    CONTRASENAS_PROCESOS = int(os.environ.get('CONTRASENAS_PROCESOS', 1))  # Por cada proceso de la aplicación
+    CONTRASENAS_COLA = 16  # Verificaciones en espera a partir de las que /login responde 503
+    CONTRASENAS_TIMEOUT = 10  # Segundos máximos de espera de una verificación
+    # Límite de intentos de login: ráfaga e intentos por segundo. Los cubos son de cada proceso,
+    # así que con N procesos de gunicorn una IP puede hacer hasta N veces estos intentos
+    LOGIN_RAFAGA_IP = 30
+    LOGIN_RITMO_IP = 2.0
+    LOGIN_RAFAGA_USUARIO = 5  # Solo gastan ficha los intentos fallidos
+    LOGIN_RITMO_USUARIO = 0.1
+    # Proxies de confianza delante de la aplicación (nginx = 1): la IP del cliente se lee de
+    # X-Forwarded-For. Con 0 se usa la del socket, que detrás de un proxy es la del proxy
+    PROXY_SALTOS = int(os.environ.get('PROXY_SALTOS', 0))
+    # Instrumentación por petición y /metrics (ver metricas.py)
+    METRICAS = os.environ.get('METRICAS') == '1'
+    METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')  # Si se define, /metrics exige 'Authorization: Bearer <token>'
+    METRICAS_LENTA_MS = 500  # Peticiones más lentas que esto se escriben en el logger 'todo.lentas'
+    METRICAS_PERFIL_MUESTREO = float(os.environ.get('METRICAS_PERFIL_MUESTREO', 0))  # Fracción con cProfile
+    # Añade a cada respuesta la cabecera X-Consultas-SQL (la leen los benchmarks)
+    SQL_CABECERA_CONSULTAS = os.environ.get('SQL_CABECERA_CONSULTAS') == '1'
+    # Modo prueba: si se define, una petición que ejecute más consultas SQL que este límite falla
+    SQL_LIMITE_CONSULTAS = int(os.environ['SQL_LIMITE_CONSULTAS']) if os.environ.get('SQL_LIMITE_CONSULTAS') else None
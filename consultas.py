@@ -0,0 +1,316 @@
+"""
+Consultas de tareas compartidas por las vistas: carga en lote de relaciones,
+contadores, orden y paginación por cursor y búsqueda de texto completo.
+"""
+
+from flask import abort, current_app, request
+from sqlalchemy import DateTime, and_, or_, func, select, text, table, column
+from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime
+import base64
+import json
+import re
+
+from extensions import db
+from models import ESTADOS, PRIORIDADES, User, Task, TaskArchive, TaskStats, DDL_BUSQUEDA
+
+# ==================== CONSULTAS ====================
+# Todas las vistas de tareas pasan por estas funciones para que los usuarios
+# relacionados (creador/asignado) se carguen en lote y no uno por fila.
+
+def consulta_tareas():
+    """Consulta base de tareas con creador, asignado y adjunto cargados en una consulta por lote"""
+    return Task.query.options(selectinload(Task.creador), selectinload(Task.asignado), selectinload(Task.adjunto))
+
+def tareas_creadas_por(user_id):
+    return consulta_tareas().filter(Task.created_by == user_id)
+
+def tareas_asignadas_a(user_id):
+    return consulta_tareas().filter(Task.assigned_to == user_id)
+
+def tareas_archivadas_asignadas_a(user_id, orden='completada'):
+    """Tareas archivadas (task_archive) de un usuario, por defecto las completadas más recientemente primero"""
+    query = TaskArchive.query \
+        .options(selectinload(TaskArchive.creador), selectinload(TaskArchive.asignado),
+                 selectinload(TaskArchive.adjunto)) \
+        .filter(TaskArchive.assigned_to == user_id)
+    return ordenar(query, orden, TaskArchive)
+
+def obtener_tarea_o_404(id, archivadas=False):
+    """
+    Obtiene una tarea con su creador, asignado y adjunto en una sola consulta (JOIN).
+    Con archivadas=True, si no está en task se busca en task_archive.
+    """
+    tarea = Task.query.options(joinedload(Task.creador), joinedload(Task.asignado), joinedload(Task.adjunto)) \
+        .filter_by(id=id).first()
+    if tarea is None and archivadas:
+        tarea = TaskArchive.query \
+            .options(joinedload(TaskArchive.creador), joinedload(TaskArchive.asignado),
+                     joinedload(TaskArchive.adjunto)) \
+            .filter_by(id=id).first()
+    if tarea is None:
+        abort(404)
+    return tarea
+
+def conteos_por_miembro():
+    """
+    Conteo de tareas por miembro y estado con un único GROUP BY assigned_to, estado.
+    Devuelve {miembro_id: {'pendiente': n, 'en_progreso': n, 'completada': n}}
+    """
+    filas = db.session.query(Task.assigned_to, Task.estado, func.count(Task.id)) \
+        .join(User, User.id == Task.assigned_to) \
+        .filter(User.role == 'miembro') \
+        .group_by(Task.assigned_to, Task.estado) \
+        .all()
+
+    conteos = {}
+    for miembro_id, estado, total in filas:
+        conteos.setdefault(miembro_id, {})[estado] = total
+    return conteos
+
+def recientes_por_miembro(limite=3):
+    """
+    Las `limite` tareas más recientes de cada miembro en una sola consulta,
+    numerando las filas por miembro con ROW_NUMBER() OVER (PARTITION BY assigned_to).
+    Devuelve {miembro_id: [tareas]}
+    """
+    fila = func.row_number().over(
+        partition_by=Task.assigned_to,
+        order_by=(Task.fecha_creacion.desc(), Task.id.desc())
+    ).label('fila')
+    numeradas = db.session.query(Task.id.label('id'), fila) \
+        .join(User, User.id == Task.assigned_to) \
+        .filter(User.role == 'miembro') \
+        .subquery()
+
+    tareas = Task.query.join(numeradas, numeradas.c.id == Task.id) \
+        .filter(numeradas.c.fila <= limite) \
+        .order_by(Task.assigned_to, numeradas.c.fila) \
+        .all()
+
+    recientes = {}
+    for tarea in tareas:
+        recientes.setdefault(tarea.assigned_to, []).append(tarea)
+    return recientes
+
+def listar_miembros():
+    return User.query.filter_by(role='miembro').all()
+
+# ==================== CONTADORES ====================
+# task_stats se mantiene desde models.actualizar_contadores; aquí solo se lee y se reconstruye.
+
+def estadisticas_de(user_id, rol):
+    """Lee los contadores de un usuario: {'pendiente': n, 'en_progreso': n, 'completada': n, 'total': n}"""
+    filas = TaskStats.query.filter_by(user_id=user_id, rol=rol).all()
+    conteos = {'pendiente': 0, 'en_progreso': 0, 'completada': 0}
+    conteos.update({fila.estado: fila.total for fila in filas})
+    conteos['total'] = sum(fila.total for fila in filas)
+    return conteos
+
+def resumen_equipo(sesion):
+    """Líderes, número de miembros y tareas creadas por estado (recibe la sesión: ver shards.en_paralelo)"""
+    lideres = sesion.scalars(select(User.nombre).where(User.role == 'lider').order_by(User.nombre)).all()
+    miembros = sesion.scalar(select(func.count(User.id)).where(User.role == 'miembro'))
+    tareas = dict.fromkeys(ESTADOS, 0)
+    tareas.update(sesion.execute(
+        select(TaskStats.estado, func.sum(TaskStats.total))
+        .where(TaskStats.rol == 'creador')
+        .group_by(TaskStats.estado)
+    ).all())
+    tareas['total'] = sum(tareas.values())
+    return {'lideres': lideres, 'miembros': miembros, 'tareas': tareas}
+
+def reconstruir_contadores():
+    """Recalcula task_stats desde cero a partir de task y task_archive (las archivadas siguen contando)"""
+    TaskStats.query.delete()
+    totales = {}
+    for modelo in (Task, TaskArchive):
+        for rol, columna in (('creador', modelo.created_by), ('asignado', modelo.assigned_to)):
+            filas = db.session.query(columna, modelo.estado, func.count(modelo.id)) \
+                .filter(columna.isnot(None)) \
+                .group_by(columna, modelo.estado) \
+                .all()
+            for user_id, estado, total in filas:
+                clave = (user_id, rol, estado or 'pendiente')
+                totales[clave] = totales.get(clave, 0) + total
+    db.session.add_all([
+        TaskStats(user_id=user_id, rol=rol, estado=estado, total=total)
+        for (user_id, rol, estado), total in totales.items()
+    ])
+    db.session.commit()
+
+# ==================== ORDEN Y PAGINACIÓN ====================
+# Cada orden es una lista de (columna, sentido) que termina siempre en id DESC para
+# que sea total. Se resuelve en SQL con ORDER BY sobre los índices de models.Task,
+# así "urgentes primero" no carga todo el listado para ordenarlo en Python.
+# En SQLite los NULL van al final con DESC y al principio con ASC.
+
+ORDENES = {
+    'creacion': [('fecha_creacion', 'desc')],
+    'prioridad': [('prioridad', 'desc'), ('fecha_creacion', 'desc')],
+    'completada': [('fecha_completada', 'desc')],
+    'asignado': [('assigned_to', 'asc'), ('fecha_creacion', 'desc')],
+}
+ORDEN_POR_DEFECTO = 'creacion'
+
+def orden_pedido(por_defecto=ORDEN_POR_DEFECTO):
+    """Orden de ?orden= (el de por defecto si falta o no es válido)"""
+    orden = request.args.get('orden')
+    return orden if orden in ORDENES else por_defecto
+
+def columnas_orden(orden):
+    """Nombres de las columnas que forman el cursor de un orden (incluido id)"""
+    return [nombre for nombre, sentido in ORDENES[orden]] + ['id']
+
+def criterios_orden(orden, modelo=Task):
+    """Expresiones ORDER BY de un orden sobre Task o TaskArchive"""
+    criterios = [getattr(modelo, nombre).desc() if sentido == 'desc' else getattr(modelo, nombre).asc()
+                 for nombre, sentido in ORDENES[orden]]
+    return criterios + [modelo.id.desc()]
+
+def ordenar(query, orden, modelo=Task):
+    return query.order_by(*criterios_orden(orden, modelo))
+
+def codificar_cursor(tarea, orden=ORDEN_POR_DEFECTO):
+    """Cursor que apunta a la posición de una tarea (o fila) en un orden: JSON en base64"""
+    valores = []
+    for nombre in columnas_orden(orden):
+        valor = getattr(tarea, nombre)
+        valores.append(valor.isoformat() if isinstance(valor, datetime) else valor)
+    datos = json.dumps([orden] + valores, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip('=')
+
+def decodificar_cursor(cursor, orden=ORDEN_POR_DEFECTO):
+    """Valores de las columnas del orden a partir de un cursor, o None si no es válido para ese orden"""
+    if not cursor:
+        return None
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        nombres = columnas_orden(orden)
+        if not isinstance(datos, list) or datos[0] != orden or len(datos) != len(nombres) + 1:
+            return None
+        valores = {}
+        for nombre, valor in zip(nombres, datos[1:]):
+            # Cada valor debe ser un escalar del tipo de su columna: una lista o un objeto
+            # llegarían tal cual a la consulta
+            if valor is None:
+                pass
+            elif isinstance(getattr(Task, nombre).type, DateTime):
+                if not isinstance(valor, str):
+                    return None
+                valor = datetime.fromisoformat(valor)
+            elif nombre == 'prioridad':
+                if valor not in PRIORIDADES:
+                    return None
+            elif isinstance(valor, bool) or not isinstance(valor, int):
+                return None
+            valores[nombre] = valor
+        if valores['id'] is None:
+            return None
+        return valores
+    except (ValueError, TypeError, IndexError):
+        return None
+
+def condicion_cursor(cursor, orden=ORDEN_POR_DEFECTO, modelo=Task):
+    """
+    Condición keyset para las tareas posteriores al cursor (None si no hay cursor válido):
+    (c1 después de v1) OR (c1 = v1 AND c2 después de v2) OR ... teniendo en cuenta los NULL.
+    """
+    valores = decodificar_cursor(cursor, orden)
+    if not valores:
+        return None
+
+    alternativas = []
+    iguales = []
+    for nombre, sentido in ORDENES[orden] + [('id', 'desc')]:
+        columna = getattr(modelo, nombre)
+        valor = valores[nombre]
+        if sentido == 'desc':
+            # Tras un NULL no hay nada más: los NULL van al final
+            despues = None if valor is None else or_(columna < valor, columna.is_(None))
+        else:
+            despues = columna.isnot(None) if valor is None else columna > valor
+        if despues is not None:
+            alternativas.append(and_(*iguales, despues))
+        iguales.append(columna.is_(None) if valor is None else columna == valor)
+    return or_(*alternativas)
+
+def paginar_tareas(query, cursor=None, por_pagina=None, orden=ORDEN_POR_DEFECTO):
+    """
+    Paginación por cursor (keyset) en uno de los ORDENES (por defecto, de la más reciente
+    a la más antigua). En lugar de OFFSET se filtra por la posición de la última tarea
+    vista, así el coste de cada página es constante aunque el listado tenga miles de tareas.
+    Devuelve (tareas, cursor_siguiente); cursor_siguiente es None en la última página.
+    """
+    por_pagina = por_pagina or current_app.config['TAREAS_POR_PAGINA']
+    condicion = condicion_cursor(cursor, orden)
+    if cursor and condicion is None:
+        abort(400, 'cursor no válido')
+    if condicion is not None:
+        query = query.filter(condicion)
+
+    tareas = ordenar(query, orden).limit(por_pagina + 1).all()
+
+    cursor_siguiente = None
+    if len(tareas) > por_pagina:
+        tareas = tareas[:por_pagina]
+        cursor_siguiente = codificar_cursor(tareas[-1], orden)
+    return tareas, cursor_siguiente
+
+# ==================== BÚSQUEDA ====================
+
+task_fts = table('task_fts', column('rowid'))
+
+def consulta_fts(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5: cada palabra se busca
+    como prefijo ("palabra"*) y todas deben aparecer. Devuelve None si no hay palabras.
+    """
+    palabras = re.findall(r'\w+', texto or '')
+    if not palabras:
+        return None
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+def buscar_tareas(texto, user, estado=None, prioridad=None, asignado=None, pagina=1, por_pagina=None,
+                  orden=None):
+    """
+    Busca tareas por título, descripción y nombre de archivo usando el índice FTS5,
+    ordenadas por relevancia (bm25, el título pesa más que la descripción) o por
+    uno de los ORDENES.
+    Los miembros solo ven sus tareas. Devuelve (tareas, hay_mas).
+    """
+    por_pagina = por_pagina or current_app.config['BUSQUEDA_POR_PAGINA']
+    consulta = consulta_fts(texto)
+    if consulta is None:
+        return [], False
+
+    query = consulta_tareas() \
+        .join(task_fts, task_fts.c.rowid == Task.id) \
+        .filter(text('task_fts MATCH :consulta')) \
+        .params(consulta=consulta)
+
+    if user.role != 'lider':
+        query = query.filter(or_(Task.assigned_to == user.id, Task.created_by == user.id))
+    if estado:
+        query = query.filter(Task.estado == estado)
+    if prioridad:
+        query = query.filter(Task.prioridad == prioridad)
+    if asignado:
+        query = query.filter(Task.assigned_to == asignado)
+
+    if orden in ORDENES:
+        query = ordenar(query, orden)
+    else:
+        query = query.order_by(text('bm25(task_fts, 10.0, 3.0, 1.0)'), Task.id.desc())
+    tareas = query \
+        .offset((pagina - 1) * por_pagina) \
+        .limit(por_pagina + 1) \
+        .all()
+    return tareas[:por_pagina], len(tareas) > por_pagina
+
+def reconstruir_indice_busqueda():
+    """Crea el índice FTS5 y sus triggers si faltan y lo rellena desde la tabla task"""
+    for sentencia in DDL_BUSQUEDA:
+        db.session.execute(text(sentencia))
+    db.session.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    db.session.commit()
@@ -0,0 +1,158 @@
+"""
+Hash y verificación de contraseñas fuera de los hilos de las peticiones
+
+scrypt y pbkdf2 son lentos a propósito: calculados en el hilo de la petición ocupan
+la CPU (y el GIL) del proceso entero, y una ráfaga de logins a primera hora frena
+todas las demás rutas. Aquí se calculan en un pool de procesos pequeño y acotado:
+- Con más de CONTRASENAS_COLA verificaciones en espera se lanza PoolSaturado (503)
+  en lugar de encolar sin límite.
+- Los intentos de login se limitan con cubos de fichas por IP y por usuario.
+- Al iniciar sesión con un hash de parámetros antiguos se devuelve el hash nuevo
+  para guardarlo (rehash transparente).
+
+Sin Flask: init_app() solo copia la configuración. Los scripts usan hash_contrasena().
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as TiempoAgotado
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from functools import lru_cache
+from werkzeug.security import check_password_hash, generate_password_hash
+import multiprocessing
+import os
+import threading
+import time
+
+from config import Config
+
+class PoolSaturado(Exception):
+    """Demasiadas verificaciones en espera (o el pool no responde): hay que reintentar más tarde"""
+
+# ==================== TRABAJO DE LOS PROCESOS ====================
+# Funciones de nivel de módulo: los procesos del pool las importan por nombre.
+
+@lru_cache(maxsize=8)
+def parametros_actuales(metodo):
+    """Prefijo de los hashes que genera hoy `metodo`, p. ej. 'scrypt:32768:8:1'"""
+    return generate_password_hash('', metodo).split('$', 1)[0]
+
+def hash_contrasena(password, metodo=Config.CONTRASENAS_METODO):
+    return generate_password_hash(password, metodo)
+
+def comprobar_contrasena(hash_guardado, password, metodo):
+    """(válida, hash nuevo o None): el hash nuevo solo si el guardado usa otros parámetros"""
+    if not check_password_hash(hash_guardado, password):
+        return False, None
+    if hash_guardado.split('$', 1)[0] != parametros_actuales(metodo):
+        return True, generate_password_hash(password, metodo)
+    return True, None
+
+# ==================== POOL ====================
+
+class PoolContrasenas:
+    """Pool de procesos con un máximo de trabajos en espera, creado en cada proceso al primer uso"""
+
+    def __init__(self, procesos, cola, timeout, metodo):
+        self.procesos = procesos
+        self.cola = cola
+        self.timeout = timeout
+        self.metodo = metodo
+        self.pendientes = 0
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ejecutor(self):
+        # Los workers de gunicorn no heredan el pool del padre; 'spawn' evita hacer fork
+        # desde un proceso con hilos
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = ProcessPoolExecutor(self.procesos, mp_context=multiprocessing.get_context('spawn'))
+            self._pid = os.getpid()
+        return self._pool
+
+    def _terminado(self, futuro):
+        with self._lock:
+            self.pendientes -= 1
+
+    def ejecutar(self, funcion, *args):
+        if self.procesos <= 0:
+            return funcion(*args)
+        with self._lock:
+            if self.pendientes >= self.cola:
+                raise PoolSaturado()
+            try:
+                futuro = self._ejecutor().submit(funcion, *args)
+            except BrokenProcessPool:
+                self._pool = None
+                raise PoolSaturado()
+            self.pendientes += 1
+        # El hueco se libera cuando el proceso termina, aunque la petición haya dejado de esperar
+        futuro.add_done_callback(self._terminado)
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TiempoAgotado:
+            futuro.cancel()
+            raise PoolSaturado()
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            raise PoolSaturado()
+
+    def verificar(self, hash_guardado, password):
+        """(válida, hash nuevo o None), ver comprobar_contrasena()"""
+        return self.ejecutar(comprobar_contrasena, hash_guardado, password, self.metodo)
+
+    def generar(self, password):
+        return self.ejecutar(hash_contrasena, password, self.metodo)
+
+# ==================== LÍMITE DE INTENTOS ====================
+
+class LimitadorIntentos:
+    """
+    Cubo de fichas por clave: caben `rafaga` fichas y se recuperan `ritmo` por segundo.
+    Guarda como mucho `max_claves` claves (se olvidan las menos recientes). Seguro entre hilos.
+    """
+
+    def __init__(self, rafaga, ritmo, max_claves=10000):
+        self.rafaga = rafaga
+        self.ritmo = ritmo
+        self.max_claves = max_claves
+        self._cubos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fichas(self, clave, ahora):
+        fichas, instante = self._cubos.get(clave, (self.rafaga, ahora))
+        return min(self.rafaga, fichas + (ahora - instante) * self.ritmo)
+
+    def espera(self, clave):
+        """Segundos hasta que haya una ficha para `clave` (0 si ya la hay), sin gastarla"""
+        with self._lock:
+            fichas = self._fichas(clave, time.monotonic())
+        return 0 if fichas >= 1 else (1 - fichas) / self.ritmo
+
+    def consumir(self, clave):
+        """Gasta una ficha si la hay y devuelve 0; si no, los segundos que faltan"""
+        with self._lock:
+            ahora = time.monotonic()
+            fichas = self._fichas(clave, ahora)
+            if fichas < 1:
+                return (1 - fichas) / self.ritmo
+            self._cubos[clave] = (fichas - 1, ahora)
+            self._cubos.move_to_end(clave)
+            while len(self._cubos) > self.max_claves:
+                self._cubos.popitem(last=False)
+            return 0
+
+pool_contrasenas = PoolContrasenas(Config.CONTRASENAS_PROCESOS, Config.CONTRASENAS_COLA,
+                                   Config.CONTRASENAS_TIMEOUT, Config.CONTRASENAS_METODO)
+limite_ip = LimitadorIntentos(Config.LOGIN_RAFAGA_IP, Config.LOGIN_RITMO_IP)
+limite_usuario = LimitadorIntentos(Config.LOGIN_RAFAGA_USUARIO, Config.LOGIN_RITMO_USUARIO)
+
+def init_app(app):
+    pool_contrasenas.procesos = app.config['CONTRASENAS_PROCESOS']
+    pool_contrasenas.cola = app.config['CONTRASENAS_COLA']
+    pool_contrasenas.timeout = app.config['CONTRASENAS_TIMEOUT']
+    pool_contrasenas.metodo = app.config['CONTRASENAS_METODO']
+    limite_ip.rafaga, limite_ip.ritmo = app.config['LOGIN_RAFAGA_IP'], app.config['LOGIN_RITMO_IP']
+    limite_usuario.rafaga, limite_usuario.ritmo = app.config['LOGIN_RAFAGA_USUARIO'], app.config['LOGIN_RITMO_USUARIO']
@@ -0,0 +1,250 @@
+"""
+Eventos de cambios en tareas para las vistas en tiempo real (SSE, ver blueprints/eventos.py).
+
+Cada cambio en una tarea genera un evento pequeño para su creador y sus asignados
+(anterior y nuevo) con el estado antes y después del cambio; los dashboards lo
+usan para actualizar la página sin recargarla.
+
+Dos formas de repartirlos, según EVENTOS_BACKEND:
+- 'memoria': cola en el propio proceso. Suficiente con el servidor de desarrollo.
+- 'sqlite': los eventos se guardan en task_event en la misma transacción que el
+  cambio y un hilo por proceso los lee cada EVENTOS_INTERVALO segundos, así llegan
+  a las conexiones abiertas en cualquier proceso de gunicorn.
+"""
+
+from flask import current_app, flash, jsonify, redirect, request
+from sqlalchemy import event, select, delete, func
+from collections import deque
+from datetime import datetime, timedelta
+import itertools
+import json
+import queue
+import threading
+
+from extensions import db
+from models import Task, TaskEvent, valor_anterior
+from shards import motores_lectura, usar_shard
+
+class BusEventos:
+    """Reparte eventos a las colas de las conexiones SSE abiertas en este proceso"""
+
+    def __init__(self, tamano_cola):
+        self.tamano_cola = tamano_cola
+        self._suscriptores = {}
+        self._lock = threading.Lock()
+
+    def suscribir(self, user_id):
+        cola = queue.Queue(maxsize=self.tamano_cola)
+        with self._lock:
+            self._suscriptores.setdefault(user_id, set()).add(cola)
+        return cola
+
+    def conexiones(self):
+        """Conexiones SSE abiertas en este proceso"""
+        with self._lock:
+            return sum(len(colas) for colas in self._suscriptores.values())
+
+    def cancelar(self, user_id, cola):
+        with self._lock:
+            colas = self._suscriptores.get(user_id)
+            if colas:
+                colas.discard(cola)
+                if not colas:
+                    del self._suscriptores[user_id]
+
+    def repartir(self, evento_id, user_id, tipo, datos):
+        with self._lock:
+            colas = list(self._suscriptores.get(user_id, ()))
+        for cola in colas:
+            try:
+                cola.put_nowait((evento_id, tipo, datos))
+            except queue.Full:
+                # El navegador no da abasto: se vacía su cola y se le pide que recargue
+                with cola.mutex:
+                    cola.queue.clear()
+                cola.put_nowait((evento_id, 'recargar', '{}'))
+
+    def guardar(self, conexion, eventos):
+        """Se llama dentro de la transacción del cambio"""
+
+    def confirmar(self, eventos):
+        """Se llama después del commit"""
+
+    def pendientes(self, user_id, ultimo_id):
+        """Eventos posteriores a ultimo_id (para reconexiones con Last-Event-ID)"""
+        return []
+
+class BusMemoria(BusEventos):
+    """Pub/sub dentro del proceso; guarda los últimos eventos para las reconexiones"""
+
+    def __init__(self, tamano_cola, historial=1000):
+        super().__init__(tamano_cola)
+        self._ids = itertools.count(1)
+        self._recientes = deque(maxlen=historial)
+
+    def confirmar(self, eventos):
+        for user_id, tipo, datos in eventos:
+            evento_id = next(self._ids)
+            self._recientes.append((evento_id, user_id, tipo, datos))
+            self.repartir(evento_id, user_id, tipo, datos)
+
+    def pendientes(self, user_id, ultimo_id):
+        return [(evento_id, tipo, datos) for evento_id, destino, tipo, datos in list(self._recientes)
+                if destino == user_id and evento_id > ultimo_id]
+
+class BusSQLite(BusEventos):
+    """Fan-out entre procesos a través de la tabla task_event"""
+
+    def __init__(self, tamano_cola):
+        super().__init__(tamano_cola)
+        self.aviso = threading.Event()
+        self._hilo = None
+        self._lock_hilo = threading.Lock()
+
+    def guardar(self, conexion, eventos):
+        ahora = datetime.utcnow()
+        conexion.execute(TaskEvent.__table__.insert(), [
+            {'user_id': user_id, 'tipo': tipo, 'datos': datos, 'fecha': ahora}
+            for user_id, tipo, datos in eventos
+        ])
+
+    def confirmar(self, eventos):
+        # Las conexiones de este proceso no esperan al siguiente intervalo
+        self.aviso.set()
+
+    def pendientes(self, user_id, ultimo_id):
+        tabla = TaskEvent.__table__
+        return [tuple(fila) for fila in db.session.execute(
+            select(tabla.c.id, tabla.c.tipo, tabla.c.datos)
+            .where(tabla.c.user_id == user_id, tabla.c.id > ultimo_id)
+            .order_by(tabla.c.id)
+        )]
+
+    def suscribir(self, user_id):
+        self.iniciar(current_app._get_current_object())
+        return super().suscribir(user_id)
+
+    def iniciar(self, app):
+        """Arranca el hilo lector la primera vez que alguien se suscribe en este proceso"""
+        if self._hilo is not None:
+            return
+        with self._lock_hilo:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self.bucle, args=(app,), name='eventos', daemon=True)
+                self._hilo.start()
+
+    def bucle(self, app):
+        tabla = TaskEvent.__table__
+        # Las lecturas van por las conexiones de solo lectura: no ocupan el pool del escritor.
+        # Con shards cada equipo tiene su task_event (y sus propios id de evento)
+        with app.app_context():
+            motores = motores_lectura(app)
+        ultimos = {}
+        for shard, motor in motores.items():
+            with motor.connect() as conexion:
+                ultimos[shard] = conexion.execute(select(func.max(tabla.c.id))).scalar() or 0
+        vueltas = 0
+        while True:
+            self.aviso.wait(app.config['EVENTOS_INTERVALO'])
+            self.aviso.clear()
+            try:
+                for shard, motor in motores.items():
+                    with motor.connect() as conexion:
+                        filas = conexion.execute(
+                            select(tabla.c.id, tabla.c.user_id, tabla.c.tipo, tabla.c.datos)
+                            .where(tabla.c.id > ultimos[shard])
+                            .order_by(tabla.c.id)
+                        ).all()
+                    for fila in filas:
+                        self.repartir(fila.id, fila.user_id, fila.tipo, fila.datos)
+                        ultimos[shard] = fila.id
+
+                # De vez en cuando se borran los eventos que ya no hacen falta para reconectar
+                vueltas += 1
+                if vueltas % 60 == 0:
+                    limite = datetime.utcnow() - timedelta(seconds=app.config['EVENTOS_RETENCION'])
+                    for shard in motores:
+                        with app.app_context():
+                            usar_shard(shard)
+                            db.session.execute(delete(tabla).where(tabla.c.fecha < limite))
+                            db.session.commit()
+            except Exception:
+                app.logger.exception('Error leyendo task_event')
+
+bus = BusMemoria(100)
+
+def init_app(app):
+    global bus
+    if app.config['EVENTOS_BACKEND'] == 'sqlite':
+        bus = BusSQLite(app.config['EVENTOS_COLA'])
+    else:
+        bus = BusMemoria(app.config['EVENTOS_COLA'])
+
+# ==================== PUBLICACIÓN ====================
+
+def datos_tarea(created_by, assigned_to, estado):
+    return {'created_by': created_by, 'assigned_to': assigned_to, 'estado': estado or 'pendiente'}
+
+def cambio_tarea(tarea_id, accion, antes, despues):
+    """
+    Eventos ('tarea') de un cambio, uno por usuario afectado.
+    antes/despues son datos_tarea(...) o None si la tarea no existía o se eliminó.
+    """
+    datos = json.dumps({'id': tarea_id, 'accion': accion, 'antes': antes, 'despues': despues})
+    usuarios = set()
+    for estado in (antes, despues):
+        if estado:
+            usuarios.update((estado['created_by'], estado['assigned_to']))
+    return [(user_id, 'tarea', datos) for user_id in usuarios if user_id]
+
+def publicar(sesion, eventos):
+    """Añade eventos a la transacción actual; se reparten cuando se confirma"""
+    if not eventos:
+        return
+    bus.guardar(sesion.connection(), eventos)
+    sesion.info.setdefault('eventos', []).extend(eventos)
+
+@event.listens_for(db.session, 'after_flush')
+def recoger_cambios_tareas(sesion, flush_context):
+    eventos = []
+    for obj in sesion.new:
+        if isinstance(obj, Task):
+            eventos += cambio_tarea(obj.id, 'creada', None,
+                                    datos_tarea(obj.created_by, obj.assigned_to, obj.estado))
+    for obj in sesion.deleted:
+        if isinstance(obj, Task):
+            eventos += cambio_tarea(obj.id, 'eliminada', datos_tarea(
+                valor_anterior(obj, 'created_by'), valor_anterior(obj, 'assigned_to'),
+                valor_anterior(obj, 'estado')), None)
+    for obj in sesion.dirty:
+        if isinstance(obj, Task) and sesion.is_modified(obj):
+            eventos += cambio_tarea(obj.id, 'actualizada', datos_tarea(
+                valor_anterior(obj, 'created_by'), valor_anterior(obj, 'assigned_to'),
+                valor_anterior(obj, 'estado')), datos_tarea(obj.created_by, obj.assigned_to, obj.estado))
+    publicar(sesion, eventos)
+
+@event.listens_for(db.session, 'after_commit')
+def repartir_eventos(sesion):
+    eventos = sesion.info.pop('eventos', None)
+    if eventos:
+        bus.confirmar(eventos)
+
+@event.listens_for(db.session, 'after_rollback')
+def descartar_eventos(sesion):
+    sesion.info.pop('eventos', None)
+
+# ==================== RESPUESTAS ====================
+
+def es_peticion_remota():
+    """Formularios enviados con fetch desde los dashboards en tiempo real"""
+    return request.headers.get('X-Requested-With') == 'fetch'
+
+def responder_accion(mensaje, categoria, destino, status=200):
+    """
+    Respuesta de una acción de formulario: JSON si llega por fetch (la página se
+    actualiza con el evento) o mensaje flash y redirección como hasta ahora.
+    """
+    if es_peticion_remota():
+        return jsonify({'mensaje': mensaje, 'categoria': categoria}), status
+    flash(mensaje, categoria)
+    return redirect(destino)
@@ -0,0 +1,233 @@
+"""
+Exportación e importación de tareas en CSV o JSON por líneas (NDJSON)
+
+La exportación lee Task unida a User (nombres de usuario del creador y del asignado)
+con yield_per: las filas llegan de lote en lote desde el cursor de SQLite y se
+escriben según llegan, así que la memoria no crece con el número de tareas.
+
+La importación lee las filas de una en una, las valida y las inserta con un INSERT
+por lote (executemany). Los usuarios se resuelven por nombre de usuario con un único
+diccionario cargado al empezar. Los INSERT en bloque no pasan por los after_flush:
+aquí se ajustan task_stats, task_rollup_dia y user_version por lote; no se publican eventos para los
+dashboards abiertos (se ponen al día al recargar). No depende de Flask.
+
+    flask --app app exportar-tareas [--formato csv|ndjson] [--salida tareas.csv]
+    flask --app app importar-tareas tareas.csv [--creador lider]
+"""
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import aliased
+from datetime import datetime, timezone
+import csv
+import io
+import json
+
+from models import (ESTADOS, PRIORIDADES, User, Task, aplicar_deltas_contadores, aplicar_deltas_rollup,
+                    cambios_rollup, clave_rollup, claves_contador, incrementar_versiones, reservar_ids)
+
+FORMATOS = ('csv', 'ndjson')
+TIPOS_MIME = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Columnas exportadas, en orden; 'creador' y 'asignado' son nombres de usuario
+COLUMNAS = ['id', 'titulo', 'descripcion', 'estado', 'prioridad', 'creador', 'asignado',
+            'nombre_archivo', 'fecha_creacion', 'fecha_completada']
+COLUMNAS_FECHA = {'fecha_creacion', 'fecha_completada'}
+# Columnas importadas que deben ser texto (o faltar / ser null en NDJSON)
+COLUMNAS_TEXTO = ['titulo', 'descripcion', 'estado', 'prioridad', 'creador', 'asignado',
+                  'fecha_creacion', 'fecha_completada']
+
+# ==================== EXPORTACIÓN ====================
+
+def consulta_exportacion(condicion=None):
+    """SELECT de las columnas exportadas (sin objetos del ORM), ordenado por id"""
+    creador = aliased(User)
+    asignado = aliased(User)
+    consulta = (
+        select(Task.id, Task.titulo, Task.descripcion, Task.estado, Task.prioridad,
+               creador.username.label('creador'), asignado.username.label('asignado'),
+               Task.nombre_archivo, Task.fecha_creacion, Task.fecha_completada)
+        .join(creador, Task.created_by == creador.id)
+        .outerjoin(asignado, Task.assigned_to == asignado.id)
+        .order_by(Task.id)
+    )
+    if condicion is not None:
+        consulta = consulta.where(condicion)
+    return consulta
+
+def filas_exportacion(sesion, condicion=None, lote=1000):
+    """Itera las filas a exportar leyendo `lote` filas del cursor cada vez"""
+    return sesion.execute(consulta_exportacion(condicion).execution_options(yield_per=lote))
+
+def valores(fila):
+    return {columna: (valor.isoformat() if columna in COLUMNAS_FECHA and valor is not None else valor)
+            for columna, valor in zip(COLUMNAS, fila)}
+
+def escribir_csv(filas, lote=1000):
+    """Genera el CSV en trozos de `lote` filas (con cabecera)"""
+    bufer = io.StringIO()
+    escritor = csv.DictWriter(bufer, fieldnames=COLUMNAS)
+    escritor.writeheader()
+    for i, fila in enumerate(filas, 1):
+        escritor.writerow(valores(fila))
+        if i % lote == 0:
+            yield bufer.getvalue()
+            bufer.seek(0)
+            bufer.truncate()
+    yield bufer.getvalue()
+
+def escribir_ndjson(filas, lote=1000):
+    """Genera un objeto JSON por línea, en trozos de `lote` filas"""
+    trozo = []
+    for fila in filas:
+        trozo.append(json.dumps(valores(fila), ensure_ascii=False))
+        if len(trozo) == lote:
+            yield '\n'.join(trozo) + '\n'
+            trozo = []
+    if trozo:
+        yield '\n'.join(trozo) + '\n'
+
+def exportar(sesion, formato, condicion=None, lote=1000):
+    """Trozos de texto de la exportación en `formato` ('csv' o 'ndjson')"""
+    escribir = escribir_csv if formato == 'csv' else escribir_ndjson
+    return escribir(filas_exportacion(sesion, condicion, lote), lote)
+
+# ==================== IMPORTACIÓN ====================
+
+class FilaNoValida(ValueError):
+    pass
+
+def leer_filas(archivo, formato):
+    """Diccionarios de un archivo de texto CSV (con cabecera) o NDJSON, de uno en uno"""
+    if formato == 'csv':
+        yield from csv.DictReader(archivo)
+        return
+    for linea in archivo:
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            fila = None
+        yield fila
+
+def formato_de(nombre_archivo, por_defecto='csv'):
+    """'csv' o 'ndjson' según la extensión del archivo"""
+    extension = nombre_archivo.rsplit('.', 1)[-1].lower() if '.' in nombre_archivo else ''
+    return 'ndjson' if extension in ('ndjson', 'jsonl', 'json') else por_defecto
+
+def leer_fecha(valor, campo):
+    """Fecha naive en UTC, como las guarda la aplicación; las que traen zona horaria se pasan a UTC"""
+    if not valor:
+        return None
+    try:
+        fecha = datetime.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise FilaNoValida(f'{campo} no es una fecha ISO 8601: {valor}')
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+def validar_fila(fila, usuarios, creador_id):
+    """
+    Valores para el INSERT de una fila importada. `usuarios` es {username: id};
+    si `creador_id` no es None todas las tareas se crean a su nombre.
+    Los id y nombre_archivo de una exportación se ignoran.
+    """
+    if not isinstance(fila, dict):
+        raise FilaNoValida('La fila no es un objeto')
+    for campo in COLUMNAS_TEXTO:
+        if fila.get(campo) is not None and not isinstance(fila[campo], str):
+            raise FilaNoValida(f'{campo} debe ser texto')
+    titulo = (fila.get('titulo') or '').strip()
+    if not titulo:
+        raise FilaNoValida('El título es obligatorio')
+    if len(titulo) > Task.titulo.type.length:
+        raise FilaNoValida(f'El título supera los {Task.titulo.type.length} caracteres')
+    estado = fila.get('estado') or 'pendiente'
+    if estado not in ESTADOS:
+        raise FilaNoValida(f'Estado no válido: {estado}')
+    prioridad = fila.get('prioridad') or 'media'
+    if prioridad not in PRIORIDADES:
+        raise FilaNoValida(f'Prioridad no válida: {prioridad}')
+
+    if creador_id is None:
+        creador_id = usuarios.get(fila.get('creador') or '')
+        if creador_id is None:
+            raise FilaNoValida(f"El creador no existe: {fila.get('creador')}")
+    assigned_to = None
+    if fila.get('asignado'):
+        assigned_to = usuarios.get(fila['asignado'])
+        if assigned_to is None:
+            raise FilaNoValida(f"El usuario asignado no existe: {fila['asignado']}")
+
+    fecha_creacion = leer_fecha(fila.get('fecha_creacion'), 'fecha_creacion') or datetime.utcnow()
+    fecha_completada = leer_fecha(fila.get('fecha_completada'), 'fecha_completada')
+    if estado == 'completada' and fecha_completada is None:
+        fecha_completada = fecha_creacion
+    elif estado != 'completada':
+        fecha_completada = None
+    # Mismas claves en todas las filas: executemany agrupa el lote en una sola sentencia
+    return {
+        'titulo': titulo,
+        'descripcion': fila.get('descripcion') or None,
+        'estado': estado,
+        'prioridad': prioridad,
+        'created_by': creador_id,
+        'assigned_to': assigned_to,
+        'fecha_creacion': fecha_creacion,
+        'fecha_completada': fecha_completada,
+    }
+
+def insertar_lote(sesion, valores_lote):
+    """INSERT del lote con executemany; ajusta task_stats, task_rollup_dia y user_version como los after_flush"""
+    # Los id se reservan en bloque: como las tareas del ORM, nunca reutilizan uno archivado
+    primero = reservar_ids(sesion.connection(), len(valores_lote))
+    sesion.execute(insert(Task.__table__), [dict(fila, id=primero + i) for i, fila in enumerate(valores_lote)])
+    deltas = {}
+    cambios = []
+    for fila in valores_lote:
+        for clave in claves_contador(fila['created_by'], fila['assigned_to'], fila['estado']):
+            deltas[clave] = deltas.get(clave, 0) + 1
+        cambios += cambios_rollup(None, None, clave_rollup(
+            fila['created_by'], fila['assigned_to'], fila['estado'], fila['prioridad'],
+            fila['fecha_creacion'], fila['fecha_completada']))
+    conexion = sesion.connection()
+    aplicar_deltas_contadores(conexion, deltas)
+    aplicar_deltas_rollup(conexion, cambios)
+    incrementar_versiones(conexion, {user_id for user_id, rol, estado in deltas})
+
+def importar_tareas(sesion, filas, creador_id=None, lote=1000, confirmar=True, max_errores=100,
+                    progreso=None):
+    """
+    Valida e inserta las filas de `lote` en `lote`. Las filas no válidas se saltan y se
+    devuelven como errores ({'fila': n, 'error': ...}, como mucho `max_errores`).
+    Con confirmar=True se hace commit tras cada lote (se puede interrumpir sin dejar
+    lotes a medias); con False el llamante decide si confirma o deshace todo.
+    Devuelve (importadas, rechazadas, errores).
+    """
+    usuarios = dict(sesion.execute(select(User.username, User.id)).all())
+    importadas = rechazadas = 0
+    errores = []
+    pendientes = []
+    for numero, fila in enumerate(filas, 1):
+        try:
+            pendientes.append(validar_fila(fila, usuarios, creador_id))
+        except FilaNoValida as e:
+            rechazadas += 1
+            if len(errores) < max_errores:
+                errores.append({'fila': numero, 'error': str(e)})
+            continue
+        if len(pendientes) == lote:
+            insertar_lote(sesion, pendientes)
+            importadas += len(pendientes)
+            pendientes = []
+            if confirmar:
+                sesion.commit()
+            if progreso:
+                progreso(importadas)
+    if pendientes:
+        insertar_lote(sesion, pendientes)
+        importadas += len(pendientes)
+        if confirmar:
+            sesion.commit()
+    return importadas, rechazadas, errores
@@ -0,0 +1,92 @@
+"""
+Extensión Flask-SQLAlchemy compartida y ajustes de las conexiones SQLite.
+Se inicializa sobre la aplicación en create_app() con init_app().
+"""
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as SesionFlaskSQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
+
+from config import Config
+from models import Base
+from shards import shard_actual
+
+# Peticiones GET que escriben en la base de datos (no pueden usar las conexiones de solo lectura)
+ENDPOINTS_GET_CON_ESCRITURA = {'auth.setup'}
+
+class SesionLecturaEscritura(SesionFlaskSQLAlchemy):
+    """
+    Sesión que, en peticiones de solo lectura, ejecuta las consultas en el bind 'lectura'.
+    Los flush (y cualquier petición que no sea GET/HEAD) siguen usando el motor de escritura.
+    Con shards, ambos motores son los del shard del usuario (g.shard).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            lectura = not self._flushing and has_request_context() and g.get('solo_lectura')
+            # Con shards (ver shards.py) cada equipo tiene su propio par de motores
+            shard = shard_actual()
+            if shard:
+                return self._db.engines[f'shard:{shard}:lectura' if lectura else f'shard:{shard}']
+            if lectura:
+                motor = self._db.engines.get('lectura')
+                if motor is not None:
+                    return motor
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(metadata=Base.metadata, session_options={'class_': SesionLecturaEscritura})
+
+# Los modelos de models.py no heredan de db.Model: se les añade aquí Model.query
+Base.query = db.session.query_property(query_cls=db.Query)
+
+def _ajuste(nombre):
+    """Valor de configuración de la aplicación activa, o el de Config fuera de ella (scripts)"""
+    if has_app_context():
+        return current_app.config[nombre]
+    return getattr(Config, nombre)
+
+@event.listens_for(Engine, 'connect')
+def configurar_conexion_sqlite(dbapi_connection, connection_record):
+    """Ajustes de rendimiento para cada conexión SQLite nueva"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL queda guardado en el archivo; las conexiones de solo lectura no pueden cambiarlo
+        cursor.execute('PRAGMA journal_mode=WAL')
+    except sqlite3.OperationalError:
+        pass
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f"PRAGMA busy_timeout={int(_ajuste('SQLITE_BUSY_TIMEOUT'))}")
+    cursor.execute(f"PRAGMA mmap_size={int(_ajuste('SQLITE_MMAP_SIZE'))}")
+    cursor.execute(f"PRAGMA cache_size=-{int(_ajuste('SQLITE_CACHE_KB'))}")
+    cursor.close()
+
+# Contador de sentencias SQL por petición (usado por SQL_LIMITE_CONSULTAS y SQL_CABECERA_CONSULTAS)
+@event.listens_for(Engine, 'before_cursor_execute')
+def contar_consulta_sql(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.consultas_sql = g.get('consultas_sql', 0) + 1
+
+def marcar_peticion_solo_lectura():
+    g.solo_lectura = (current_app.config['SQLITE_LECTURA_SEPARADA']
+                      and request.method in ('GET', 'HEAD')
+                      and request.endpoint not in ENDPOINTS_GET_CON_ESCRITURA)
+
+def verificar_limite_consultas(response):
+    limite = current_app.config['SQL_LIMITE_CONSULTAS']
+    total = g.get('consultas_sql', 0)
+    if current_app.config['SQL_CABECERA_CONSULTAS']:
+        response.headers['X-Consultas-SQL'] = str(total)
+    if limite is not None and total > limite:
+        raise AssertionError(
+            f"{request.method} {request.path} ejecutó {total} consultas SQL (límite: {limite})")
+    return response
+
+def init_app(app):
+    db.init_app(app)
+    app.before_request(marcar_peticion_solo_lectura)
+    app.after_request(verificar_limite_consultas)
@@ -0,0 +1,60 @@
+"""
+Caché de las tarjetas de tareas ya renderizadas.
+
+Los dashboards y el listado de tareas de un miembro pintan la misma tarjeta de cada
+tarea en cada petición. Aquí se guarda el HTML de cada tarjeta con la clave
+(vista, task.id, task.version): cualquier cambio en la tarea, en el nombre de su
+creador o asignado o en la miniatura de su adjunto sube task.version (ver models.py),
+así que una clave nunca devuelve una tarjeta desactualizada.
+
+En las plantillas: {{ tarjeta(tarea, 'miembro') }}
+"""
+
+from flask import current_app, g
+from markupsafe import Markup
+
+from cache import CacheCompartidaSQLite, CacheFragmentos
+from config import Config
+
+# Plantilla parcial de cada vista
+PLANTILLAS = {
+    'miembro': '_tarjeta_miembro.html',       # dashboard del miembro
+    'asignada': '_tarjeta_asignada.html',     # tareas asignadas al líder
+    'creada': '_fila_creada.html',            # tabla de tareas creadas por el líder
+    'historial': '_fila_historial.html',      # tareas de un miembro vistas por el líder
+}
+
+# Presentación de cada prioridad en las tarjetas: (emoji, color del badge)
+PRIORIDADES_VISTA = {
+    'baja': ('🟢', 'success'),
+    'media': ('🟡', 'warning'),
+    'alta': ('🟠', 'danger'),
+    'urgente': ('🔴', 'dark'),
+}
+
+cache_fragmentos = CacheFragmentos(Config.FRAGMENTOS_CACHE_BYTES)
+
+def init_app(app):
+    cache_fragmentos.max_bytes = app.config['FRAGMENTOS_CACHE_BYTES']
+    if app.config['FRAGMENTOS_CACHE_COMPARTIDA']:
+        cache_fragmentos.compartida = CacheCompartidaSQLite(app.config['FRAGMENTOS_CACHE_COMPARTIDA'])
+    app.jinja_env.globals['tarjeta'] = tarjeta
+    app.jinja_env.globals['prioridades'] = PRIORIDADES_VISTA
+
+def tarjeta(tarea, vista):
+    """HTML de la tarjeta de una tarea en una vista, desde la caché si ya se renderizó"""
+    plantilla = PLANTILLAS[vista]
+    if not current_app.config['FRAGMENTOS_CACHE']:
+        return Markup(current_app.jinja_env.get_template(plantilla).render(tarea=tarea))
+
+    # Una tarea archivada conserva id y versión pero su tarjeta no tiene acciones
+    clave = f"{vista}:{'a' if tarea.archivada else 't'}{tarea.id}:{tarea.version}"
+    if g.get('shard'):
+        # Con shards los id de tarea se repiten entre equipos
+        clave = f"{g.shard}:{clave}"
+    html = cache_fragmentos.get(clave)
+    if html is None:
+        # Las tarjetas solo usan la tarea y url_for: no hace falta el contexto de render_template
+        html = current_app.jinja_env.get_template(plantilla).render(tarea=tarea)
+        cache_fragmentos.set(clave, html)
+    return Markup(html)
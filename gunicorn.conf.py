@@ -0,0 +1,37 @@
+"""
+Configuración de gunicorn para producción: gunicorn -c gunicorn.conf.py wsgi:app
+
+Cada dashboard abierto mantiene una conexión /eventos (SSE) que ocupa un hilo hasta
+EVENTOS_DURACION segundos. Con nginx, /eventos se sirve desde un servidor aparte con
+muchos hilos (gunicorn_eventos.conf.py) y estos procesos quedan para el resto de rutas:
+
+    location /eventos { proxy_pass http://127.0.0.1:8001; proxy_buffering off; proxy_read_timeout 1h; }
+    location /        { proxy_pass http://127.0.0.1:8000; }
+
+con proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for y X-Forwarded-Proto $scheme
+en ambas; PROXY_SALTOS=1 hace que la aplicación tome de ahí la IP del cliente.
+
+Sin ese servidor, como mucho la mitad de los hilos de cada proceso atienden /eventos
+(EVENTOS_MAX_CONEXIONES); los demás dashboards funcionan sin tiempo real.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Varios procesos para repartir las lecturas; cada uno tiene un solo escritor SQLite
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+os.environ.setdefault('EVENTOS_MAX_CONEXIONES', str(max(threads // 2, 1)))
+
+# Cada proceso abre sus propias conexiones: no cargar la app antes del fork
+preload_app = False
+
+# Entre procesos (y con el servidor de /eventos) los eventos se reparten a través de la tabla task_event
+os.environ.setdefault('EVENTOS_BACKEND', 'sqlite')
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
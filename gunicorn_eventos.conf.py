@@ -0,0 +1,29 @@
+"""
+Servidor dedicado a /eventos (SSE): gunicorn -c gunicorn_eventos.conf.py wsgi:app
+
+Las conexiones SSE pasan casi todo el tiempo esperando eventos en una cola, así que
+un hilo por dashboard abierto cuesta poca CPU: aquí hay muchos hilos por proceso y
+nginx solo envía /eventos a este servidor (ver gunicorn.conf.py). Los eventos llegan
+de los procesos de la aplicación a través de la tabla task_event.
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND_EVENTOS', '127.0.0.1:8001')
+
+workers = int(os.environ.get('GUNICORN_WORKERS_EVENTOS', 2))
+worker_class = 'gthread'
+# Dashboards abiertos a la vez que admite cada proceso (más unos hilos libres)
+threads = int(os.environ.get('GUNICORN_THREADS_EVENTOS', 256))
+os.environ.setdefault('EVENTOS_MAX_CONEXIONES', str(max(threads - 8, 1)))
+
+preload_app = False
+
+os.environ.setdefault('EVENTOS_BACKEND', 'sqlite')
+# Las miniaturas se generan en los procesos de la aplicación
+os.environ.setdefault('TRABAJOS_EN_PROCESO', '0')
+
+# Las conexiones duran hasta EVENTOS_DURACION segundos y envían latidos mientras tanto
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
@@ -3,25 +3,35 @@ Script para inicializar la base de datos con usuarios de prueba
 Ejecuta este archivo para crear la base de datos desde cero
 """
 
-from app import app, db, User
-from werkzeug.security import generate_password_hash
+from config import RUTA_BASE_DATOS
+from contrasenas import hash_contrasena
+from migraciones import marcar_aplicadas
+from models import Base, User, crear_motor
+from sqlalchemy.orm import Session
 import os
 
 def init_database():
     """Inicializa la base de datos con usuarios de prueba"""
     
-    with app.app_context():
-        # Eliminar base de datos existente si existe
-        if os.path.exists('todo.db'):
-            print("⚠️  Eliminando base de datos anterior...")
-            os.remove('todo.db')
-        
-        # Crear todas las tablas
-        print("📦 Creando tablas de la base de datos...")
-        db.create_all()
-        
+    # Eliminar base de datos existente si existe
+    if os.path.exists(RUTA_BASE_DATOS):
+        print("⚠️  Eliminando base de datos anterior...")
+        # En modo WAL quedan también los archivos -wal y -shm junto a la base de datos
+        for ruta in (RUTA_BASE_DATOS, RUTA_BASE_DATOS + '-wal', RUTA_BASE_DATOS + '-shm'):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+    os.makedirs(os.path.dirname(RUTA_BASE_DATOS), exist_ok=True)
+    
+    # Crear todas las tablas
+    print("📦 Creando tablas de la base de datos...")
+    motor = crear_motor()
+    Base.metadata.create_all(motor)
+    # create_all ya crea el esquema actual: ninguna migración está pendiente
+    marcar_aplicadas(RUTA_BASE_DATOS)
+    
+    with Session(motor) as sesion:
         # Verificar si ya existen usuarios
-        if User.query.first():
+        if sesion.query(User).first():
             print("✅ Los usuarios ya existen en la base de datos")
             return
         
@@ -29,7 +39,7 @@ def init_database():
         print("👔 Creando líder de equipo...")
         lider = User(
             username='lider1',
-            password=generate_password_hash('lider123'),
+            password=hash_contrasena('lider123'),
             role='lider',
             nombre='Juan Pérez'
         )
@@ -38,21 +48,21 @@ def init_database():
         print("👥 Creando miembros del equipo...")
         miembro1 = User(
             username='miembro1',
-            password=generate_password_hash('miembro123'),
+            password=hash_contrasena('miembro123'),
             role='miembro',
             nombre='María García'
         )
         
         miembro2 = User(
             username='miembro2',
-            password=generate_password_hash('miembro123'),
+            password=hash_contrasena('miembro123'),
             role='miembro',
             nombre='Carlos López'
         )
         
         # Guardar en la base de datos
-        db.session.add_all([lider, miembro1, miembro2])
-        db.session.commit()
+        sesion.add_all([lider, miembro1, miembro2])
+        sesion.commit()
         
         print("\n" + "="*60)
         print("✅ ¡Base de datos inicializada correctamente!")
@@ -81,4 +91,4 @@ if __name__ == '__main__':
         init_database()
     except Exception as e:
         print(f"\n❌ Error al inicializar la base de datos: {e}")
-        print("Asegúrate de que app.py esté en el mismo directorio")
\ No newline at end of file
+        print("Asegúrate de que models.py esté en el mismo directorio")
\ No newline at end of file
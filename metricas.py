@@ -0,0 +1,187 @@
+"""
+Instrumentación por petición (opcional, METRICAS=1)
+
+Por cada petición se registra: ruta (endpoint), tiempo real y de CPU, número de
+sentencias SQL y tiempo total en SQL, tiempo de renderizado de plantillas y bytes
+enviados. Los totales se exponen en /metrics con el formato de texto de Prometheus
+(ver blueprints/metricas.py) y las peticiones que superan METRICAS_LENTA_MS se
+escriben en el logger 'todo.lentas', con el perfil de cProfile si la petición
+estaba en la muestra (METRICAS_PERFIL_MUESTREO).
+
+Con METRICAS desactivado init_app() no registra nada: el único coste es el contador
+de sentencias SQL que ya existía (extensions.contar_consulta_sql).
+Los valores son de cada proceso; con gunicorn cada worker expone los suyos.
+"""
+
+from flask import before_render_template, current_app, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import defaultdict
+import cProfile
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+
+log_lentas = logging.getLogger('todo.lentas')
+
+# Límites superiores (segundos) de los buckets del histograma de duración
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class RegistroMetricas:
+    """Contadores e histogramas en memoria, con etiquetas, seguros entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = defaultdict(float)
+        self._histogramas = {}
+
+    def sumar(self, nombre, etiquetas, valor=1):
+        with self._lock:
+            self._contadores[(nombre, etiquetas)] += valor
+
+    def observar(self, nombre, etiquetas, valor):
+        with self._lock:
+            histograma = self._histogramas.get((nombre, etiquetas))
+            if histograma is None:
+                histograma = self._histogramas[(nombre, etiquetas)] = [[0] * len(BUCKETS), 0, 0.0]
+            for i, limite in enumerate(BUCKETS):
+                if valor <= limite:
+                    histograma[0][i] += 1
+            histograma[1] += 1
+            histograma[2] += valor
+
+    def limpiar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def texto(self):
+        """Exposición en formato de texto de Prometheus"""
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted((clave, (list(h[0]), h[1], h[2])) for clave, h in self._histogramas.items())
+        lineas = []
+        vistos = set()
+        for (nombre, etiquetas), valor in contadores:
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# TYPE {nombre} counter")
+            lineas.append(f"{nombre}{formato_etiquetas(etiquetas)} {valor:g}")
+        for (nombre, etiquetas), (buckets, cuenta, suma) in histogramas:
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# TYPE {nombre} histogram")
+            for limite, acumulado in zip(BUCKETS, buckets):
+                lineas.append(f"{nombre}_bucket{formato_etiquetas(etiquetas + (('le', f'{limite:g}'),))} {acumulado}")
+            lineas.append(f"{nombre}_bucket{formato_etiquetas(etiquetas + (('le', '+Inf'),))} {cuenta}")
+            lineas.append(f"{nombre}_count{formato_etiquetas(etiquetas)} {cuenta}")
+            lineas.append(f"{nombre}_sum{formato_etiquetas(etiquetas)} {suma:.6f}")
+        return '\n'.join(lineas) + '\n'
+
+def formato_etiquetas(etiquetas):
+    if not etiquetas:
+        return ''
+    valores = []
+    for clave, valor in etiquetas:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+        valores.append(f'{clave}="{valor}"')
+    return '{' + ','.join(valores) + '}'
+
+registro = RegistroMetricas()
+
+def init_app(app):
+    if not app.config['METRICAS']:
+        return
+    app.before_request(empezar_medicion)
+    app.after_request(terminar_medicion)
+    before_render_template.connect(empezar_plantilla, app)
+    template_rendered.connect(terminar_plantilla, app)
+    if not event.contains(Engine, 'before_cursor_execute', empezar_sql):
+        event.listen(Engine, 'before_cursor_execute', empezar_sql)
+        event.listen(Engine, 'after_cursor_execute', terminar_sql)
+
+# ==================== MEDICIÓN ====================
+
+def empezar_medicion():
+    g.metricas = {'inicio': time.perf_counter(), 'cpu': time.thread_time(),
+                  'sql': 0.0, 'plantillas': 0.0, 'plantillas_abiertas': []}
+    if random.random() < current_app.config['METRICAS_PERFIL_MUESTREO']:
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Ya hay otro perfilador activo en este hilo
+            return
+        g.metricas['perfil'] = perfil
+
+def empezar_sql(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('inicio_sql', []).append(time.perf_counter())
+
+def terminar_sql(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info['inicio_sql'].pop()
+    metricas = g.get('metricas') if has_app_context() else None
+    if metricas is not None:
+        metricas['sql'] += time.perf_counter() - inicio
+
+def empezar_plantilla(sender, template, context, **extra):
+    metricas = g.get('metricas')
+    if metricas is not None:
+        metricas['plantillas_abiertas'].append(time.perf_counter())
+
+def terminar_plantilla(sender, template, context, **extra):
+    metricas = g.get('metricas')
+    if metricas is not None and metricas['plantillas_abiertas']:
+        inicio = metricas['plantillas_abiertas'].pop()
+        # Solo la plantilla exterior: las anidadas ya están dentro de su tiempo
+        if not metricas['plantillas_abiertas']:
+            metricas['plantillas'] += time.perf_counter() - inicio
+
+def terminar_medicion(response):
+    metricas = g.pop('metricas', None)
+    if metricas is None:
+        return response
+    perfil = metricas.get('perfil')
+    if perfil is not None:
+        perfil.disable()
+    duracion = time.perf_counter() - metricas['inicio']
+    cpu = time.thread_time() - metricas['cpu']
+    consultas = g.get('consultas_sql', 0)
+    ruta = request.endpoint or 'sin_ruta'
+    etiquetas = (('ruta', ruta),)
+
+    registro.sumar('todo_peticiones_total', etiquetas + (('metodo', request.method), ('estado', response.status_code)))
+    registro.observar('todo_peticion_segundos', etiquetas, duracion)
+    registro.sumar('todo_peticion_cpu_segundos_total', etiquetas, cpu)
+    registro.sumar('todo_sql_consultas_total', etiquetas, consultas)
+    registro.sumar('todo_sql_segundos_total', etiquetas, metricas['sql'])
+    registro.sumar('todo_plantillas_segundos_total', etiquetas, metricas['plantillas'])
+    if response.content_length is not None:
+        registro.sumar('todo_bytes_enviados_total', etiquetas, response.content_length)
+    elif response.is_streamed and not response.direct_passthrough:
+        # Respuestas en streaming sin longitud (SSE): se cuentan a medida que salen
+        response.response = contar_bytes(response.response, etiquetas)
+
+    if duracion * 1000 >= current_app.config['METRICAS_LENTA_MS']:
+        registro.sumar('todo_peticiones_lentas_total', etiquetas)
+        log_lentas.warning(
+            "%s %s (%s) %d en %.0f ms: CPU %.0f ms, %d consultas SQL en %.0f ms, plantillas %.0f ms, %s bytes",
+            request.method, request.full_path.rstrip('?'), ruta, response.status_code, duracion * 1000,
+            cpu * 1000, consultas, metricas['sql'] * 1000, metricas['plantillas'] * 1000,
+            response.content_length if response.content_length is not None else '?')
+        if perfil is not None:
+            salida = io.StringIO()
+            pstats.Stats(perfil, stream=salida).sort_stats('cumulative').print_stats(25)
+            log_lentas.warning("Perfil de %s %s:\n%s", request.method, request.path, salida.getvalue())
+    return response
+
+def contar_bytes(iterable, etiquetas):
+    try:
+        for trozo in iterable:
+            registro.sumar('todo_bytes_enviados_total', etiquetas, len(trozo))
+            yield trozo
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
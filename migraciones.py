@@ -0,0 +1,473 @@
+"""
+Migraciones del esquema de la base de datos (sustituye a instance/migrate_db.py)
+
+    python migraciones.py [--db instance/todo.db] [--simular] [--estado]
+                          [--hasta VERSION] [--lote 2000] [--pausa 0.05]
+
+Cada migración tiene un número de versión y se aplica una sola vez y en orden; las
+aplicadas quedan anotadas en la tabla schema_version. Una migración tiene dos partes:
+- esquema: sentencias cortas (CREATE TABLE, ALTER TABLE ... ADD COLUMN, CREATE INDEX,
+  triggers) en una sola transacción. Se calculan mirando el esquema actual, así que
+  repetirlas no hace nada. En SQLite ADD COLUMN con DEFAULT no reescribe la tabla:
+  las filas existentes ya leen el valor por defecto sin ningún UPDATE.
+- rellenos: cambios de datos que recorren una tabla por rangos de id, de `lote` en
+  `lote` filas. Cada lote es una transacción corta (BEGIN IMMEDIATE) que guarda también
+  el último id procesado; entre lotes se suelta el bloqueo de escritura `pausa`
+  segundos. La aplicación sigue atendiendo mientras tanto y, si se interrumpe, al
+  volver a lanzarlo continúa donde se quedó. Solo se recorren las filas que existían
+  al empezar: las nuevas ya las escribe la aplicación con el formato nuevo.
+
+Con --simular no se cambia nada: se listan las migraciones pendientes, las sentencias
+de esquema que ejecutarían y una estimación de las filas que tocarían sus rellenos.
+init_db.py marca todas las versiones como aplicadas en las bases de datos nuevas.
+No depende de Flask.
+"""
+
+from sqlalchemy.dialects import sqlite as dialecto_sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from datetime import datetime
+import argparse
+import json
+import os
+import pathlib
+import sqlite3
+import time
+
+from config import BASE_DIR, RUTA_BASE_DATOS, Config
+from models import (DDL_BUSQUEDA, ESTADOS, MIGRACION_CONTADORES, MIGRACION_ROLLUPS, PRIORIDADES, Base, Secuencia,
+                    TaskRollupDia, cubo_duracion)
+
+SQL_SCHEMA_VERSION = """CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    estado VARCHAR(20) NOT NULL,
+    progreso TEXT,
+    fecha_inicio DATETIME,
+    fecha_fin DATETIME)"""
+
+class Relleno:
+    """
+    Cambio de datos sobre `tabla` por rangos de id. `sentencia` debe limitarse a las
+    filas con id > :desde AND id <= :hasta. `pendientes` es la condición de las filas
+    que aún hay que cambiar, solo para estimar con --simular (None: todas).
+    `ids` es el SELECT de los id que se recorren, si no son solo los de `tabla`.
+    """
+
+    def __init__(self, tabla, sentencia, pendientes=None, ids=None):
+        self.tabla = tabla
+        self.sentencia = sentencia
+        self.pendientes = pendientes
+        self.ids = ids or f"SELECT id FROM {tabla}"
+
+class Migracion:
+    """
+    `esquema(conexion)` devuelve las sentencias de esquema que faltan ([] si no falta
+    nada). Si una migración con esquema no tiene nada que hacer, sus rellenos tampoco
+    se ejecutan (los datos ya están en el formato nuevo).
+    """
+
+    def __init__(self, version, nombre, esquema=None, rellenos=()):
+        self.version = version
+        self.nombre = nombre
+        self.esquema = esquema
+        self.rellenos = list(rellenos)
+
+# ==================== ESQUEMA ACTUAL ====================
+
+def tablas(conexion):
+    return {nombre for (nombre,) in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def columnas(conexion, tabla):
+    return [fila[1] for fila in conexion.execute(f"PRAGMA table_info({tabla})")]
+
+def indices(conexion):
+    return {nombre for (nombre,) in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+def nombre_de(columna, valores):
+    """CASE que cambia cada posición de `valores` por su nombre (NULL y desconocidos: el primero)"""
+    ramas = ' '.join(f"WHEN {i} THEN '{valor}'" for i, valor in enumerate(valores))
+    return f"CASE {columna} {ramas} ELSE '{valores[0]}' END"
+
+def caso(columna, valores):
+    """CASE que cambia cada nombre de `valores` por su posición (y deja lo demás como está)"""
+    ramas = ' '.join(f"WHEN '{valor}' THEN {i}" for i, valor in enumerate(valores))
+    return f"CASE {columna} {ramas} ELSE {columna} END"
+
+# ==================== MIGRACIONES ====================
+
+def tablas_nuevas(conexion):
+    """Tablas de models.py que aún no existen, con sus índices"""
+    existentes = tablas(conexion)
+    dialecto = dialecto_sqlite.dialect()
+    sentencias = []
+    for tabla in Base.metadata.sorted_tables:
+        if tabla.name in existentes:
+            continue
+        sentencias.append(str(CreateTable(tabla).compile(dialect=dialecto)).strip())
+        sentencias += [str(CreateIndex(indice).compile(dialect=dialecto)) for indice in tabla.indexes]
+    return sentencias
+
+# Columnas añadidas después de crear cada tabla: (tabla, columna, definición)
+COLUMNAS_NUEVAS = [
+    ('task', 'prioridad', f"SMALLINT DEFAULT {PRIORIDADES.index('media')}"),
+    ('task', 'archivo', 'VARCHAR(300)'),
+    ('task', 'nombre_archivo', 'VARCHAR(300)'),
+    ('task', 'attachment_id', 'INTEGER REFERENCES attachment(id)'),
+    ('task', 'version', 'INTEGER NOT NULL DEFAULT 1'),
+    ('attachment', 'miniatura', 'VARCHAR(300)'),
+]
+
+def columnas_nuevas(conexion):
+    sentencias = []
+    for tabla, columna, definicion in COLUMNAS_NUEVAS:
+        existentes = columnas(conexion, tabla)
+        # Sin columnas la tabla no existe: la crea la migración 1 ya completa
+        if existentes and columna not in existentes:
+            sentencias.append(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+    return sentencias
+
+def relleno_codigos(tabla):
+    """estado y prioridad guardados como texto -> su posición en ESTADOS y PRIORIDADES"""
+    nombres_estado = ', '.join(f"'{estado}'" for estado in ESTADOS)
+    nombres_prioridad = ', '.join(f"'{prioridad}'" for prioridad in PRIORIDADES)
+    pendientes = f"(estado IN ({nombres_estado}) OR prioridad IN ({nombres_prioridad}))"
+    return Relleno(
+        tabla,
+        f"""UPDATE {tabla} SET estado = {caso('estado', ESTADOS)}, prioridad = {caso('prioridad', PRIORIDADES)}
+            WHERE id > :desde AND id <= :hasta AND {pendientes}""",
+        pendientes,
+    )
+
+# Índices compuestos usados por la paginación y los órdenes de los listados
+INDICES_TASK = {
+    'ix_task_creador_fecha': '(created_by, fecha_creacion, id)',
+    'ix_task_asignado_estado_fecha': '(assigned_to, estado, fecha_creacion)',
+    'ix_task_creador_prioridad': '(created_by, prioridad, fecha_creacion, id)',
+    'ix_task_creador_completada': '(created_by, fecha_completada, id)',
+    'ix_task_creador_asignado': '(created_by, assigned_to, fecha_creacion DESC, id DESC)',
+    'ix_task_asignado_prioridad': '(assigned_to, prioridad, fecha_creacion, id)',
+    'ix_task_asignado_completada': '(assigned_to, fecha_completada, id)',
+}
+
+def indices_task(conexion):
+    existentes = indices(conexion)
+    return [f"CREATE INDEX {nombre} ON task {definicion}"
+            for nombre, definicion in INDICES_TASK.items() if nombre not in existentes]
+
+def indice_busqueda(conexion):
+    """
+    Tabla FTS5, índice de las tareas que ya existían y triggers, en este orden y en una
+    sola transacción. 'rebuild' indexa task entera de una vez: con un relleno por lotes
+    los triggers verían filas aún sin indexar (al editarlas FTS5 borraría entradas que
+    no existen y corrompería el índice) y, sin triggers, se perderían las escrituras.
+    """
+    if 'task_fts' in tablas(conexion):
+        return []
+    tabla_fts, *triggers = DDL_BUSQUEDA
+    return [tabla_fts, "INSERT INTO task_fts(task_fts) VALUES ('rebuild')", *triggers]
+
+def tabla_rollups(conexion):
+    """task_rollup_dia vacía: el relleno la recalcula entera (también si ya la creó la aplicación)"""
+    sentencia = CreateTable(TaskRollupDia.__table__, if_not_exists=True).compile(dialect=dialecto_sqlite.dialect())
+    return [str(sentencia).strip(), "DELETE FROM task_rollup_dia"]
+
+def indice_rollups(conexion):
+    """Índice por día de task_rollup_dia: la analítica ya no filtra por creador (el inicio de la clave)"""
+    if 'ix_task_rollup_dia_fecha' in indices(conexion):
+        return []
+    return ["CREATE INDEX ix_task_rollup_dia_fecha ON task_rollup_dia (dia, assigned_to)"]
+
+# Las tareas archivadas conservan su id: el relleno recorre los id de task y task_archive
+# juntos, así una tarea que se archiva mientras tanto se cuenta una sola vez
+COLUMNAS_ROLLUP = "created_by, assigned_to, estado, prioridad, fecha_creacion, fecha_completada"
+RELLENO_ROLLUPS = Relleno(
+    'task',
+    f"""INSERT INTO task_rollup_dia (created_by, dia, assigned_to, prioridad, cubo, total)
+        SELECT created_by, date(fecha_completada), coalesce(assigned_to, 0),
+               coalesce(prioridad, {PRIORIDADES.index('media')}), cubo_duracion(fecha_creacion, fecha_completada),
+               count(*)
+        FROM (SELECT {COLUMNAS_ROLLUP} FROM task WHERE id > :desde AND id <= :hasta
+              UNION ALL
+              SELECT {COLUMNAS_ROLLUP} FROM task_archive WHERE id > :desde AND id <= :hasta)
+        WHERE estado = {ESTADOS.index('completada')} AND fecha_completada IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (created_by, dia, assigned_to, prioridad, cubo) DO UPDATE SET total = total + excluded.total""",
+    ids="SELECT id FROM task UNION ALL SELECT id FROM task_archive",
+)
+
+def secuencia_task(conexion):
+    """
+    Tabla secuencia sembrada con el mayor id de task y task_archive: desde aquí los id de
+    las tareas nuevas salen de ella (models.reservar_ids) y no se reutiliza el de una
+    tarea archivada o borrada. No toca task: solo lee el final de las dos claves primarias.
+    """
+    crear = CreateTable(Secuencia.__table__, if_not_exists=True).compile(dialect=dialecto_sqlite.dialect())
+    return [
+        str(crear).strip(),
+        """INSERT INTO secuencia (nombre, valor)
+           SELECT 'task', max(coalesce((SELECT max(id) FROM task), 0), coalesce((SELECT max(id) FROM task_archive), 0))
+           WHERE true
+           ON CONFLICT (nombre) DO UPDATE SET valor = max(valor, excluded.valor)""",
+    ]
+
+def reiniciar_contadores(conexion):
+    """task_stats vacía: el relleno la recalcula entera, como flask reconciliar-estadisticas"""
+    return ["DELETE FROM task_stats"]
+
+# Las archivadas siguen contando en task_stats: se recorren task y task_archive juntas, como
+# en RELLENO_ROLLUPS. La aplicación no toca las tareas aún sin recorrer (models.rango_sin_rellenar)
+TAREAS_EN_RANGO = """(SELECT created_by, assigned_to, estado FROM task WHERE id > :desde AND id <= :hasta
+              UNION ALL
+              SELECT created_by, assigned_to, estado FROM task_archive WHERE id > :desde AND id <= :hasta)"""
+RELLENO_CONTADORES = Relleno(
+    'task',
+    f"""INSERT INTO task_stats (user_id, rol, estado, total)
+        SELECT user_id, rol, estado, count(*)
+        FROM (SELECT created_by AS user_id, 'creador' AS rol, {nombre_de('estado', ESTADOS)} AS estado
+              FROM {TAREAS_EN_RANGO}
+              UNION ALL
+              SELECT assigned_to, 'asignado', {nombre_de('estado', ESTADOS)}
+              FROM {TAREAS_EN_RANGO})
+        WHERE user_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, rol, estado) DO UPDATE SET total = total + excluded.total""",
+    ids="SELECT id FROM task UNION ALL SELECT id FROM task_archive",
+)
+
+MIGRACIONES = [
+    Migracion(1, 'tablas nuevas', tablas_nuevas),
+    Migracion(2, 'columnas nuevas de task y attachment', columnas_nuevas),
+    Migracion(3, 'estado y prioridad como códigos',
+              rellenos=[relleno_codigos('task'), relleno_codigos('task_archive')]),
+    Migracion(4, 'índices compuestos de task', indices_task),
+    Migracion(5, 'índice de búsqueda', indice_busqueda),
+    Migracion(MIGRACION_ROLLUPS, 'resúmenes diarios de tareas completadas', tabla_rollups,
+              rellenos=[RELLENO_ROLLUPS]),
+    Migracion(7, 'ids de tareas sin reutilizar', secuencia_task),
+    Migracion(8, 'índice de los resúmenes diarios por día', indice_rollups),
+    Migracion(MIGRACION_CONTADORES, 'contadores de tareas por usuario', reiniciar_contadores,
+              rellenos=[RELLENO_CONTADORES]),
+]
+
+# ==================== MOTOR ====================
+
+def conectar(ruta):
+    """Conexión en modo autocommit: cada transacción se abre a mano con BEGIN IMMEDIATE"""
+    conexion = sqlite3.connect(ruta, isolation_level=None, timeout=Config.SQLITE_BUSY_TIMEOUT / 1000)
+    conexion.execute('PRAGMA journal_mode=WAL')
+    conexion.execute(SQL_SCHEMA_VERSION)
+    # El relleno de los resúmenes diarios calcula los cubos de duración con la misma función que la aplicación
+    conexion.create_function('cubo_duracion', 2, cubo_duracion, deterministic=True)
+    return conexion
+
+def conectar_lectura(ruta):
+    """Conexión de solo lectura para --simular y --estado: no crea schema_version ni cambia el modo del diario"""
+    uri = pathlib.Path(ruta).resolve().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True, timeout=Config.SQLITE_BUSY_TIMEOUT / 1000)
+
+def versiones(conexion):
+    """{version: (estado, progreso)} de las migraciones empezadas o aplicadas"""
+    if 'schema_version' not in tablas(conexion):
+        return {}  # Base de datos sin migrar abierta en solo lectura
+    return {version: (estado, json.loads(progreso) if progreso else {})
+            for version, estado, progreso in conexion.execute(
+                "SELECT version, estado, progreso FROM schema_version")}
+
+def estimar_filas(conexion, relleno):
+    if relleno.tabla not in tablas(conexion):
+        return 0  # La crea una migración anterior: estará vacía
+    try:
+        if relleno.pendientes:
+            return conexion.execute(f"SELECT count(*) FROM {relleno.tabla} WHERE {relleno.pendientes}").fetchone()[0]
+        return conexion.execute(f"SELECT count(*) FROM ({relleno.ids})").fetchone()[0]
+    except sqlite3.OperationalError:
+        # Usa columnas o tablas que añade una migración anterior: como mucho, toda la tabla
+        return conexion.execute(f"SELECT count(*) FROM {relleno.tabla}").fetchone()[0]
+
+def empezar(conexion, migracion):
+    """Aplica el esquema y anota la migración 'en_curso' con el rango de cada relleno, todo en una transacción"""
+    conexion.execute('BEGIN IMMEDIATE')
+    try:
+        sentencias = migracion.esquema(conexion) if migracion.esquema else []
+        for sentencia in sentencias:
+            conexion.execute(sentencia)
+        progreso = {}
+        if migracion.esquema is None or sentencias:
+            for i, relleno in enumerate(migracion.rellenos):
+                maximo = conexion.execute(f"SELECT max(id) FROM ({relleno.ids})").fetchone()[0] or 0
+                progreso[str(i)] = [0, maximo]
+        conexion.execute(
+            "INSERT INTO schema_version (version, nombre, estado, progreso, fecha_inicio) VALUES (?, ?, 'en_curso', ?, ?)",
+            (migracion.version, migracion.nombre, json.dumps(progreso), datetime.utcnow()))
+        conexion.execute('COMMIT')
+    except Exception:
+        conexion.execute('ROLLBACK')
+        raise
+    return sentencias, progreso
+
+def rellenar(conexion, migracion, progreso, lote, pausa, informar):
+    """Ejecuta los rellenos pendientes lote a lote, guardando el progreso en cada transacción"""
+    for clave, (ultimo, maximo) in sorted(progreso.items()):
+        relleno = migracion.rellenos[int(clave)]
+        while ultimo < maximo:
+            conexion.execute('BEGIN IMMEDIATE')
+            try:
+                hasta = conexion.execute(
+                    f"SELECT max(id) FROM (SELECT id FROM ({relleno.ids}) WHERE id > ? AND id <= ? ORDER BY id LIMIT ?)",
+                    (ultimo, maximo, lote)).fetchone()[0]
+                filas = 0
+                if hasta is None:
+                    hasta = maximo
+                else:
+                    filas = conexion.execute(relleno.sentencia, {'desde': ultimo, 'hasta': hasta}).rowcount
+                progreso[clave] = [hasta, maximo]
+                conexion.execute("UPDATE schema_version SET progreso = ? WHERE version = ?",
+                                 (json.dumps(progreso), migracion.version))
+                conexion.execute('COMMIT')
+            except Exception:
+                conexion.execute('ROLLBACK')
+                raise
+            ultimo = hasta
+            informar(relleno.tabla, ultimo, maximo, filas)
+            if pausa and ultimo < maximo:
+                time.sleep(pausa)
+
+def terminar(conexion, migracion):
+    conexion.execute("UPDATE schema_version SET estado = 'aplicada', fecha_fin = ? WHERE version = ?",
+                     (datetime.utcnow(), migracion.version))
+
+def migrar(ruta=RUTA_BASE_DATOS, hasta=None, lote=2000, pausa=0.05, informar=None):
+    """Aplica (o continúa) las migraciones pendientes hasta la versión `hasta`; devuelve las aplicadas"""
+    informar = informar or (lambda tabla, ultimo, maximo, filas: None)
+    conexion = conectar(ruta)
+    aplicadas = []
+    try:
+        for migracion in MIGRACIONES:
+            if hasta is not None and migracion.version > hasta:
+                break
+            estado, progreso = versiones(conexion).get(migracion.version, (None, None))
+            if estado == 'aplicada':
+                continue
+            if estado is None:
+                sentencias, progreso = empezar(conexion, migracion)
+                print(f"🔧 {migracion.version}. {migracion.nombre}: {len(sentencias)} cambios de esquema")
+            else:
+                print(f"🔁 {migracion.version}. {migracion.nombre}: continuando los rellenos")
+            rellenar(conexion, migracion, progreso, lote, pausa, informar)
+            terminar(conexion, migracion)
+            aplicadas.append(migracion.version)
+    finally:
+        conexion.close()
+    return aplicadas
+
+def simular(ruta=RUTA_BASE_DATOS, hasta=None):
+    """Lista lo que haría migrar() sin cambiar nada: [(migración, sentencias, {tabla: filas})]"""
+    conexion = conectar_lectura(ruta)
+    plan = []
+    try:
+        aplicadas = versiones(conexion)
+        for migracion in MIGRACIONES:
+            if hasta is not None and migracion.version > hasta:
+                break
+            estado, progreso = aplicadas.get(migracion.version, (None, None))
+            if estado == 'aplicada':
+                continue
+            if estado is None:
+                sentencias = migracion.esquema(conexion) if migracion.esquema else []
+                rellenos = migracion.rellenos if migracion.esquema is None or sentencias else []
+            else:
+                sentencias = []
+                rellenos = [migracion.rellenos[int(clave)] for clave, (ultimo, maximo) in progreso.items()
+                            if ultimo < maximo]
+            filas = {}
+            for relleno in rellenos:
+                filas[relleno.tabla] = filas.get(relleno.tabla, 0) + estimar_filas(conexion, relleno)
+            plan.append((migracion, sentencias, filas))
+    finally:
+        conexion.close()
+    return plan
+
+def marcar_aplicadas(ruta=RUTA_BASE_DATOS):
+    """Anota todas las migraciones como aplicadas (base de datos recién creada con create_all)"""
+    conexion = conectar(ruta)
+    ahora = datetime.utcnow()
+    try:
+        conexion.executemany(
+            "INSERT OR IGNORE INTO schema_version (version, nombre, estado, fecha_inicio, fecha_fin) "
+            "VALUES (?, ?, 'aplicada', ?, ?)",
+            [(migracion.version, migracion.nombre, ahora, ahora) for migracion in MIGRACIONES])
+    finally:
+        conexion.close()
+
+# ==================== LÍNEA DE COMANDOS ====================
+
+def mostrar_estado(ruta):
+    conexion = conectar_lectura(ruta)
+    try:
+        aplicadas = versiones(conexion)
+    finally:
+        conexion.close()
+    for migracion in MIGRACIONES:
+        estado, progreso = aplicadas.get(migracion.version, ('pendiente', {}))
+        detalle = ''
+        if estado == 'en_curso':
+            detalle = ' (' + ', '.join(f"{migracion.rellenos[int(clave)].tabla}: id {ultimo}/{maximo}"
+                                       for clave, (ultimo, maximo) in sorted(progreso.items())) + ')'
+        icono = {'aplicada': '✅', 'en_curso': '⏳'}.get(estado, '⬜')
+        print(f"{icono} {migracion.version}. {migracion.nombre}: {estado}{detalle}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Aplica las migraciones pendientes de la base de datos')
+    parser.add_argument('--db', default=RUTA_BASE_DATOS, help='Base de datos (por defecto instance/todo.db)')
+    parser.add_argument('--simular', action='store_true', help='No cambiar nada: mostrar el plan y las filas estimadas')
+    parser.add_argument('--estado', action='store_true', help='Mostrar las migraciones aplicadas y pendientes')
+    parser.add_argument('--hasta', type=int, help='Aplicar solo hasta esta versión')
+    parser.add_argument('--lote', type=int, default=2000, help='Filas por transacción en los rellenos')
+    parser.add_argument('--pausa', type=float, default=0.05,
+                        help='Segundos entre lotes para dejar escribir a la aplicación')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ No se encontró la base de datos '{args.db}'")
+        print("Ejecuta 'python init_db.py' primero")
+        return 1
+
+    if args.estado:
+        mostrar_estado(args.db)
+        return 0
+
+    if args.simular:
+        plan = simular(args.db, args.hasta)
+        if not plan:
+            print("✅ No hay migraciones pendientes")
+        for migracion, sentencias, filas in plan:
+            print(f"\n🔎 {migracion.version}. {migracion.nombre}")
+            for sentencia in sentencias:
+                print(f"   • {' '.join(sentencia.split())[:110]}")
+            for tabla, total in filas.items():
+                print(f"   • ~{total} filas de '{tabla}' en lotes de {args.lote}")
+            if not sentencias and not filas:
+                print("   • nada que cambiar")
+        return 0
+
+    print("\n" + "="*60)
+    print("🔄 MIGRACIÓN DE BASE DE DATOS")
+    print("="*60 + "\n")
+    aplicadas = migrar(args.db, args.hasta, args.lote, args.pausa,
+                       informar=lambda tabla, ultimo, maximo, filas: print(
+                           f"   📦 {tabla}: id {ultimo}/{maximo} ({filas} filas en este lote)"))
+    print(f"\n✅ Migraciones aplicadas: {', '.join(map(str, aplicadas)) or 'ninguna, ya estaba al día'}")
+
+    uploads = os.path.join(BASE_DIR, Config.UPLOAD_FOLDER)
+    if not os.path.exists(uploads):
+        os.makedirs(uploads)
+        print(f"✅ Carpeta '{Config.UPLOAD_FOLDER}/' creada")
+    return 0
+
+if __name__ == '__main__':
+    try:
+        raise SystemExit(main())
+    except sqlite3.Error as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        print("Vuelve a lanzarla: continúa desde el último lote confirmado")
+        raise SystemExit(1)
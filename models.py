@@ -0,0 +1,510 @@
+"""
+Modelos de la base de datos.
+Solo dependen de SQLAlchemy: los scripts de mantenimiento los importan sin
+construir la aplicación Flask (ver crear_sesion()).
+"""
+
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, Date, DateTime, ForeignKey, Index, DDL, TypeDecorator, create_engine, event, or_, text, update, inspect as sa_inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import DeclarativeBase, Session, object_session, relationship
+from datetime import datetime
+import bisect
+import json
+
+from config import RUTA_BASE_DATOS
+
+class Base(DeclarativeBase):
+    pass
+
+# ==================== CÓDIGOS ====================
+# estado y prioridad se guardan como enteros pequeños en su orden natural, así
+# ORDER BY prioridad DESC devuelve las urgentes primero y usa los índices.
+# En Python (ORM, consultas, plantillas) siguen siendo los nombres de siempre.
+
+ESTADOS = ('pendiente', 'en_progreso', 'completada')
+PRIORIDADES = ('baja', 'media', 'alta', 'urgente')
+
+class Ordinal(TypeDecorator):
+    """Columna que guarda uno de `valores` como su posición en la tupla"""
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, valores):
+        super().__init__()
+        self.valores = tuple(valores)
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return self.valores.index(value)
+        except ValueError:
+            raise ValueError(f"Valor no válido: {value!r}; usa uno de: {', '.join(self.valores)}") from None
+
+    def process_literal_param(self, value, dialect):
+        codigo = self.process_bind_param(value, dialect)
+        return 'NULL' if codigo is None else str(codigo)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Las columnas creadas antes de los códigos tienen afinidad TEXT: el código llega como '2'
+        try:
+            return self.valores[int(value)]
+        except (ValueError, IndexError):
+            return value
+
+# ==================== MODELOS ====================
+
+class User(Base):
+    __tablename__ = 'user'
+    id = Column(Integer, primary_key=True)
+    username = Column(String(80), unique=True, nullable=False)
+    password = Column(String(200), nullable=False)
+    role = Column(String(20), nullable=False)  # 'lider' o 'miembro'
+    nombre = Column(String(100), nullable=False)
+    tasks_created = relationship('Task', backref='creador', foreign_keys='Task.created_by')
+    tasks_assigned = relationship('Task', backref='asignado', foreign_keys='Task.assigned_to')
+
+class Task(Base):
+    __tablename__ = 'task'
+    id = Column(Integer, primary_key=True)
+    titulo = Column(String(200), nullable=False)
+    descripcion = Column(Text)
+    estado = Column(Ordinal(ESTADOS), default='pendiente')
+    prioridad = Column(Ordinal(PRIORIDADES), default='media')
+    archivo = Column(String(300))  # Ruta del archivo adjunto (relativa a UPLOAD_FOLDER)
+    nombre_archivo = Column(String(300))  # Nombre original del archivo
+    attachment_id = Column(Integer, ForeignKey('attachment.id'))  # Blob en el almacén por contenido
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=False)
+    assigned_to = Column(Integer, ForeignKey('user.id'))
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_completada = Column(DateTime)
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # Sube con cada cambio (caché de fragmentos)
+    archivada = False
+
+    # Índices compuestos para la paginación por cursor y los órdenes de los listados (consultas.ORDENES)
+    __table_args__ = (
+        Index('ix_task_creador_fecha', 'created_by', 'fecha_creacion', 'id'),
+        Index('ix_task_asignado_estado_fecha', 'assigned_to', 'estado', 'fecha_creacion'),
+        Index('ix_task_creador_prioridad', 'created_by', 'prioridad', 'fecha_creacion', 'id'),
+        Index('ix_task_creador_completada', 'created_by', 'fecha_completada', 'id'),
+        Index('ix_task_asignado_prioridad', 'assigned_to', 'prioridad', 'fecha_creacion', 'id'),
+        Index('ix_task_asignado_completada', 'assigned_to', 'fecha_completada', 'id'),
+    )
+
+# Orden por asignado (ASC) y luego las más recientes (DESC): el índice lleva los mismos sentidos
+Index('ix_task_creador_asignado', Task.created_by, Task.assigned_to, Task.fecha_creacion.desc(), Task.id.desc())
+
+# Índice de texto completo (FTS5) sobre task, sincronizado con triggers.
+# Es una tabla de contenido externo: solo guarda el índice, el texto se lee de task.
+DDL_BUSQUEDA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        titulo, descripcion, nombre_archivo,
+        content='task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, titulo, descripcion, nombre_archivo)
+        VALUES (new.id, new.titulo, new.descripcion, new.nombre_archivo);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, titulo, descripcion, nombre_archivo)
+        VALUES ('delete', old.id, old.titulo, old.descripcion, old.nombre_archivo);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF titulo, descripcion, nombre_archivo ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, titulo, descripcion, nombre_archivo)
+        VALUES ('delete', old.id, old.titulo, old.descripcion, old.nombre_archivo);
+        INSERT INTO task_fts(rowid, titulo, descripcion, nombre_archivo)
+        VALUES (new.id, new.titulo, new.descripcion, new.nombre_archivo);
+    END""",
+]
+
+for sentencia in DDL_BUSQUEDA:
+    event.listen(Task.__table__, 'after_create', DDL(sentencia))
+
+class TaskArchive(Base):
+    """
+    Tareas completadas hace tiempo, movidas fuera de task (ver archivado.py).
+    Mismas columnas e ids que Task; se consultan solo bajo demanda y son de solo lectura.
+    """
+    __tablename__ = 'task_archive'
+    id = Column(Integer, primary_key=True)
+    titulo = Column(String(200), nullable=False)
+    descripcion = Column(Text)
+    estado = Column(Ordinal(ESTADOS))
+    prioridad = Column(Ordinal(PRIORIDADES))
+    archivo = Column(String(300))
+    nombre_archivo = Column(String(300))
+    attachment_id = Column(Integer, ForeignKey('attachment.id'))
+    created_by = Column(Integer, ForeignKey('user.id'), nullable=False)
+    assigned_to = Column(Integer, ForeignKey('user.id'))
+    fecha_creacion = Column(DateTime)
+    fecha_completada = Column(DateTime)
+    version = Column(Integer, nullable=False, default=1)
+    fecha_archivado = Column(DateTime, default=datetime.utcnow)
+    archivada = True
+
+    creador = relationship('User', foreign_keys=[created_by])
+    asignado = relationship('User', foreign_keys=[assigned_to])
+    adjunto = relationship('Attachment')
+
+    __table_args__ = (
+        Index('ix_task_archive_asignado_fecha', 'assigned_to', 'fecha_completada'),
+        Index('ix_task_archive_creador_fecha', 'created_by', 'fecha_completada'),
+    )
+
+class Attachment(Base):
+    """Blob del almacén de adjuntos direccionado por contenido (SHA-256), con contador de referencias"""
+    __tablename__ = 'attachment'
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    ruta = Column(String(300), nullable=False)  # Ruta relativa: ab/cd/<sha256>.<ext>
+    tamano = Column(Integer, nullable=False)
+    referencias = Column(Integer, nullable=False, default=0)
+    miniatura = Column(String(300))  # Ruta de la miniatura (None mientras se genera o si no aplica)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    tareas = relationship('Task', backref='adjunto')
+
+class Job(Base):
+    """Cola de trabajos en segundo plano guardada en la propia base de datos"""
+    __tablename__ = 'job'
+    id = Column(Integer, primary_key=True)
+    tipo = Column(String(30), nullable=False)  # 'miniatura'
+    attachment_id = Column(Integer, ForeignKey('attachment.id'))
+    estado = Column(String(20), nullable=False, default='pendiente')  # 'pendiente', 'procesando', 'hecho', 'omitido', 'error'
+    intentos = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_job_estado', 'estado', 'id'),
+    )
+
+class TaskStats(Base):
+    """Contadores materializados de tareas por usuario, rol y estado"""
+    __tablename__ = 'task_stats'
+    user_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
+    rol = Column(String(10), primary_key=True)  # 'creador' o 'asignado'
+    estado = Column(String(20), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+class TaskRollupDia(Base):
+    """
+    Tareas completadas por día de finalización, creador, asignado (0: sin asignar),
+    prioridad y cubo de duración (ver RESÚMENES DIARIOS y analitica.py)
+    """
+    __tablename__ = 'task_rollup_dia'
+    created_by = Column(Integer, primary_key=True)
+    dia = Column(Date, primary_key=True)
+    assigned_to = Column(Integer, primary_key=True)
+    prioridad = Column(Ordinal(PRIORIDADES), primary_key=True)
+    cubo = Column(SmallInteger, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+    # La analítica filtra por rango de días y miembros, sin creador (ver analitica.informe)
+    __table_args__ = (
+        Index('ix_task_rollup_dia_fecha', 'dia', 'assigned_to'),
+    )
+
+class UserVersion(Base):
+    """Versión de las tareas de cada usuario: sube con cualquier cambio en una tarea que creó o tiene asignada"""
+    __tablename__ = 'user_version'
+    user_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    fecha_modificacion = Column(DateTime, default=datetime.utcnow)
+
+class TaskEvent(Base):
+    """Eventos de cambios en tareas pendientes de repartir a las conexiones SSE de otros procesos"""
+    __tablename__ = 'task_event'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)  # Destinatario
+    tipo = Column(String(20), nullable=False)  # 'tarea'
+    datos = Column(Text, nullable=False)  # JSON
+    fecha = Column(DateTime, default=datetime.utcnow, index=True)
+
+class Secuencia(Base):
+    """Mayor id repartido de cada tabla cuyos id no se reutilizan (ver reservar_ids)"""
+    __tablename__ = 'secuencia'
+    nombre = Column(String(50), primary_key=True)
+    valor = Column(Integer, nullable=False)
+
+# ==================== IDS DE TAREAS ====================
+# SQLite da a una fila nueva max(id) + 1: al archivar o borrar la tarea con el id más
+# alto, la siguiente tarea recibiría su id (y detalle_tarea, las cachés de fragmentos
+# y los eventos la confundirían con la archivada). Los id de task salen de la tabla
+# secuencia, que solo crece; así no hay que reconstruir task con AUTOINCREMENT.
+
+SQL_RESERVAR_IDS = text("""INSERT INTO secuencia (nombre, valor)
+    SELECT 'task', max(coalesce((SELECT max(id) FROM task), 0), coalesce((SELECT max(id) FROM task_archive), 0)) + :cantidad
+    WHERE true
+    ON CONFLICT (nombre) DO UPDATE SET valor = max(valor, coalesce((SELECT max(id) FROM task), 0)) + :cantidad
+    RETURNING valor""")
+
+def reservar_ids(conexion, cantidad):
+    """
+    Reserva `cantidad` id consecutivos de task y devuelve el primero (toma el bloqueo de
+    escritura). También cubre las filas insertadas sin pasar por aquí: parte de max(id).
+    """
+    ultimo = conexion.execute(SQL_RESERVAR_IDS, {'cantidad': cantidad}).scalar()
+    return ultimo - cantidad + 1
+
+@event.listens_for(Session, 'before_flush')
+def asignar_ids_tareas(sesion, flush_context, instancias):
+    nuevas = [obj for obj in sesion.new if isinstance(obj, Task) and obj.id is None]
+    if nuevas:
+        primero = reservar_ids(sesion.connection(), len(nuevas))
+        for i, tarea in enumerate(nuevas):
+            tarea.id = primero + i
+
+# ==================== CONTADORES ====================
+# TaskStats se mantiene en la misma transacción que los cambios de Task:
+# tras cada flush se calculan los deltas de las tareas nuevas, modificadas
+# y eliminadas y se aplican con un UPSERT sobre task_stats. El evento se
+# registra en la clase Session, así cubre la sesión de Flask y la de los scripts.
+
+def valor_anterior(obj, atributo):
+    """Valor de un atributo antes de los cambios pendientes en la sesión"""
+    historial = sa_inspect(obj).attrs[atributo].history
+    if historial.deleted:
+        return historial.deleted[0]
+    return getattr(obj, atributo)
+
+def claves_contador(created_by, assigned_to, estado):
+    """Filas de task_stats en las que cuenta una tarea: (user_id, rol, estado)"""
+    claves = [(created_by, 'creador', estado or 'pendiente')]
+    if assigned_to:
+        claves.append((assigned_to, 'asignado', estado or 'pendiente'))
+    return claves
+
+@event.listens_for(Session, 'after_flush')
+def actualizar_contadores(sesion, flush_context):
+    deltas = {}
+    # Las tareas que el relleno de la migración aún no ha recorrido las contará él al llegar
+    rango = rango_sin_rellenar(sesion.connection(), MIGRACION_CONTADORES)
+
+    def sumar(claves, valor):
+        for clave in claves:
+            deltas[clave] = deltas.get(clave, 0) + valor
+
+    for obj in sesion.new:
+        if isinstance(obj, Task):
+            sumar(claves_contador(obj.created_by, obj.assigned_to, obj.estado), 1)
+
+    for obj in sesion.deleted:
+        if isinstance(obj, Task) and not en_rango(rango, obj.id):
+            sumar(claves_contador(valor_anterior(obj, 'created_by'),
+                                 valor_anterior(obj, 'assigned_to'),
+                                 valor_anterior(obj, 'estado')), -1)
+
+    for obj in sesion.dirty:
+        if isinstance(obj, Task) and sesion.is_modified(obj) and not en_rango(rango, obj.id):
+            antes = claves_contador(valor_anterior(obj, 'created_by'),
+                                   valor_anterior(obj, 'assigned_to'),
+                                   valor_anterior(obj, 'estado'))
+            despues = claves_contador(obj.created_by, obj.assigned_to, obj.estado)
+            if antes != despues:
+                sumar(antes, -1)
+                sumar(despues, 1)
+
+    aplicar_deltas_contadores(sesion.connection(), deltas)
+
+def aplicar_deltas_contadores(conexion, deltas):
+    """Aplica {(user_id, rol, estado): delta} sobre task_stats con INSERT ... ON CONFLICT"""
+    filas = [
+        {'user_id': user_id, 'rol': rol, 'estado': estado, 'total': delta}
+        for (user_id, rol, estado), delta in deltas.items() if delta
+    ]
+    if not filas:
+        return
+    stmt = sqlite_insert(TaskStats.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'rol', 'estado'],
+        set_={'total': TaskStats.__table__.c.total + stmt.excluded.total}
+    )
+    conexion.execute(stmt, filas)
+
+# ==================== RESÚMENES DIARIOS ====================
+# task_rollup_dia se mantiene como task_stats: tras cada flush se resta la fila en la
+# que contaba cada tarea cambiada y se suma la nueva. Las sentencias en bloque llaman
+# a aplicar_deltas_rollup() ellas mismas. La duración de una tarea (de fecha_creacion
+# a fecha_completada) se guarda como uno de CUBOS_DURACION cubos de escala
+# logarítmica: cada cubo es √2 veces más ancho que el anterior, de 1 minuto a más de un año.
+
+CUBOS_DURACION = 40
+# Cubo k: de LIMITES_DURACION[k] a LIMITES_DURACION[k + 1] segundos (el último recoge también las más largas)
+LIMITES_DURACION = (0.0,) + tuple(60 * 2 ** (k / 2) for k in range(CUBOS_DURACION))
+# Migraciones que rellenan task_rollup_dia y task_stats en las bases de datos existentes (ver migraciones.py)
+MIGRACION_ROLLUPS = 6
+MIGRACION_CONTADORES = 9
+
+def leer_fecha(valor):
+    return datetime.fromisoformat(valor) if isinstance(valor, str) else valor
+
+def cubo_duracion(fecha_creacion, fecha_completada):
+    """Cubo de la duración entre dos fechas (datetime o texto, como las devuelve SQLite)"""
+    inicio, fin = leer_fecha(fecha_creacion), leer_fecha(fecha_completada)
+    segundos = (fin - inicio).total_seconds() if inicio else 0
+    return min(max(bisect.bisect_right(LIMITES_DURACION, segundos) - 1, 0), CUBOS_DURACION - 1)
+
+def clave_rollup(created_by, assigned_to, estado, prioridad, fecha_creacion, fecha_completada):
+    """Fila de task_rollup_dia en la que cuenta una tarea, o None si no está completada"""
+    if estado != 'completada' or fecha_completada is None:
+        return None
+    fecha_completada = leer_fecha(fecha_completada)
+    return (created_by, fecha_completada.date(), assigned_to or 0, prioridad or 'media',
+            cubo_duracion(fecha_creacion, fecha_completada))
+
+def cambios_rollup(tarea_id, antes, despues):
+    """[(tarea_id, clave, delta)] para una tarea que pasa de la clave `antes` a `despues`"""
+    if antes == despues:
+        return []
+    return [(tarea_id, clave, delta) for clave, delta in ((antes, -1), (despues, 1)) if clave is not None]
+
+ATRIBUTOS_ROLLUP = ('created_by', 'assigned_to', 'estado', 'prioridad', 'fecha_creacion', 'fecha_completada')
+
+@event.listens_for(Session, 'after_flush')
+def actualizar_rollups(sesion, flush_context):
+    cambios = []
+    for obj in sesion.new:
+        if isinstance(obj, Task):
+            cambios += cambios_rollup(obj.id, None, clave_rollup(*(getattr(obj, a) for a in ATRIBUTOS_ROLLUP)))
+
+    for obj in sesion.deleted:
+        if isinstance(obj, Task):
+            antes = clave_rollup(*(valor_anterior(obj, a) for a in ATRIBUTOS_ROLLUP))
+            cambios += cambios_rollup(obj.id, antes, None)
+
+    for obj in sesion.dirty:
+        if isinstance(obj, Task) and sesion.is_modified(obj):
+            antes = clave_rollup(*(valor_anterior(obj, a) for a in ATRIBUTOS_ROLLUP))
+            despues = clave_rollup(*(getattr(obj, a) for a in ATRIBUTOS_ROLLUP))
+            cambios += cambios_rollup(obj.id, antes, despues)
+
+    aplicar_deltas_rollup(sesion.connection(), cambios)
+
+# (motor, migración) cuyo relleno ya está completo (migración aplicada o base de datos nueva)
+_rellenos_terminados = set()
+
+def rango_sin_rellenar(conexion, version=MIGRACION_ROLLUPS):
+    """
+    (desde, hasta]: ids de tareas que el relleno de la migración `version` aún no ha
+    recorrido (las contará él al llegar), o None si no queda ninguno
+    """
+    clave = (conexion.engine, version)
+    if clave in _rellenos_terminados:
+        return None
+    if conexion.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'").first() is None:
+        # Creada con create_all sin migraciones: las filas se mantienen desde la primera tarea
+        _rellenos_terminados.add(clave)
+        return None
+    fila = conexion.exec_driver_sql(
+        "SELECT estado, progreso FROM schema_version WHERE version = ?", (version,)).first()
+    if fila is None:
+        return None  # Sin migrar: la migración borrará estas filas y las rellenará enteras
+    if fila.estado == 'aplicada':
+        _rellenos_terminados.add(clave)
+        return None
+    ultimo, maximo = json.loads(fila.progreso or '{}').get('0', (0, 0))
+    return (ultimo, maximo) if ultimo < maximo else None
+
+def en_rango(rango, tarea_id):
+    """Si `tarea_id` está en el rango de rango_sin_rellenar() (None: tarea nueva en bloque)"""
+    return rango is not None and tarea_id is not None and rango[0] < tarea_id <= rango[1]
+
+def aplicar_deltas_rollup(conexion, cambios):
+    """
+    Aplica [(tarea_id, clave, delta)] sobre task_rollup_dia con INSERT ... ON CONFLICT.
+    tarea_id puede ser None en las tareas nuevas insertadas en bloque.
+    """
+    if not cambios:
+        return
+    rango = rango_sin_rellenar(conexion)
+    deltas = {}
+    for tarea_id, clave, delta in cambios:
+        if en_rango(rango, tarea_id):
+            continue
+        deltas[clave] = deltas.get(clave, 0) + delta
+    filas = [
+        {'created_by': created_by, 'dia': dia, 'assigned_to': assigned_to, 'prioridad': prioridad,
+         'cubo': cubo, 'total': delta}
+        for (created_by, dia, assigned_to, prioridad, cubo), delta in deltas.items() if delta
+    ]
+    if not filas:
+        return
+    tabla = TaskRollupDia.__table__
+    stmt = sqlite_insert(tabla)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['created_by', 'dia', 'assigned_to', 'prioridad', 'cubo'],
+        set_={'total': tabla.c.total + stmt.excluded.total}
+    )
+    conexion.execute(stmt, filas)
+
+# ==================== VERSIONES ====================
+# La API usa user_version para las ETag: un cliente que repite una consulta
+# recibe 304 mientras no cambie ninguna tarea del usuario consultado.
+
+@event.listens_for(Session, 'after_flush')
+def actualizar_versiones(sesion, flush_context):
+    usuarios = set()
+    for obj in list(sesion.new) + list(sesion.deleted) + list(sesion.dirty):
+        if isinstance(obj, Task) and (obj not in sesion.dirty or sesion.is_modified(obj)):
+            usuarios.update((obj.created_by, obj.assigned_to,
+                             valor_anterior(obj, 'created_by'), valor_anterior(obj, 'assigned_to')))
+    incrementar_versiones(sesion.connection(), usuarios)
+
+def incrementar_versiones(conexion, user_ids):
+    """Suma 1 a la versión de cada usuario con INSERT ... ON CONFLICT"""
+    ahora = datetime.utcnow()
+    filas = [{'user_id': user_id, 'version': 1, 'fecha_modificacion': ahora}
+             for user_id in set(user_ids) if user_id]
+    if not filas:
+        return
+    stmt = sqlite_insert(UserVersion.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={'version': UserVersion.__table__.c.version + 1,
+              'fecha_modificacion': stmt.excluded.fecha_modificacion}
+    )
+    conexion.execute(stmt, filas)
+
+# ==================== VERSIÓN DE CADA TAREA ====================
+# Task.version identifica el contenido de la tarjeta de una tarea (ver fragmentos.py).
+# Sube al modificar la fila y también cuando cambia algo que la tarjeta muestra
+# de otra tabla: el nombre del creador o del asignado y la miniatura del adjunto.
+
+@event.listens_for(Task, 'before_update')
+def subir_version_tarea(mapper, conexion, tarea):
+    if object_session(tarea).is_modified(tarea, include_collections=False):
+        tarea.version = Task.version + 1
+
+@event.listens_for(Session, 'after_flush')
+def subir_versiones_relacionadas(sesion, flush_context):
+    usuarios = set()
+    adjuntos = set()
+    for obj in sesion.dirty:
+        if isinstance(obj, User) and sa_inspect(obj).attrs.nombre.history.has_changes():
+            usuarios.add(obj.id)
+        elif isinstance(obj, Attachment) and sa_inspect(obj).attrs.miniatura.history.has_changes():
+            adjuntos.add(obj.id)
+    condiciones = []
+    if usuarios:
+        condiciones += [Task.created_by.in_(usuarios), Task.assigned_to.in_(usuarios)]
+    if adjuntos:
+        condiciones.append(Task.attachment_id.in_(adjuntos))
+    if condiciones:
+        incrementar_version_tareas(sesion.connection(), or_(*condiciones))
+
+def incrementar_version_tareas(conexion, condicion):
+    """Sube la versión de las tareas que cumplen la condición (para UPDATE en bloque)"""
+    conexion.execute(update(Task.__table__).where(condicion).values(version=Task.__table__.c.version + 1))
+
+# ==================== SCRIPTS ====================
+
+def crear_motor(ruta=RUTA_BASE_DATOS):
+    """Motor SQLAlchemy sobre el archivo de la base de datos, sin pasar por Flask"""
+    return create_engine(f'sqlite:///{ruta}')
+
+def crear_sesion(ruta=RUTA_BASE_DATOS):
+    """Sesión para los scripts de mantenimiento (usar como 'with crear_sesion() as sesion:')"""
+    return Session(crear_motor(ruta))
@@ -0,0 +1,184 @@
+"""
+Modo opcional de una base de datos por equipo (shards)
+
+SQLite admite un solo escritor por archivo: con todos los equipos en todo.db las
+escrituras de un equipo esperan a las de los demás. Con SHARDS = {'equipo1': ruta, ...}
+cada equipo (su líder, sus miembros y sus tareas) vive en su propio archivo con el
+esquema completo, así que cada archivo tiene su propio bloqueo de escritura.
+
+- Un directorio pequeño (SHARDS_DIRECTORIO) guarda usuario -> shard y reparte los id
+  de usuario, que son únicos entre todos los shards (las cachés, las ETag y los
+  eventos de los dashboards van por id de usuario).
+- El shard de cada petición sale de la sesión (session['shard'], fijado en el login)
+  y se guarda en g.shard; SesionLecturaEscritura.get_bind() elige con él el motor del
+  shard (y sus conexiones de solo lectura en las peticiones GET).
+- Los comandos flask usan el shard de la variable de entorno SHARD.
+- Las vistas que cruzan equipos leen todos los shards a la vez con en_paralelo().
+- Los adjuntos de cada shard van en UPLOAD_FOLDER/<shard>: las referencias de cada blob
+  se cuentan en la tabla attachment del shard, así que un blob en una carpeta común se
+  borraría al liberarlo un equipo aunque otro lo siguiera usando.
+
+Una tarea solo puede asignarse a miembros de su mismo equipo: en cada shard solo
+existen los usuarios del equipo. Sin SHARDS todo sigue en todo.db como siempre.
+"""
+
+from flask import current_app, g, has_app_context, has_request_context, session
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, insert, select
+from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+from models import Base, User
+
+metadata_directorio = MetaData()
+
+usuario_shard = Table(
+    'usuario_shard', metadata_directorio,
+    Column('user_id', Integer, primary_key=True),
+    Column('username', String(80), unique=True, nullable=False),
+    Column('shard', String(50), nullable=False),
+)
+
+class Directorio:
+    """Usuario -> shard, en su propia base de datos SQLite. Los shards de los usuarios se cachean"""
+
+    def __init__(self, ruta):
+        self.motor = create_engine(f'sqlite:///{ruta}')
+        metadata_directorio.create_all(self.motor)
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def buscar(self, username):
+        """(user_id, shard) del usuario o None"""
+        with self.motor.connect() as conexion:
+            return conexion.execute(
+                select(usuario_shard.c.user_id, usuario_shard.c.shard).where(usuario_shard.c.username == username)
+            ).first()
+
+    def shard_de(self, user_id):
+        shard = self._shards.get(user_id)
+        if shard is None:
+            with self.motor.connect() as conexion:
+                shard = conexion.execute(
+                    select(usuario_shard.c.shard).where(usuario_shard.c.user_id == user_id)).scalar()
+            if shard is not None:
+                with self._lock:
+                    self._shards[user_id] = shard
+        return shard
+
+    def registrar(self, username, shard):
+        """id del usuario en el directorio; si es nuevo se le reserva uno en `shard`"""
+        with self.motor.begin() as conexion:
+            fila = conexion.execute(
+                select(usuario_shard.c.user_id, usuario_shard.c.shard).where(usuario_shard.c.username == username)
+            ).first()
+            if fila is not None:
+                if fila.shard != shard:
+                    raise ValueError(f'El usuario {username} ya pertenece al equipo {fila.shard}')
+                return fila.user_id
+            return conexion.execute(
+                insert(usuario_shard).values(username=username, shard=shard).returning(usuario_shard.c.user_id)
+            ).scalar()
+
+directorio = None
+_pool = None
+_lock_pool = threading.Lock()
+
+# ==================== ENRUTADO ====================
+
+def nombres(app=None):
+    """Shards configurados; [None] sin shards (la base de datos de siempre)"""
+    return list((app or current_app).config['SHARDS']) or [None]
+
+def usar_shard(nombre):
+    """Las consultas siguientes de db.session (en este contexto de aplicación) van a `nombre`"""
+    g.shard = nombre
+
+def shard_actual():
+    """Shard de la petición (g.shard) o, fuera de una petición, el de SHARD_COMANDOS"""
+    return g.get('shard') or (None if has_request_context() else current_app.config['SHARD_COMANDOS'])
+
+def carpeta_uploads():
+    """Carpeta de adjuntos del shard actual (UPLOAD_FOLDER sin shards)"""
+    carpeta = current_app.config['UPLOAD_FOLDER']
+    shard = shard_actual() if current_app.config['SHARDS'] else None
+    return os.path.join(carpeta, shard) if shard else carpeta
+
+def shard_del_login(username):
+    """Antes de buscar al usuario que inicia sesión: usar su shard según el directorio"""
+    if directorio is not None:
+        fila = directorio.buscar(username)
+        g.shard = fila.shard if fila else None
+
+def clave_bind(nombre, lectura=False):
+    return f'shard:{nombre}:lectura' if lectura else f'shard:{nombre}'
+
+def binds(config):
+    """SQLALCHEMY_BINDS de cada shard: escritura (pool de 1) y solo lectura (mode=ro)"""
+    lectura = {clave: valor for clave, valor in config['SQLALCHEMY_BINDS'].get('lectura', {}).items()
+               if clave != 'url'}
+    resultado = {}
+    for nombre, ruta in config['SHARDS'].items():
+        resultado[clave_bind(nombre)] = {'url': f'sqlite:///{ruta}', **config['SQLALCHEMY_ENGINE_OPTIONS']}
+        resultado[clave_bind(nombre, True)] = {'url': f'sqlite:///file:{ruta}?mode=ro&uri=true', **lectura}
+    return resultado
+
+def shard_de_la_sesion():
+    if 'user_id' in session:
+        # Sesiones iniciadas antes de activar los shards: se busca en el directorio
+        g.shard = session.get('shard') or directorio.shard_de(session['user_id'])
+
+@event.listens_for(User, 'before_insert')
+def reservar_id_usuario(mapper, conexion, user):
+    """Con shards, los usuarios nuevos toman su id del directorio"""
+    shard = shard_actual() if directorio is not None and has_app_context() else None
+    if shard:
+        user.id = directorio.registrar(user.username, shard)
+
+# ==================== VISTAS ENTRE EQUIPOS ====================
+
+def motores_lectura(app):
+    """{shard: motor de solo lectura} de cada shard ({None: motor} sin shards)"""
+    engines = app.extensions['sqlalchemy'].engines
+    if not app.config['SHARDS']:
+        return {None: engines.get('lectura') or engines[None]}
+    return {nombre: engines[clave_bind(nombre, True)] for nombre in app.config['SHARDS']}
+
+def en_paralelo(funcion):
+    """
+    Ejecuta funcion(sesion) en todos los shards a la vez, cada uno con su propia sesión
+    de solo lectura. Devuelve {shard: resultado} en el orden de SHARDS ({None: ...} sin shards).
+    """
+    global _pool
+    motores = motores_lectura(current_app)
+    if _pool is None:
+        with _lock_pool:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(current_app.config['SHARDS_HILOS'], thread_name_prefix='shards')
+
+    def ejecutar(motor):
+        with Session(motor) as sesion:
+            return funcion(sesion)
+
+    futuros = {nombre: _pool.submit(ejecutar, motor) for nombre, motor in motores.items()}
+    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+# ==================== APLICACIÓN ====================
+
+def configurar(app):
+    """Añade los binds de los shards; se llama antes de extensions.init_app()"""
+    global directorio
+    if not app.config['SHARDS']:
+        return
+    for ruta in list(app.config['SHARDS'].values()) + [app.config['SHARDS_DIRECTORIO']]:
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    app.config['SQLALCHEMY_BINDS'] = {**app.config['SQLALCHEMY_BINDS'], **binds(app.config)}
+    directorio = Directorio(app.config['SHARDS_DIRECTORIO'])
+    app.before_request(shard_de_la_sesion)
+
+def crear_tablas(app):
+    """Crea el esquema completo en los shards que aún no lo tengan (dentro de un contexto de aplicación)"""
+    engines = app.extensions['sqlalchemy'].engines
+    for nombre in app.config['SHARDS']:
+        Base.metadata.create_all(engines[clave_bind(nombre)])
@@ -0,0 +1,35 @@
+"""
+Fixtures de las pruebas: aplicación sobre una base de datos SQLite temporal
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+import migraciones
+
+@pytest.fixture
+def crear_app(tmp_path):
+    """Devuelve una función que construye la aplicación con la configuración extra indicada"""
+    def crear(**extra):
+        ruta = str(tmp_path / 'todo.db')
+        config = {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta}',
+            'SQLALCHEMY_BINDS': {'lectura': {'url': f'sqlite:///file:{ruta}?mode=ro&uri=true'}},
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'TRABAJOS_EN_PROCESO': False,
+            # Las excepciones (también la de SQL_LIMITE_CONSULTAS) llegan a la prueba
+            'TESTING': True,
+        }
+        config.update(extra)
+        app = create_app(config)
+        # Base recién creada con create_all: task_stats y los rollups se mantienen desde ya
+        migraciones.marcar_aplicadas(ruta)
+        return app
+    return crear
@@ -0,0 +1,85 @@
+"""
+Número de sentencias SQL de las rutas más usadas
+
+Con SQL_LIMITE_CONSULTAS cualquier petición que ejecute más sentencias falla
+(AssertionError en verificar_limite_consultas). Las rutas cargan los usuarios
+relacionados en lote (consultas.py): el número de sentencias no depende del
+número de tareas, así que una relación perezosa nueva en una plantilla rompe la prueba.
+"""
+
+import pytest
+
+from extensions import db
+from models import ESTADOS, PRIORIDADES, Attachment, Task, User
+
+LIMITE = 10
+TAREAS = 60
+
+@pytest.fixture
+def app(crear_app):
+    return crear_app(SQL_LIMITE_CONSULTAS=LIMITE, SQL_CABECERA_CONSULTAS=True)
+
+@pytest.fixture
+def usuarios(app):
+    """Un líder y tres miembros con TAREAS tareas repartidas entre todos, una de cada cuatro con adjunto"""
+    with app.app_context():
+        lider = User(username='lider', nombre='Líder', role='lider', password='x')
+        miembros = [User(username=f'miembro{i}', nombre=f'Miembro {i}', role='miembro', password='x')
+                    for i in range(3)]
+        db.session.add_all([lider, *miembros])
+        db.session.flush()
+        todos = [lider, *miembros]
+        for i in range(TAREAS):
+            adjunto = None
+            if i % 4 == 0:
+                sha256 = f'{i:064x}'
+                adjunto = Attachment(sha256=sha256, ruta=f'{sha256[:2]}/{sha256[2:4]}/{sha256}.png', tamano=1,
+                                     referencias=1, miniatura=f'{sha256[:2]}/{sha256[2:4]}/{sha256}.thumb.webp')
+            db.session.add(Task(titulo=f'Tarea {i}', descripcion=f'Descripción {i}',
+                                estado=ESTADOS[i % len(ESTADOS)], prioridad=PRIORIDADES[i % len(PRIORIDADES)],
+                                created_by=todos[i % 2].id, assigned_to=miembros[i % 3].id if i % 5 else None,
+                                adjunto=adjunto, archivo=adjunto and adjunto.ruta,
+                                nombre_archivo=adjunto and 'imagen.png'))
+        db.session.commit()
+        return {user.username: {'id': user.id, 'role': user.role, 'username': user.username} for user in todos}
+
+def iniciar_sesion(cliente, user):
+    with cliente.session_transaction() as sesion:
+        sesion.update(user_id=user['id'], role=user['role'], username=user['username'])
+
+def comprobar(cliente, url):
+    respuesta = cliente.get(url)
+    assert respuesta.status_code == 200, url
+    assert int(respuesta.headers['X-Consultas-SQL']) <= LIMITE
+
+@pytest.mark.parametrize('url', [
+    '/dashboard',
+    '/lider/tareas-por-miembro',
+    '/lider/miembro/{miembro}/tareas',
+    '/api/v1/tareas',
+])
+def test_rutas_lider(app, usuarios, url):
+    cliente = app.test_client()
+    iniciar_sesion(cliente, usuarios['lider'])
+    comprobar(cliente, url.format(miembro=usuarios['miembro0']['id']))
+
+@pytest.mark.parametrize('url', ['/dashboard', '/api/v1/tareas'])
+def test_rutas_miembro(app, usuarios, url):
+    cliente = app.test_client()
+    iniciar_sesion(cliente, usuarios['miembro0'])
+    comprobar(cliente, url)
+
+def test_detalle_tarea(app, usuarios):
+    cliente = app.test_client()
+    iniciar_sesion(cliente, usuarios['lider'])
+    with app.app_context():
+        tarea_id = db.session.scalar(db.select(Task.id).where(Task.assigned_to.is_not(None)).limit(1))
+    comprobar(cliente, f'/tarea/{tarea_id}/detalle')
+
+def test_limite_superado(crear_app, usuarios):
+    """El modo de prueba detecta de verdad las peticiones que se pasan del límite"""
+    app = crear_app(SQL_LIMITE_CONSULTAS=0)
+    cliente = app.test_client()
+    iniciar_sesion(cliente, usuarios['lider'])
+    with pytest.raises(AssertionError, match='consultas SQL'):
+        cliente.get('/dashboard')
@@ -0,0 +1,191 @@
+"""
+Trabajos en segundo plano (miniaturas de adjuntos).
+Cola en la tabla job. Los trabajadores (hilos del proceso web o el comando
+'flask procesar-trabajos') reclaman cada trabajo con un UPDATE ... RETURNING
+atómico, así varios procesos pueden vaciar la misma cola sin pisarse.
+"""
+
+from flask import current_app
+from sqlalchemy import and_, or_, event, select, update
+from datetime import datetime, timedelta
+import os
+import tempfile
+import threading
+
+from extensions import db
+from models import Attachment, Job, Task, incrementar_version_tareas
+from shards import carpeta_uploads, nombres as nombres_shards, usar_shard
+
+aviso_trabajos = threading.Event()
+_trabajadores_iniciados = False
+_lock_trabajadores = threading.Lock()
+
+def encolar_trabajo(tipo, attachment_id):
+    """Añade un trabajo a la cola dentro de la transacción actual"""
+    db.session.add(Job(tipo=tipo, attachment_id=attachment_id))
+    db.session.info['trabajos_nuevos'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def avisar_trabajadores(sesion):
+    if sesion.info.pop('trabajos_nuevos', False):
+        aviso_trabajos.set()
+
+@event.listens_for(db.session, 'after_rollback')
+def descartar_aviso_trabajadores(sesion):
+    sesion.info.pop('trabajos_nuevos', None)
+
+def reclamar_trabajo():
+    """Marca como 'procesando' el siguiente trabajo disponible y lo devuelve (o None si no hay)"""
+    jobs = Job.__table__
+    ahora = datetime.utcnow()
+    caducado = ahora - timedelta(seconds=current_app.config['TRABAJOS_TIMEOUT'])
+    siguiente = select(jobs.c.id).where(
+        jobs.c.intentos < current_app.config['TRABAJOS_MAX_INTENTOS'],
+        or_(jobs.c.estado == 'pendiente',
+            and_(jobs.c.estado == 'procesando', jobs.c.fecha_actualizacion < caducado))
+    ).order_by(jobs.c.id).limit(1).scalar_subquery()
+
+    fila = db.session.execute(
+        update(jobs)
+        .where(jobs.c.id == siguiente)
+        .values(estado='procesando', intentos=jobs.c.intentos + 1, fecha_actualizacion=ahora)
+        .returning(jobs.c.id, jobs.c.tipo, jobs.c.attachment_id, jobs.c.intentos)
+    ).first()
+    db.session.commit()
+    return fila
+
+def procesar_trabajo(trabajo):
+    """Ejecuta un trabajo reclamado y guarda su resultado"""
+    error = None
+    try:
+        if trabajo.tipo == 'miniatura':
+            estado = 'hecho' if generar_miniatura(trabajo.attachment_id) else 'omitido'
+        else:
+            estado, error = 'error', f"Tipo de trabajo desconocido: {trabajo.tipo}"
+    except Exception as e:
+        db.session.rollback()
+        error = str(e)
+        estado = 'pendiente' if trabajo.intentos < current_app.config['TRABAJOS_MAX_INTENTOS'] else 'error'
+
+    db.session.execute(
+        update(Job.__table__)
+        .where(Job.__table__.c.id == trabajo.id)
+        .values(estado=estado, error=error, fecha_actualizacion=datetime.utcnow())
+    )
+    db.session.commit()
+
+def generar_miniatura(attachment_id):
+    """
+    Genera la miniatura WebP (o JPEG si Pillow no tiene WebP) de un adjunto.
+    Devuelve False si no se puede generar (Pillow/PyMuPDF no instalados, blob eliminado).
+    """
+    try:
+        from PIL import Image, ImageOps, features
+    except ImportError:
+        return False
+
+    adjunto = db.session.execute(
+        select(Attachment.ruta, Attachment.miniatura).where(Attachment.id == attachment_id)).first()
+    # Fuera de una petición la sesión usa el único escritor del pool: se suelta antes de
+    # renderizar para no hacer esperar a las escrituras de las peticiones
+    db.session.commit()
+    if adjunto is None:
+        return False
+    if adjunto.miniatura:
+        return True
+
+    carpeta = carpeta_uploads()
+    origen = os.path.join(carpeta, adjunto.ruta)
+    base, extension = adjunto.ruta.rsplit('.', 1)
+    if extension == 'pdf':
+        imagen = primera_pagina_pdf(origen)
+        if imagen is None:
+            return False
+    else:
+        imagen = ImageOps.exif_transpose(Image.open(origen))
+
+    imagen.thumbnail(current_app.config['MINIATURA_TAMANO'])
+    if features.check('webp'):
+        formato, sufijo = 'WEBP', 'webp'
+        if imagen.mode not in ('RGB', 'RGBA'):
+            imagen = imagen.convert('RGBA')
+    else:
+        formato, sufijo = 'JPEG', 'jpg'
+        if imagen.mode != 'RGB':
+            imagen = imagen.convert('RGB')
+
+    ruta_miniatura = f"{base}.thumb.{sufijo}"
+    carpeta_tmp = os.path.join(carpeta, '.tmp')
+    os.makedirs(carpeta_tmp, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=carpeta_tmp, delete=False) as tmp:
+        imagen.save(tmp, formato, quality=80)
+    os.replace(tmp.name, os.path.join(carpeta, ruta_miniatura))
+
+    # Solo ahora se vuelve a tomar el escritor, para un UPDATE corto (0 filas si el adjunto
+    # se borró mientras tanto: el archivo queda huérfano para verificar_adjuntos.py)
+    actualizadas = db.session.execute(
+        update(Attachment.__table__)
+        .where(Attachment.__table__.c.id == attachment_id)
+        .values(miniatura=ruta_miniatura)
+    ).rowcount
+    if actualizadas:
+        # El UPDATE en bloque no pasa por subir_versiones_relacionadas: las tarjetas
+        # cacheadas de las tareas con este adjunto deben mostrar la miniatura
+        incrementar_version_tareas(db.session.connection(), Task.__table__.c.attachment_id == attachment_id)
+    return actualizadas > 0
+
+def primera_pagina_pdf(ruta):
+    """Renderiza la primera página de un PDF como imagen de Pillow (requiere PyMuPDF)"""
+    try:
+        import fitz
+        from PIL import Image
+    except ImportError:
+        return None
+
+    with fitz.open(ruta) as documento:
+        if documento.page_count == 0:
+            return None
+        pixmap = documento[0].get_pixmap(matrix=fitz.Matrix(0.5, 0.5))
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+def bucle_trabajador(app, una_vez=False):
+    """Procesa trabajos mientras haya; si la cola se vacía espera un aviso o TRABAJOS_INTERVALO"""
+    while True:
+        hubo_trabajo = False
+        # Con shards cada equipo tiene su propia cola: se recorren todas
+        for shard in nombres_shards(app):
+            with app.app_context():
+                usar_shard(shard)
+                trabajo = reclamar_trabajo()
+                if trabajo:
+                    procesar_trabajo(trabajo)
+                    hubo_trabajo = True
+        if hubo_trabajo:
+            continue
+        if una_vez:
+            return
+        aviso_trabajos.wait(app.config['TRABAJOS_INTERVALO'])
+        aviso_trabajos.clear()
+
+def lanzar_trabajadores(app, daemon=True, una_vez=False):
+    hilos = [
+        threading.Thread(target=bucle_trabajador, args=(app,), kwargs={'una_vez': una_vez},
+                         name=f'trabajador-{i}', daemon=daemon)
+        for i in range(app.config['TRABAJOS_HILOS'])
+    ]
+    for hilo in hilos:
+        hilo.start()
+    return hilos
+
+def iniciar_trabajadores():
+    """Arranca los hilos trabajadores del proceso web la primera vez que llega una petición"""
+    global _trabajadores_iniciados
+    if _trabajadores_iniciados or not current_app.config['TRABAJOS_EN_PROCESO']:
+        return
+    with _lock_trabajadores:
+        if not _trabajadores_iniciados:
+            lanzar_trabajadores(current_app._get_current_object())
+            _trabajadores_iniciados = True
+
+def init_app(app):
+    app.before_request(iniciar_trabajadores)
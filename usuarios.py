@@ -0,0 +1,78 @@
+"""
+Usuario de la sesión y decoradores de acceso a las rutas
+"""
+
+from flask import g, session, flash, redirect, url_for
+from sqlalchemy import event
+from functools import wraps
+from collections import namedtuple
+
+from cache import CacheLRU
+from config import Config
+from extensions import db
+from models import User
+
+# ==================== USUARIO ACTUAL ====================
+
+# Copia ligera del usuario: se puede compartir entre peticiones sin atarla a una sesión de SQLAlchemy
+UsuarioActual = namedtuple('UsuarioActual', ['id', 'username', 'role', 'nombre'])
+
+cache_usuarios = CacheLRU(Config.USUARIOS_CACHE_TAMANO, Config.USUARIOS_CACHE_TTL)
+
+def init_app(app):
+    cache_usuarios.tamano = app.config['USUARIOS_CACHE_TAMANO']
+    cache_usuarios.ttl = app.config['USUARIOS_CACHE_TTL']
+
+def usuario_actual():
+    """
+    Usuario de la sesión, cargado como mucho una vez por petición (se guarda en flask.g)
+    y compartido entre peticiones a través de cache_usuarios. Devuelve None si no hay sesión
+    o si el usuario ya no existe.
+    """
+    if 'usuario_actual' in g:
+        return g.usuario_actual
+
+    user_id = session.get('user_id')
+    usuario = None
+    if user_id is not None:
+        usuario = cache_usuarios.get(user_id)
+        if usuario is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                usuario = UsuarioActual(user.id, user.username, user.role, user.nombre)
+                cache_usuarios.set(user_id, usuario)
+
+    g.usuario_actual = usuario
+    return usuario
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidar_usuario_cacheado(mapper, connection, user):
+    """Al cambiar el rol, nombre o cualquier dato de un usuario se descarta su copia cacheada"""
+    cache_usuarios.invalidar(user.id)
+
+# ==================== DECORADORES ====================
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if usuario_actual() is None:
+            session.clear()
+            flash('Debes iniciar sesión primero', 'warning')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def lider_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user = usuario_actual()
+        if user is None:
+            session.clear()
+            flash('Debes iniciar sesión primero', 'warning')
+            return redirect(url_for('auth.login'))
+        if user.role != 'lider':
+            flash('No tienes permisos para acceder a esta sección', 'danger')
+            return redirect(url_for('tareas.dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
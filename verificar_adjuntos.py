@@ -0,0 +1,336 @@
+"""
+Verificación de la integridad de los adjuntos (sustituye a fix_file_paths.py)
+
+    python verificar_adjuntos.py [--uploads uploads] [--hash] [--corregir] [--hilos N] [--lote 500]
+                                 [--checkpoint instance/verificacion_adjuntos.json] [--desde-cero]
+                                 [--informe informe.json] [--shard EQUIPO ...]
+
+No pregunta nada ni escribe una línea por archivo:
+- Lee de la base de datos por lotes (por id) los blobs del almacén por contenido y las
+  tareas, activas y archivadas, con adjuntos antiguos guardados fuera del almacén.
+- Comprueba cada lote en un pool de hilos: que el archivo exista, su tamaño y, con
+  --hash, su SHA-256 (hashlib suelta el GIL: escala con los núcleos y el disco).
+- Con --corregir, las rutas antiguas guardadas con carpetas (C:\\...\\archivo.pdf) se
+  cambian por el nombre del archivo si está en uploads/; cada lote se confirma aparte.
+- Al final recorre uploads/ buscando archivos huérfanos, que no usa ningún blob ni tarea.
+
+Tras cada lote se guarda el progreso en el checkpoint: si se interrumpe, al volver a
+lanzarlo continúa donde se quedó. El informe JSON se escribe en --informe o en la salida
+estándar; el progreso va a la salida de errores.
+
+Con SHARDS cada equipo tiene su base de datos y su carpeta uploads/<equipo> (ver
+shards.py): se verifican uno tras otro (o solo los de --shard), cada uno con su
+checkpoint, y el informe tiene una entrada por equipo.
+"""
+
+from sqlalchemy import bindparam, select, update
+from werkzeug.security import safe_join
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from config import BASE_DIR, RUTA_BASE_DATOS, Config
+from models import Attachment, Task, TaskArchive, crear_sesion, incrementar_versiones
+
+CHECKPOINT = os.path.join(BASE_DIR, 'instance', 'verificacion_adjuntos.json')
+BLOQUE_HASH = 1024 * 1024
+TEMPORAL_ANTIGUO = 3600  # Segundos tras los que un archivo de uploads/.tmp se da por abandonado
+
+# Tareas con adjunto antiguo (sin blob): (fase, modelo)
+FASES_TAREAS = (('tareas', Task), ('archivadas', TaskArchive))
+
+def nuevo_informe():
+    return {
+        'adjuntos': {'revisados': 0, 'bytes': 0, 'faltan': [], 'tamano_distinto': [],
+                     'hash_distinto': [], 'miniaturas_faltan': []},
+        'tareas': {'revisadas': 0, 'faltan': [], 'corregidas': [], 'por_corregir': []},
+        'huerfanos': {'total': 0, 'bytes': 0, 'archivos': []},
+        'temporales': [],
+    }
+
+def log(mensaje):
+    print(mensaje, file=sys.stderr, flush=True)
+
+# ==================== CHECKPOINT ====================
+
+def cargar_checkpoint(ruta, opciones):
+    """Estado guardado de una verificación anterior con las mismas opciones, o uno nuevo"""
+    if os.path.exists(ruta):
+        with open(ruta, encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('opciones') == opciones:
+            return estado
+        log("⚠️  El checkpoint es de una verificación con otras opciones: se empieza de cero")
+    return {'opciones': opciones, 'inicio': datetime.utcnow().isoformat(),
+            'posicion': {}, 'informe': nuevo_informe()}
+
+def guardar_checkpoint(ruta, estado):
+    """Escribe el checkpoint de forma atómica (nunca queda a medias)"""
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    tmp = f"{ruta}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(tmp, ruta)
+
+# ==================== COMPROBACIONES ====================
+# Se ejecutan en los hilos del pool: solo tocan el sistema de archivos, nunca la sesión.
+
+def sha256_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        while bloque := f.read(BLOQUE_HASH):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def comprobar_blob(fila, carpeta, con_hash):
+    """Problemas de un blob del almacén: lista de (categoría, datos)"""
+    problemas = []
+    ruta = safe_join(carpeta, fila.ruta)
+    try:
+        tamano = os.stat(ruta).st_size if ruta else None
+    except FileNotFoundError:
+        tamano = None
+    if tamano is None:
+        problemas.append(('faltan', {'id': fila.id, 'ruta': fila.ruta}))
+    elif tamano != fila.tamano:
+        problemas.append(('tamano_distinto', {'id': fila.id, 'ruta': fila.ruta,
+                                              'esperado': fila.tamano, 'real': tamano}))
+    elif con_hash and sha256_archivo(ruta) != fila.sha256:
+        problemas.append(('hash_distinto', {'id': fila.id, 'ruta': fila.ruta}))
+
+    if fila.miniatura:
+        miniatura = safe_join(carpeta, fila.miniatura)
+        if not miniatura or not os.path.isfile(miniatura):
+            problemas.append(('miniaturas_faltan', {'id': fila.id, 'ruta': fila.miniatura}))
+    return problemas, tamano or 0
+
+def comprobar_tarea(fila, carpeta):
+    """
+    Estado del adjunto antiguo de una tarea: ('ok', None), ('falta', None) o
+    ('corregible', nombre) si la ruta guardada tiene carpetas pero el archivo está en uploads/
+    """
+    ruta = safe_join(carpeta, fila.archivo)
+    if ruta and os.path.isfile(ruta):
+        return 'ok', None
+    nombre = os.path.basename(fila.archivo.replace('\\', '/'))
+    if nombre and nombre != fila.archivo and os.path.isfile(os.path.join(carpeta, nombre)):
+        return 'corregible', nombre
+    return 'falta', None
+
+def listar_carpeta(carpeta, relativa):
+    """Archivos bajo carpeta/relativa: lista de (ruta relativa con '/', tamaño, fecha de modificación)"""
+    archivos = []
+    pendientes = [relativa]
+    while pendientes:
+        actual = pendientes.pop()
+        try:
+            entradas = list(os.scandir(os.path.join(carpeta, actual)))
+        except FileNotFoundError:
+            continue
+        for entrada in entradas:
+            nombre = f"{actual}/{entrada.name}" if actual else entrada.name
+            if entrada.is_dir(follow_symlinks=False):
+                pendientes.append(nombre)
+            elif entrada.is_file(follow_symlinks=False):
+                info = entrada.stat(follow_symlinks=False)
+                archivos.append((nombre, info.st_size, info.st_mtime))
+    return archivos
+
+# ==================== FASES ====================
+
+def verificar_blobs(sesion, pool, carpeta, estado, lote, con_hash, guardar):
+    informe = estado['informe']['adjuntos']
+    while True:
+        filas = sesion.execute(
+            select(Attachment.id, Attachment.ruta, Attachment.tamano, Attachment.sha256, Attachment.miniatura)
+            .where(Attachment.id > estado['posicion'].get('adjuntos', 0))
+            .order_by(Attachment.id).limit(lote)
+        ).all()
+        if not filas:
+            return
+        for problemas, tamano in pool.map(lambda fila: comprobar_blob(fila, carpeta, con_hash), filas):
+            informe['bytes'] += tamano
+            for categoria, datos in problemas:
+                informe[categoria].append(datos)
+        sesion.rollback()  # Suelta la transacción de lectura entre lotes
+        informe['revisados'] += len(filas)
+        estado['posicion']['adjuntos'] = filas[-1].id
+        guardar()
+        log(f"🔎 Blobs: {informe['revisados']} revisados, {len(informe['faltan'])} faltan")
+
+def verificar_tareas(sesion, pool, carpeta, estado, fase, modelo, lote, corregir, guardar):
+    informe = estado['informe']['tareas']
+    tabla = modelo.__table__
+    while True:
+        filas = sesion.execute(
+            select(tabla.c.id, tabla.c.archivo, tabla.c.created_by, tabla.c.assigned_to)
+            .where(tabla.c.archivo.isnot(None), tabla.c.attachment_id.is_(None),
+                   tabla.c.id > estado['posicion'].get(fase, 0))
+            .order_by(tabla.c.id).limit(lote)
+        ).all()
+        if not filas:
+            return
+        correcciones = []
+        for fila, (resultado, nombre) in zip(filas, pool.map(lambda fila: comprobar_tarea(fila, carpeta), filas)):
+            datos = {'id': fila.id, 'archivo': fila.archivo, 'archivada': modelo is TaskArchive}
+            if resultado == 'falta':
+                informe['faltan'].append(datos)
+            elif resultado == 'corregible':
+                informe['corregidas' if corregir else 'por_corregir'].append(dict(datos, nuevo=nombre))
+                correcciones.append((fila, nombre))
+
+        if corregir and correcciones:
+            # El cambio de la ruta y el avance del checkpoint van en el mismo lote
+            sesion.execute(
+                update(tabla).where(tabla.c.id == bindparam('b_id'))
+                .values(archivo=bindparam('b_archivo'), version=tabla.c.version + 1),
+                [{'b_id': fila.id, 'b_archivo': nombre} for fila, nombre in correcciones]
+            )
+            if modelo is Task:
+                incrementar_versiones(sesion.connection(),
+                                      {u for fila, _ in correcciones for u in (fila.created_by, fila.assigned_to)})
+            sesion.commit()
+        else:
+            sesion.rollback()  # Suelta la transacción de lectura entre lotes
+        informe['revisadas'] += len(filas)
+        estado['posicion'][fase] = filas[-1].id
+        guardar()
+        log(f"🔎 Tareas ({fase}): {informe['revisadas']} revisadas, {len(informe['faltan'])} sin archivo")
+
+def rutas_usadas(sesion):
+    """Rutas relativas de uploads/ que usa algún blob, miniatura o tarea"""
+    usadas = set()
+    for columna in (Attachment.ruta, Attachment.miniatura):
+        usadas.update(ruta for (ruta,) in sesion.execute(select(columna).execution_options(yield_per=5000)) if ruta)
+    for modelo in (Task, TaskArchive):
+        for (ruta,) in sesion.execute(select(modelo.archivo).execution_options(yield_per=5000)):
+            if ruta:
+                ruta = ruta.replace('\\', '/')
+                # Una ruta antigua con carpetas puede referirse al archivo suelto (ver comprobar_tarea)
+                usadas.update((ruta, os.path.basename(ruta)))
+    return usadas
+
+def buscar_huerfanos(sesion, pool, carpeta, estado, inicio):
+    """Archivos de uploads/ sin referencias. Los modificados después de `inicio` se ignoran (subidas en curso)"""
+    informe = estado['informe']
+    usadas = rutas_usadas(sesion)
+    sesion.rollback()
+    # Cada carpeta de primer nivel (ab/ del almacén) se recorre en un hilo
+    raiz = list(os.scandir(carpeta)) if os.path.isdir(carpeta) else []
+    sueltos = [(e.name, info.st_size, info.st_mtime)
+               for e in raiz if e.is_file(follow_symlinks=False) for info in [e.stat()]]
+    carpetas = [e.name for e in raiz if e.is_dir(follow_symlinks=False)]
+    for archivos in [sueltos] + list(pool.map(lambda nombre: listar_carpeta(carpeta, nombre), carpetas)):
+        for ruta, tamano, modificado in archivos:
+            if modificado >= inicio:
+                continue
+            if ruta.startswith('.tmp/'):
+                if inicio - modificado > TEMPORAL_ANTIGUO:
+                    informe['temporales'].append(ruta)
+            elif not os.path.basename(ruta).startswith('.') and ruta not in usadas:
+                informe['huerfanos']['total'] += 1
+                informe['huerfanos']['bytes'] += tamano
+                informe['huerfanos']['archivos'].append(ruta)
+    estado['posicion']['huerfanos'] = True
+    log(f"🔎 uploads/: {informe['huerfanos']['total']} archivos huérfanos")
+
+def verificar(ruta_db, carpeta, con_hash=False, corregir=False, hilos=None, lote=500,
+              checkpoint=CHECKPOINT, desde_cero=False):
+    """Ejecuta (o reanuda) la verificación completa y devuelve el informe"""
+    carpeta = os.path.abspath(carpeta)
+    opciones = {'db': os.path.abspath(ruta_db), 'uploads': carpeta, 'hash': con_hash, 'corregir': corregir}
+    if desde_cero and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    estado = cargar_checkpoint(checkpoint, opciones)
+    if estado['posicion']:
+        log(f"↩️  Reanudando la verificación empezada el {estado['inicio']}")
+    inicio = time.time()
+    hilos = hilos or min(32, (os.cpu_count() or 1) * 4)
+
+    with crear_sesion(ruta_db) as sesion, ThreadPoolExecutor(max_workers=hilos) as pool:
+        def guardar():
+            guardar_checkpoint(checkpoint, estado)
+
+        verificar_blobs(sesion, pool, carpeta, estado, lote, con_hash, guardar)
+        for fase, modelo in FASES_TAREAS:
+            verificar_tareas(sesion, pool, carpeta, estado, fase, modelo, lote, corregir, guardar)
+        if not estado['posicion'].get('huerfanos'):
+            buscar_huerfanos(sesion, pool, carpeta, estado, inicio)
+
+    informe = dict(estado['informe'], inicio=estado['inicio'], fin=datetime.utcnow().isoformat(),
+                   opciones=opciones, hilos=hilos)
+    # Terminada: la próxima ejecución empieza de cero
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return informe
+
+def checkpoint_del_shard(checkpoint, shard):
+    base, extension = os.path.splitext(checkpoint)
+    return f"{base}.{shard}{extension}"
+
+def contar_problemas(informe):
+    return (len(informe['adjuntos']['faltan']) + len(informe['adjuntos']['tamano_distinto'])
+            + len(informe['adjuntos']['hash_distinto']) + len(informe['tareas']['faltan']))
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica los adjuntos de la base de datos contra uploads/')
+    parser.add_argument('--db', default=RUTA_BASE_DATOS, help='Base de datos (por defecto instance/todo.db)')
+    parser.add_argument('--uploads', default=os.path.join(BASE_DIR, Config.UPLOAD_FOLDER),
+                        help='Carpeta de adjuntos')
+    parser.add_argument('--hash', action='store_true', help='Comprobar también el SHA-256 de cada blob')
+    parser.add_argument('--corregir', action='store_true',
+                        help='Corregir las rutas antiguas con carpetas cuyo archivo está en uploads/')
+    parser.add_argument('--hilos', type=int, help='Hilos para las comprobaciones (por defecto 4 por núcleo, máx. 32)')
+    parser.add_argument('--lote', type=int, default=500, help='Filas leídas (y corregidas) por lote')
+    parser.add_argument('--checkpoint', default=CHECKPOINT, help='Archivo de progreso para poder reanudar')
+    parser.add_argument('--desde-cero', action='store_true', help='Ignorar el checkpoint de una ejecución anterior')
+    parser.add_argument('--informe', help='Escribir el informe JSON en este archivo')
+    parser.add_argument('--shard', action='append', choices=list(Config.SHARDS) or None,
+                        help='Con SHARDS, verificar solo este equipo (se puede repetir; por defecto todos)')
+    args = parser.parse_args()
+
+    # (equipo, base de datos, carpeta, checkpoint) de cada verificación
+    if Config.SHARDS:
+        objetivos = [(shard, Config.SHARDS[shard], os.path.join(args.uploads, shard),
+                      checkpoint_del_shard(args.checkpoint, shard)) for shard in args.shard or Config.SHARDS]
+    elif args.shard:
+        parser.error('--shard necesita la variable SHARDS')
+    else:
+        objetivos = [(None, args.db, args.uploads, args.checkpoint)]
+    for shard, ruta_db, carpeta, checkpoint in objetivos:
+        if not os.path.exists(ruta_db):
+            log(f"❌ La base de datos '{ruta_db}' no existe")
+            sys.exit(1)
+
+    informes = {}
+    for shard, ruta_db, carpeta, checkpoint in objetivos:
+        if shard:
+            log(f"👥 Equipo {shard}")
+        informes[shard] = verificar(ruta_db, carpeta, args.hash, args.corregir, args.hilos, args.lote,
+                                    checkpoint, args.desde_cero)
+    informe = informes[None] if None in informes else informes
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.informe:
+        with open(args.informe, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+        log(f"📄 Informe guardado en {args.informe}")
+    else:
+        print(texto)
+
+    total = 0
+    for shard, informe in informes.items():
+        problemas = contar_problemas(informe)
+        total += problemas
+        log(f"{'⚠️ ' if problemas else '✅'} {shard + ': ' if shard else ''}{informe['adjuntos']['revisados']} blobs y "
+            f"{informe['tareas']['revisadas']} tareas revisados: {problemas} problemas, "
+            f"{informe['huerfanos']['total']} huérfanos")
+    # Código de salida 2 si hay adjuntos dañados o perdidos (para cron / CI)
+    sys.exit(2 if total else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+"""
+Punto de entrada para producción
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    uvicorn --factory wsgi:create_asgi_app --workers 4   (requiere asgiref)
+
+La base de datos se abre en modo WAL con un escritor por proceso y un pool
+de conexiones de solo lectura para las peticiones GET (ver extensions.py).
+"""
+
+from app import create_app
+
+app = create_app()
+
+def create_asgi_app():
+    """Envuelve la aplicación WSGI para servidores ASGI como uvicorn"""
+    from asgiref.wsgi import WsgiToAsgi
+    return WsgiToAsgi(app)